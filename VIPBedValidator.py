@@ -0,0 +1,131 @@
+import os
+import re
+
+class VIPBedValidator:
+    BED_VALIDATED = "validated"
+    BED_UNREADABLE = "unreadable"
+    HEADER_LINE_STARTS = ("#", "track", "browser")
+    PRIMARY_CONTIGS = set([str(cn) for cn in range(1, 23)] + ["X", "Y", "M", "MT"])
+    POSITION = re.compile(r"[0-9]+")
+    
+    def __init__(self):
+        """Initializes the validator that checks BED files."""
+        self.bed_cache = {}
+    
+    
+    def validate_bed_file(self, filepath):
+        """Validates a BED file line by line with constant memory.
+        
+        Checks that every line has at least 3 columns and the same number of columns as the first region,
+        that the start and end are integers with the start smaller than the end and that the regions are
+        sorted (all regions of a contig together, ordered by start). The number of regions, the number of
+        covered bases (overlapping regions are merged, only for sorted files) and the naming of the primary
+        contigs are collected.
+        Results are cached by path, size and modification time.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the BED file
+        
+        Returns
+        -------
+        tuple
+            Status (validated or unreadable) and a dict with the results (None if unreadable)
+        """
+        try:
+            with open(filepath, "r", errors="replace") as bedfile:
+                filestat = os.fstat(bedfile.fileno())
+                cachekey = (filepath, filestat.st_size, filestat.st_mtime_ns)
+                if cachekey not in self.bed_cache:
+                    self.bed_cache[cachekey] = (VIPBedValidator.BED_VALIDATED, self.validate_bed_lines(bedfile))
+                return self.bed_cache[cachekey]
+        except OSError:
+            return (VIPBedValidator.BED_UNREADABLE, None)
+    
+    
+    def validate_bed_lines(self, bedlines):
+        """Validates the lines of a BED file.
+        
+        Parameters
+        ----------
+        bedlines : iterable of str
+            Lines of the BED file
+        
+        Returns
+        -------
+        bedinfo : dict
+            Number of regions, number of covered bases (None if not sorted), number of invalid lines with the first invalid line
+            and its problem, the first unsorted line and an example of a primary contig with and without chr prefix
+        """
+        bedinfo = {"numregions": 0, "coveredbases": 0, "numinvalid": 0, "firstinvalid": None, "firstunsorted": None, "chrcontig": None, "nochrcontig": None}
+        numcolumns = None
+        seencontigs = set()
+        currentcontig = None
+        currentstart = 0
+        previousstart = 0
+        mergedend = 0
+        
+        for linenumber, bedline in enumerate(bedlines, start=1):
+            bedline = bedline.rstrip("\r\n")
+            if bedline == "" or bedline.startswith(VIPBedValidator.HEADER_LINE_STARTS):
+                continue
+            bedfields = bedline.split("\t")
+            problem = None
+            if len(bedfields) < 3:
+                problem = "expected at least 3 tab separated columns"
+            elif numcolumns is not None and len(bedfields) != numcolumns:
+                problem = f"expected {numcolumns} columns like the first region, found {len(bedfields)}"
+            elif VIPBedValidator.POSITION.fullmatch(bedfields[1]) is None or VIPBedValidator.POSITION.fullmatch(bedfields[2]) is None:
+                problem = "start and end should be non negative integers"
+            elif int(bedfields[1]) >= int(bedfields[2]):
+                problem = "start should be smaller than end"
+            if problem is not None:
+                bedinfo["numinvalid"] += 1
+                if bedinfo["firstinvalid"] is None:
+                    bedinfo["firstinvalid"] = (linenumber, problem)
+                continue
+            
+            numcolumns = len(bedfields)
+            contig, start, end = bedfields[0], int(bedfields[1]), int(bedfields[2])
+            bedinfo["numregions"] += 1
+            if contig != currentcontig:
+                if contig in seencontigs and bedinfo["firstunsorted"] is None:
+                    bedinfo["firstunsorted"] = linenumber
+                seencontigs.add(contig)
+                bedinfo["coveredbases"] += mergedend - currentstart
+                currentcontig, currentstart, previousstart, mergedend = contig, start, start, end
+                self.add_contig_naming(bedinfo, contig)
+                continue
+            
+            # Sorted on the start of the previous region, which can lie after the start of the merged regions
+            if start < previousstart and bedinfo["firstunsorted"] is None:
+                bedinfo["firstunsorted"] = linenumber
+            previousstart = start
+            if start > mergedend:
+                bedinfo["coveredbases"] += mergedend - currentstart
+                currentstart, mergedend = start, end
+            else:
+                mergedend = max(mergedend, end)
+        bedinfo["coveredbases"] += mergedend - currentstart
+        # Merging with constant memory only works for sorted regions, an estimate would be too high
+        if bedinfo["firstunsorted"] is not None:
+            bedinfo["coveredbases"] = None
+        return bedinfo
+    
+    
+    def add_contig_naming(self, bedinfo, contig):
+        """Registers a primary contig (1-22, X, Y and M/MT) as example of a contig with or without chr prefix.
+        
+        Parameters
+        ----------
+        bedinfo : dict
+            Results of the BED file
+        contig : str
+            Name of the contig
+        """
+        if contig.lower().startswith("chr"):
+            if bedinfo["chrcontig"] is None and contig[3:] in VIPBedValidator.PRIMARY_CONTIGS:
+                bedinfo["chrcontig"] = contig
+        elif bedinfo["nochrcontig"] is None and contig in VIPBedValidator.PRIMARY_CONTIGS:
+            bedinfo["nochrcontig"] = contig
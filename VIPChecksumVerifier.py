@@ -0,0 +1,274 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from VIPFileCache import VIPFileCache
+
+class VIPChecksumVerifier:
+    CHECKSUM_OK = "ok"
+    CHECKSUM_MISMATCH = "mismatch"
+    NO_CHECKSUM_FILE = "no_checksum_file"
+    CHECKSUM_FILE_INVALID = "checksum_file_invalid"
+    CHECKSUM_UNREADABLE = "unreadable"
+    CHECKSUM_PENDING = "pending"
+    
+    CHECKSUM_FILE_EXTENSIONS = [".md5", ".md5sum"]
+    MAX_CHECKSUM_FILE_SIZE = 1048576
+    MD5_LINE = re.compile(r"^\\?([0-9a-fA-F]{32})(?:\s+\*?(.+))?$")
+    HASH_BUFFER_SIZE = 8388608
+    
+    def __init__(self, filecache=None, numprocesses=None):
+        """Initializes the verifier that checks data files against the MD5 checksums in the .md5/.md5sum files next to them.
+        
+        Parameters
+        ----------
+        filecache : VIPFileCache
+            Cache to keep the calculated checksums in (a new in memory cache is made if not supplied)
+        numprocesses : int
+            Number of processes to calculate checksums with (number of CPUs if not supplied)
+        """
+        if filecache is None:
+            filecache = VIPFileCache()
+        self.file_cache = filecache
+        self.num_processes = numprocesses
+        self.process_pool = None
+        self.lock = threading.Lock()
+        self.checksum_jobs = {}
+        self.collected_jobs = set()
+        self.number_of_cache_hits = 0
+        self.number_of_hashed_files = 0
+        self.number_of_hashed_bytes = 0
+        self.hash_start_time = None
+        self.hash_end_time = None
+    
+    
+    def read_checksum_file(self, filepath):
+        """Reads the expected MD5 checksum of a data file from a .md5 or .md5sum file next to it.
+        
+        Checksum files can contain only the checksum or lines in the md5sum format (checksum and file name).
+        If the checksum file has multiple lines, the line with the name of the data file is used.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the data file
+        
+        Returns
+        -------
+        tuple
+            Path to the checksum file (None if there is none) and the expected checksum (None if not found)
+        """
+        filename = os.path.basename(filepath)
+        for checksumext in VIPChecksumVerifier.CHECKSUM_FILE_EXTENSIONS:
+            checksumfile = filepath + checksumext
+            try:
+                with open(checksumfile, "r", errors="replace") as md5file:
+                    checksumlines = md5file.read(VIPChecksumVerifier.MAX_CHECKSUM_FILE_SIZE).splitlines()
+            except OSError:
+                continue
+            checksums = [md5match.groups() for md5match in map(VIPChecksumVerifier.MD5_LINE.match, checksumlines) if md5match is not None]
+            for checksum, checksumname in checksums:
+                if checksumname is not None and os.path.basename(checksumname.strip()) == filename:
+                    return (checksumfile, checksum.lower())
+            # A single checksum is used even if the file was renamed after writing the checksum file
+            if len(checksums) == 1:
+                return (checksumfile, checksums[0][0].lower())
+            return (checksumfile, None)
+        return (None, None)
+    
+    
+    def prepare_checksum(self, filepath):
+        """Finds the checksum file of a data file and starts calculating the checksum of the data file.
+        
+        Meant to be run as probe on the file prober, so the checksum file is read and the data file is
+        checked with the timeouts and limits of the prober. The checksum is calculated on the process pool,
+        once per physical file: checksums in the cache and files that are already being calculated
+        (through another path) are not calculated again.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path of the data file to verify
+        
+        Returns
+        -------
+        tuple
+            Status (pending, no_checksum_file, checksum_file_invalid or unreadable), the path to the checksum
+            file, the expected checksum and the stat of the data file (None if not pending)
+        """
+        checksumfile, expectedchecksum = self.read_checksum_file(filepath)
+        if checksumfile is None:
+            return (VIPChecksumVerifier.NO_CHECKSUM_FILE, None, None, None)
+        if expectedchecksum is None:
+            return (VIPChecksumVerifier.CHECKSUM_FILE_INVALID, checksumfile, None, None)
+        try:
+            filestat = os.stat(filepath)
+        except (OSError, ValueError):
+            return (VIPChecksumVerifier.CHECKSUM_UNREADABLE, checksumfile, expectedchecksum, None)
+        self.get_checksum_job(filepath, filestat)
+        return (VIPChecksumVerifier.CHECKSUM_PENDING, checksumfile, expectedchecksum, filestat)
+    
+    
+    def get_checksum_job(self, filepath, filestat):
+        """Returns the cached checksum of a physical file, or the running calculation of it (started if needed).
+        
+        Parameters
+        ----------
+        filepath : str
+            Path of the data file
+        filestat : os.stat_result
+            Stat of the data file
+        
+        Returns
+        -------
+        str or Future
+            Cached checksum or the calculation of the checksum on the process pool
+        """
+        filekey = (filestat.st_dev, filestat.st_ino, filestat.st_size, filestat.st_mtime_ns)
+        with self.lock:
+            if filekey not in self.checksum_jobs:
+                cachedchecksum = self.file_cache.get_result("md5", filestat)
+                if cachedchecksum is not None:
+                    self.number_of_cache_hits += 1
+                    self.checksum_jobs[filekey] = cachedchecksum
+                else:
+                    if self.process_pool is None:
+                        self.process_pool = ProcessPoolExecutor(self.num_processes)
+                    if self.hash_start_time is None:
+                        self.hash_start_time = time.monotonic()
+                    self.checksum_jobs[filekey] = self.process_pool.submit(VIPChecksumVerifier.md5_file, filepath)
+            return self.checksum_jobs[filekey]
+    
+    
+    def get_checksum_result(self, filepath, preparedchecksum):
+        """Returns the result of verifying a data file, waiting for its checksum to be calculated if needed.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path of the data file
+        preparedchecksum : tuple
+            Result of prepare_checksum() for the data file
+        
+        Returns
+        -------
+        tuple
+            Status (ok, mismatch, no_checksum_file, checksum_file_invalid or unreadable), the path to the
+            checksum file, the expected checksum and the calculated checksum
+        """
+        checksumstatus, checksumfile, expectedchecksum, filestat = preparedchecksum
+        if checksumstatus != VIPChecksumVerifier.CHECKSUM_PENDING:
+            return preparedchecksum
+        
+        # Started again if the calculation was cancelled after it was prepared
+        checksumjob = self.get_checksum_job(filepath, filestat)
+        if isinstance(checksumjob, str):
+            return self.compare_checksums(checksumfile, expectedchecksum, checksumjob)
+        try:
+            calculatedchecksum, hashedbytes = checksumjob.result()
+        except CancelledError:
+            # Cancelled because the error budget was exhausted, the file is not reported
+            return (VIPChecksumVerifier.CHECKSUM_UNREADABLE, checksumfile, expectedchecksum, None)
+        if calculatedchecksum is None:
+            return (VIPChecksumVerifier.CHECKSUM_UNREADABLE, checksumfile, expectedchecksum, None)
+        
+        filekey = (filestat.st_dev, filestat.st_ino, filestat.st_size, filestat.st_mtime_ns)
+        with self.lock:
+            if filekey not in self.collected_jobs:
+                self.collected_jobs.add(filekey)
+                self.hash_end_time = time.monotonic()
+                self.number_of_hashed_files += 1
+                self.number_of_hashed_bytes += hashedbytes
+                self.file_cache.set_result("md5", filestat, calculatedchecksum)
+        return self.compare_checksums(checksumfile, expectedchecksum, calculatedchecksum)
+    
+    
+    def compare_checksums(self, checksumfile, expectedchecksum, calculatedchecksum):
+        """Compares the expected and calculated checksum of a data file.
+        
+        Parameters
+        ----------
+        checksumfile : str
+            Path to the checksum file
+        expectedchecksum : str
+            Checksum in the checksum file
+        calculatedchecksum : str
+            Checksum calculated from the data file
+        
+        Returns
+        -------
+        tuple
+            Status (ok or mismatch), the path to the checksum file, the expected and the calculated checksum
+        """
+        checksumstatus = VIPChecksumVerifier.CHECKSUM_OK if expectedchecksum == calculatedchecksum else VIPChecksumVerifier.CHECKSUM_MISMATCH
+        return (checksumstatus, checksumfile, expectedchecksum, calculatedchecksum)
+    
+    
+    def cancel_checksums(self):
+        """Cancels the checksum calculations that have not started yet, so they are started again when needed later."""
+        with self.lock:
+            for filekey in list(self.checksum_jobs):
+                checksumjob = self.checksum_jobs[filekey]
+                if not isinstance(checksumjob, str) and checksumjob.cancel():
+                    del self.checksum_jobs[filekey]
+    
+    
+    def get_statistics(self):
+        """Returns the number of verified files, the cache hits and the throughput of calculating checksums.
+        
+        Returns
+        -------
+        dict
+            Number of files taken from the cache and calculated, the number of calculated bytes, the
+            seconds spent calculating them and the throughput in bytes per second
+        """
+        hashseconds = 0.0
+        if self.hash_start_time is not None and self.hash_end_time is not None:
+            hashseconds = self.hash_end_time - self.hash_start_time
+        return {
+            "cachehits": self.number_of_cache_hits,
+            "hashedfiles": self.number_of_hashed_files,
+            "hashedbytes": self.number_of_hashed_bytes,
+            "hashseconds": hashseconds,
+            "bytespersecond": self.number_of_hashed_bytes / hashseconds if hashseconds > 0 else 0.0
+        }
+    
+    
+    @staticmethod
+    def md5_file(filepath):
+        """Calculates the MD5 checksum of a complete file, reading it in large chunks into a reused buffer.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file
+        
+        Returns
+        -------
+        tuple
+            MD5 checksum (None if the file could not be read) and the number of bytes read
+        """
+        md5hash = hashlib.md5()
+        hashbuffer = bytearray(VIPChecksumVerifier.HASH_BUFFER_SIZE)
+        bufferview = memoryview(hashbuffer)
+        hashedbytes = 0
+        try:
+            with open(filepath, "rb", buffering=0) as datafile:
+                while True:
+                    numread = datafile.readinto(hashbuffer)
+                    if not numread:
+                        break
+                    md5hash.update(bufferview[:numread])
+                    hashedbytes += numread
+        except OSError:
+            return (None, hashedbytes)
+        return (md5hash.hexdigest(), hashedbytes)
+    
+    
+    def close(self):
+        """Stops the process pool, checksum calculations that have not started yet are cancelled."""
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=True, cancel_futures=True)
+            self.process_pool = None
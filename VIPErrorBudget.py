@@ -0,0 +1,86 @@
+class VIPErrorBudget:
+    def __init__(self, maxerrors=None, maxsheeterrors=None):
+        """Initializes the error budget for the whole run and per samplesheet.
+        
+        Parameters
+        ----------
+        maxerrors : int
+            Maximum number of errors for all samplesheets together (None for no limit)
+        maxsheeterrors : int
+            Maximum number of errors per samplesheet (None for no limit)
+        """
+        self.max_errors = maxerrors
+        self.max_sheet_errors = maxsheeterrors
+        self.number_of_errors = 0
+        self.number_of_sheet_errors = 0
+        self.was_exhausted = False
+    
+    
+    def start_samplesheet(self):
+        """Resets the samplesheet error count when starting to check a new samplesheet."""
+        self.number_of_sheet_errors = 0
+    
+    
+    def count_error(self):
+        """Counts a found error against the budgets."""
+        self.number_of_errors += 1
+        self.number_of_sheet_errors += 1
+        if self.is_exhausted():
+            self.was_exhausted = True
+    
+    
+    def is_run_exhausted(self):
+        """Returns whether the error budget for the whole run is exhausted.
+        
+        Returns
+        -------
+        bool
+            True if the maximum number of errors for the run is reached, False if not
+        """
+        return self.max_errors is not None and self.number_of_errors >= self.max_errors
+    
+    
+    def is_exhausted(self):
+        """Returns whether the error budget for the run or the current samplesheet is exhausted.
+        
+        Returns
+        -------
+        bool
+            True if the maximum number of errors for the run or samplesheet is reached, False if not
+        """
+        if self.is_run_exhausted():
+            return True
+        return self.max_sheet_errors is not None and self.number_of_sheet_errors >= self.max_sheet_errors
+    
+    
+    def budget_was_exhausted(self):
+        """Returns whether an error budget was exhausted at any point during the run.
+        
+        Returns
+        -------
+        self.was_exhausted : bool
+            True if a budget was exhausted, False if not
+        """
+        return self.was_exhausted
+    
+    
+    def get_number_of_errors(self):
+        """Returns the number of errors counted during the run.
+        
+        Returns
+        -------
+        self.number_of_errors : int
+            Number of counted errors
+        """
+        return self.number_of_errors
+    
+    
+    def get_number_of_sheet_errors(self):
+        """Returns the number of errors counted for the current samplesheet.
+        
+        Returns
+        -------
+        self.number_of_sheet_errors : int
+            Number of counted errors for the current samplesheet
+        """
+        return self.number_of_sheet_errors
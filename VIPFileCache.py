@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+
+class VIPFileCache:
+    COMMIT_INTERVAL = 1000
+    CREATE_TABLE = "CREATE TABLE IF NOT EXISTS file_results (kind TEXT, device INTEGER, inode INTEGER, size INTEGER, mtime INTEGER, result TEXT, PRIMARY KEY (kind, device, inode, size, mtime))"
+    
+    def __init__(self, cachefile=None):
+        """Initializes the cache that stores results of (expensive) file checks in a SQLite database.
+        
+        Results are stored per kind of check and file, identified by its device, inode, size and
+        modification time, so they remain valid as long as the file is not changed.
+        
+        Parameters
+        ----------
+        cachefile : str
+            Path to the SQLite database to keep the results in between runs (kept in memory if not supplied)
+        """
+        self.cache_file = cachefile
+        self.lock = threading.Lock()
+        self.number_of_changes = 0
+        try:
+            self.connection = self.open_database(cachefile if cachefile is not None else ":memory:")
+        except sqlite3.Error as sqle:
+            print(f"[ERROR]: Could not open cache file {cachefile} ({sqle}), results are not kept between runs")
+            self.connection = self.open_database(":memory:")
+    
+    
+    def open_database(self, databasepath):
+        """Opens (and if needed creates) the SQLite database with the cached results.
+        
+        Parameters
+        ----------
+        databasepath : str
+            Path to the database file, or :memory: for an in memory database
+        
+        Returns
+        -------
+        sqlite3.Connection
+            Connection to the database, usable from multiple threads
+        """
+        dbconnection = sqlite3.connect(databasepath, check_same_thread=False)
+        dbconnection.execute(VIPFileCache.CREATE_TABLE)
+        return dbconnection
+    
+    
+    def get_result(self, kind, filestat):
+        """Returns a cached result for a file.
+        
+        Parameters
+        ----------
+        kind : str
+            Kind of check the result is of
+        filestat : os.stat_result
+            Stat of the file
+        
+        Returns
+        -------
+        str
+            Cached result, None if the file is not in the cache (or was changed)
+        """
+        with self.lock:
+            cacherow = self.connection.execute("SELECT result FROM file_results WHERE kind = ? AND device = ? AND inode = ? AND size = ? AND mtime = ?", (kind, filestat.st_dev, filestat.st_ino, filestat.st_size, filestat.st_mtime_ns)).fetchone()
+        return cacherow[0] if cacherow is not None else None
+    
+    
+    def set_result(self, kind, filestat, result):
+        """Stores the result of a check for a file. Results are written to the cache file in batches.
+        
+        Parameters
+        ----------
+        kind : str
+            Kind of check the result is of
+        filestat : os.stat_result
+            Stat of the file
+        result : str
+            Result to store
+        """
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO file_results VALUES (?, ?, ?, ?, ?, ?)", (kind, filestat.st_dev, filestat.st_ino, filestat.st_size, filestat.st_mtime_ns, result))
+            self.number_of_changes += 1
+            if self.number_of_changes >= VIPFileCache.COMMIT_INTERVAL:
+                self.connection.commit()
+                self.number_of_changes = 0
+    
+    
+    def close(self):
+        """Writes the remaining results to the cache file and closes it."""
+        with self.lock:
+            try:
+                self.connection.commit()
+            except sqlite3.Error as sqle:
+                print(f"[ERROR]: Could not write cache file {self.cache_file} ({sqle})")
+            self.connection.close()
@@ -0,0 +1,57 @@
+import hashlib
+import os
+from VIPFileCache import VIPFileCache
+
+class VIPFileFingerprinter:
+    FINGERPRINTED = "fingerprinted"
+    UNREADABLE = "unreadable"
+    FINGERPRINT_BLOCK_SIZE = 65536
+    
+    def __init__(self, filecache=None):
+        """Initializes the fingerprinter that identifies files by their contents.
+        
+        Parameters
+        ----------
+        filecache : VIPFileCache
+            Cache to keep the fingerprints in (a new in memory cache is made if not supplied)
+        """
+        if filecache is None:
+            filecache = VIPFileCache()
+        self.file_cache = filecache
+    
+    
+    def fingerprint_file(self, filepath):
+        """Computes the fingerprint of a file from its size and the first and last 64KB.
+        
+        Only two positioned reads are done per file. Fingerprints are cached by device, inode, size
+        and modification time.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file to fingerprint
+        
+        Returns
+        -------
+        tuple
+            Status (fingerprinted or unreadable) and the fingerprint (None if unreadable)
+        """
+        try:
+            filedesc = os.open(filepath, os.O_RDONLY)
+        except (OSError, ValueError):
+            return (VIPFileFingerprinter.UNREADABLE, None)
+        try:
+            filestat = os.fstat(filedesc)
+            fingerprint = self.file_cache.get_result("fingerprint", filestat)
+            if fingerprint is None:
+                filehash = hashlib.blake2b(str(filestat.st_size).encode(), digest_size=16)
+                filehash.update(os.pread(filedesc, VIPFileFingerprinter.FINGERPRINT_BLOCK_SIZE, 0))
+                if filestat.st_size > VIPFileFingerprinter.FINGERPRINT_BLOCK_SIZE:
+                    filehash.update(os.pread(filedesc, VIPFileFingerprinter.FINGERPRINT_BLOCK_SIZE, max(filestat.st_size - VIPFileFingerprinter.FINGERPRINT_BLOCK_SIZE, VIPFileFingerprinter.FINGERPRINT_BLOCK_SIZE)))
+                fingerprint = f"{filestat.st_size}:{filehash.hexdigest()}"
+                self.file_cache.set_result("fingerprint", filestat, fingerprint)
+            return (VIPFileFingerprinter.FINGERPRINTED, fingerprint)
+        except OSError:
+            return (VIPFileFingerprinter.UNREADABLE, None)
+        finally:
+            os.close(filedesc)
@@ -0,0 +1,368 @@
+import os
+import stat
+import threading
+import time
+import zlib
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError
+
+class VIPFileInspector:
+    INTEGRITY_MODES = ["none", "quick", "deep"]
+    INTEGRITY_OK = "ok"
+    INTEGRITY_CORRUPT = "corrupt"
+    INTEGRITY_UNREADABLE = "unreadable"
+    INTEGRITY_TIMEOUT = "timeout"
+    DEEP_CHECK_STARTED = "deep_check_started"
+    DEEP_CHECK_SKIPPED = "deep_check_skipped"
+    INSPECTED = "inspected"
+    
+    EXTENSION_FILE_FORMATS = {
+        "cram": "CRAM",
+        "bam": "BAM",
+        "sam": "SAM",
+        "vcf": "VCF",
+        "gvcf": "VCF",
+        "bcf": "BCF",
+        "fastq": "FASTQ",
+        "fq": "FASTQ"
+    }
+    SAM_HEADER_TAGS = [b"@HD\t", b"@SQ\t", b"@RG\t", b"@PG\t", b"@CO\t"]
+    SNIFF_READ_SIZE = 65536
+    
+    COMPRESSED_FILE_EXTENSIONS = ["gz", "bgz", "bam", "bcf"]
+    GZIP_MAGIC = b"\x1f\x8b\x08"
+    BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+    DECOMPRESS_CHUNK_SIZE = 1048576
+    
+    def __init__(self, integritymode="none", sniffformats=False, numprocesses=None, deepchecktimeout=600.0):
+        """Initializes the inspector that checks the contents of files.
+        
+        Parameters
+        ----------
+        integritymode : str
+            How to check compressed files: none, quick (gzip header and BGZF end of file marker)
+            or deep (quick and decompressing the whole file on a process pool)
+        sniffformats : bool
+            Whether to determine the format of files from their first bytes
+        numprocesses : int
+            Number of processes to decompress files with in deep mode (number of CPUs if not supplied)
+        deepchecktimeout : float
+            Maximum number of seconds the deep check of a file may take, counted from when it was started
+            in the background (also the maximum time to wait for all deep checks started together)
+        """
+        self.integrity_mode = integritymode
+        self.sniff_formats = sniffformats
+        self.num_processes = numprocesses
+        self.deep_check_timeout = deepchecktimeout
+        self.deep_check_lock = threading.Lock()
+        self.process_pool = None
+        self.inspect_cache = {}
+        self.deep_checks = {}
+        self.deep_check_start_times = {}
+    
+    
+    def is_compressed_file(self, filepath):
+        """Returns whether a file is expected to be gzip/BGZF compressed based on its extension.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file
+        
+        Returns
+        -------
+        bool
+            True if the file should be compressed, False if not
+        """
+        return filepath.split(".")[-1] in VIPFileInspector.COMPRESSED_FILE_EXTENSIONS
+    
+    
+    def needs_inspection(self, filepath):
+        """Returns whether the contents of a file need to be inspected with the set checks.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file
+        
+        Returns
+        -------
+        bool
+            True if the file should be inspected, False if not
+        """
+        return self.sniff_formats or (self.integrity_mode != "none" and self.is_compressed_file(filepath))
+    
+    
+    def inspect_file(self, filepath):
+        """Inspects the start (and for BGZF files the end) of a file with at most two small reads.
+        
+        The first bytes of the file are read once and used to determine the file format (if set) and
+        to check the gzip header of compressed files (if set). BGZF files should end with the 28 byte BGZF
+        end of file marker, which is missing if the file was not completely written or copied.
+        Results are cached by path, size and modification time.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file to inspect
+        
+        Returns
+        -------
+        tuple
+            Status (inspected or unreadable), file format (None if unknown), integrity status and
+            a description of the integrity problem (None if ok)
+        """
+        try:
+            filedesc = os.open(filepath, os.O_RDONLY)
+        except (OSError, ValueError):
+            return (VIPFileInspector.INTEGRITY_UNREADABLE, None, VIPFileInspector.INTEGRITY_UNREADABLE, None)
+        try:
+            filestat = os.fstat(filedesc)
+            cachekey = (filepath, filestat.st_size, filestat.st_mtime_ns)
+            if cachekey not in self.inspect_cache:
+                fileheader = os.pread(filedesc, VIPFileInspector.SNIFF_READ_SIZE if self.sniff_formats else 18, 0)
+                fileformat = self.sniff_file_format(fileheader) if self.sniff_formats else None
+                integrityresult = (VIPFileInspector.INTEGRITY_OK, None)
+                if self.integrity_mode != "none" and self.is_compressed_file(filepath):
+                    integrityresult = self.check_gzip_header_and_eof(filedesc, filepath, filestat.st_size, fileheader)
+                self.inspect_cache[cachekey] = (VIPFileInspector.INSPECTED, fileformat) + integrityresult
+            return self.inspect_cache[cachekey]
+        except OSError:
+            return (VIPFileInspector.INTEGRITY_UNREADABLE, None, VIPFileInspector.INTEGRITY_UNREADABLE, None)
+        finally:
+            os.close(filedesc)
+    
+    
+    def sniff_file_format(self, fileheader):
+        """Determines the format of a file from its first bytes.
+        
+        For gzip/BGZF compressed files the first block is decompressed (the first BGZF block is at
+        most 64KB, so it is part of the read bytes).
+        
+        Parameters
+        ----------
+        fileheader : bytes
+            First bytes of the file
+        
+        Returns
+        -------
+        str
+            File format (CRAM, BAM, BCF, VCF, SAM or FASTQ), None if the format could not be determined
+        """
+        if fileheader.startswith(b"CRAM"):
+            return "CRAM"
+        if fileheader.startswith(VIPFileInspector.GZIP_MAGIC):
+            try:
+                fileheader = zlib.decompressobj(31).decompress(fileheader, 4096)
+            except zlib.error:
+                return None
+        
+        if fileheader.startswith(b"BAM\x01"):
+            return "BAM"
+        if fileheader.startswith(b"BCF\x02"):
+            return "BCF"
+        if fileheader.startswith(b"##fileformat=VCF"):
+            return "VCF"
+        if fileheader[:4] in VIPFileInspector.SAM_HEADER_TAGS:
+            return "SAM"
+        if fileheader.startswith(b"@"):
+            # FASTQ records have a line starting with + as third line
+            recordlines = fileheader.split(b"\n", 3)
+            if len(recordlines) > 2 and recordlines[2].startswith(b"+"):
+                return "FASTQ"
+        return None
+    
+    
+    def get_extension_file_format(self, filepath):
+        """Returns the file format indicated by the extension of a file (compression extensions are skipped).
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file
+        
+        Returns
+        -------
+        str
+            File format indicated by the extension, None if the extension is not known
+        """
+        fileexts = filepath.split("/")[-1].split(".")
+        if len(fileexts) > 2 and fileexts[-1] in ["gz", "bgz"]:
+            return VIPFileInspector.EXTENSION_FILE_FORMATS.get(fileexts[-2])
+        if len(fileexts) > 1:
+            return VIPFileInspector.EXTENSION_FILE_FORMATS.get(fileexts[-1])
+        return None
+    
+    
+    def check_gzip_header_and_eof(self, filedesc, filepath, filesize, fileheader):
+        """Checks the gzip header and, for BGZF files, the end of file marker of an opened file.
+        
+        Parameters
+        ----------
+        filedesc : int
+            File descriptor of the opened file
+        filepath : str
+            Path to the file
+        filesize : int
+            Size of the file in bytes
+        fileheader : bytes
+            First (at least 18) bytes of the file
+        
+        Returns
+        -------
+        tuple
+            Integrity status and a description of the problem (None if ok)
+        """
+        fileheader = fileheader[:18]
+        if not fileheader.startswith(VIPFileInspector.GZIP_MAGIC):
+            # BCF files do not have to be compressed
+            if filepath.endswith(".bcf") and fileheader.startswith(b"BCF"):
+                return (VIPFileInspector.INTEGRITY_OK, None)
+            return (VIPFileInspector.INTEGRITY_CORRUPT, "not gzip compressed")
+        
+        # BGZF: FEXTRA flag set with a 'BC' subfield of length 2
+        if len(fileheader) == 18 and fileheader[3] & 4 and fileheader[12:14] == b"BC":
+            if filesize < len(VIPFileInspector.BGZF_EOF) or os.pread(filedesc, len(VIPFileInspector.BGZF_EOF), filesize - len(VIPFileInspector.BGZF_EOF)) != VIPFileInspector.BGZF_EOF:
+                return (VIPFileInspector.INTEGRITY_CORRUPT, "missing BGZF end of file marker, the file is probably truncated")
+        return (VIPFileInspector.INTEGRITY_OK, None)
+    
+    
+    def start_deep_checks(self, filepaths):
+        """Starts decompressing files on the process pool to check them completely.
+        
+        Files that are already checked (or being checked) are skipped, cancelled checks are started again.
+        
+        Parameters
+        ----------
+        filepaths : list of str
+            Paths of the compressed files to check
+        """
+        with self.deep_check_lock:
+            if self.process_pool is None:
+                self.process_pool = ProcessPoolExecutor(self.num_processes)
+            for filepath in filepaths:
+                if filepath not in self.deep_checks or self.deep_checks[filepath].cancelled():
+                    self.deep_checks[filepath] = self.process_pool.submit(VIPFileInspector.decompress_gzip_file, filepath)
+                    self.deep_check_start_times[filepath] = time.monotonic()
+    
+    
+    def start_deep_check_if_file(self, filepath):
+        """Starts the deep check of a file only if it is an existing, non empty regular file.
+        
+        Meant to be run as probe on the file prober, so the stat is done with its timeouts.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path of the compressed file
+        
+        Returns
+        -------
+        tuple
+            Status (deep_check_started or deep_check_skipped) and None
+        """
+        try:
+            filestat = os.stat(filepath)
+        except (OSError, ValueError):
+            return (VIPFileInspector.DEEP_CHECK_SKIPPED, None)
+        if not stat.S_ISREG(filestat.st_mode) or filestat.st_size == 0:
+            return (VIPFileInspector.DEEP_CHECK_SKIPPED, None)
+        self.start_deep_checks([filepath])
+        return (VIPFileInspector.DEEP_CHECK_STARTED, None)
+    
+    
+    def get_deep_check_result(self, filepath):
+        """Returns the result of decompressing a file, waiting at most until the deep check timeout has passed.
+        
+        The timeout counts from the start of the deep check in the background, so files that are checked
+        at the same time are waited for together and a hanging file does not stall every next file.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path of the compressed file
+        
+        Returns
+        -------
+        tuple
+            Integrity status (timeout if not done in time) and a description of the problem (None if ok)
+        """
+        self.start_deep_checks([filepath])
+        with self.deep_check_lock:
+            if filepath not in self.deep_checks:
+                # Cancelled by another thread right after starting it, the file is not reported
+                return (VIPFileInspector.INTEGRITY_UNREADABLE, None)
+            deepcheck = self.deep_checks[filepath]
+            deadline = self.deep_check_start_times[filepath] + self.deep_check_timeout
+        try:
+            return deepcheck.result(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            return (VIPFileInspector.INTEGRITY_TIMEOUT, None)
+        except CancelledError:
+            # Cancelled by another thread while waiting, the file is not reported
+            return (VIPFileInspector.INTEGRITY_UNREADABLE, None)
+    
+    
+    def cancel_deep_checks(self):
+        """Cancels the deep checks that have not started yet, so they are started again when needed later."""
+        with self.deep_check_lock:
+            for filepath in list(self.deep_checks):
+                if self.deep_checks[filepath].cancel():
+                    del self.deep_checks[filepath]
+                    del self.deep_check_start_times[filepath]
+    
+    
+    @staticmethod
+    def decompress_gzip_file(filepath):
+        """Decompresses a complete (multi member) gzip file in chunks to check that it is not corrupt or truncated.
+        
+        Only one chunk of compressed and decompressed data is kept in memory at a time.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the gzip file
+        
+        Returns
+        -------
+        tuple
+            Integrity status and a description of the problem (None if ok)
+        """
+        decompressor = zlib.decompressobj(31)
+        inmember = False
+        try:
+            with open(filepath, "rb") as gzipfile:
+                # Files that are not gzip compressed at all are already reported by the quick check
+                if not gzipfile.read(3) == VIPFileInspector.GZIP_MAGIC:
+                    return (VIPFileInspector.INTEGRITY_OK, None)
+                gzipfile.seek(0)
+                while True:
+                    compresseddata = gzipfile.read(VIPFileInspector.DECOMPRESS_CHUNK_SIZE)
+                    if not compresseddata:
+                        break
+                    while compresseddata:
+                        inmember = True
+                        decompressor.decompress(compresseddata, VIPFileInspector.DECOMPRESS_CHUNK_SIZE)
+                        if decompressor.eof:
+                            compresseddata = decompressor.unused_data
+                            decompressor = zlib.decompressobj(31)
+                            inmember = False
+                        else:
+                            compresseddata = decompressor.unconsumed_tail
+            if inmember:
+                # Output that did not fit in the last chunk may still be pending
+                while not decompressor.eof and decompressor.decompress(decompressor.unconsumed_tail, VIPFileInspector.DECOMPRESS_CHUNK_SIZE):
+                    pass
+        except zlib.error as ze:
+            return (VIPFileInspector.INTEGRITY_CORRUPT, f"decompression failed: {ze}")
+        except OSError:
+            return (VIPFileInspector.INTEGRITY_UNREADABLE, None)
+        if inmember and not decompressor.eof:
+            return (VIPFileInspector.INTEGRITY_CORRUPT, "unexpected end of file, the file is probably truncated")
+        return (VIPFileInspector.INTEGRITY_OK, None)
+    
+    
+    def close(self):
+        """Stops the process pool, deep checks that have not started yet are cancelled."""
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=True, cancel_futures=True)
+            self.process_pool = None
@@ -0,0 +1,610 @@
+import os
+import re
+import stat
+import time
+import threading
+from collections import deque
+from VIPPathCanonicalizer import VIPPathCanonicalizer
+
+class VIPFileProber:
+    PROBE_FILE = "file"
+    PROBE_NOT_FILE = "not_file"
+    PROBE_TIMEOUT = "timeout"
+    PROBE_MOUNT_UNAVAILABLE = "mount_unavailable"
+    PROBE_DANGLING_LINK = "dangling_link"
+    PROBE_NOT_STARTED = "not_started"
+    PROBE_ERROR = "error"
+    
+    INITIAL_MOUNT_LIMIT = 4
+    READ_PROBE_LIMIT = 4
+    MIN_SLOW_LATENCY = 0.005
+    SLOW_LATENCY_FACTOR = 4
+    OCTAL_ESCAPE = re.compile(r"\\([0-7]{3})")
+    
+    def __init__(self, timeout=10.0, maxtimeouts=3, numworkers=8, maxworkers=32, readtimeout=60.0):
+        """Initializes the prober that checks files on worker threads.
+        
+        Each file is checked (stat) on a worker thread so a hanging filesystem (for example a stale
+        network mount) can not block the checker. A file that is not checked within the timeout is
+        reported as timed out. After a number of timeouts on the same mount point, the files on that
+        mount point are no longer checked at all (circuit breaker).
+        
+        Next to the stat of a file, other small checks that read a file can be registered as probe
+        (see register_probe()) so they are run on the same threads. These read probes have their own
+        timeout, which does not count towards the timeouts of the mount point.
+        
+        Files are queued per mount point and probe, and each queue has its own limit of concurrent checks.
+        For stats the limit is raised by one per round of fast checks and halved when checks become slow
+        (AIMD), so fast local disks get more concurrent checks than a busy network filesystem. Read probes
+        have a fixed limit per mount point, as their latency depends on the amount of data read.
+        
+        Parameters
+        ----------
+        timeout : float
+            Maximum number of seconds to wait for the check of a single file
+        maxtimeouts : int
+            Number of timeouts after which a mount point is no longer checked
+        numworkers : int
+            Number of worker threads to start with
+        maxworkers : int
+            Maximum number of worker threads (a new worker is started for each worker stuck on a timed out file)
+        readtimeout : float
+            Maximum number of seconds to wait for a single read probe (for example reading a header)
+        """
+        self.timeout = timeout
+        self.read_timeout = readtimeout
+        self.max_timeouts = maxtimeouts
+        self.initial_workers = numworkers
+        self.max_workers = maxworkers
+        self.number_of_workers = 0
+        self.workers = []
+        self.stopped = False
+        self.condition = threading.Condition()
+        self.path_canonicalizer = VIPPathCanonicalizer()
+        self.probe_functions = {"stat": self.stat_file}
+        self.canonical_probes = set()
+        self.canonical_results = {}
+        self.probe_events = {}
+        self.probe_results = {}
+        self.probe_start_times = {}
+        self.queue_progress = {}
+        self.mount_points = self.read_mount_points()
+        self.mount_point_cache = {}
+        self.probe_queues = {}
+        self.queue_active = {}
+        self.mount_limits = {}
+        self.mount_min_latency = {}
+        self.mount_last_decrease = {}
+        self.mount_probes = {}
+        self.mount_timeouts = {}
+        self.unavailable_mounts = set()
+        self.next_queue_index = 0
+    
+    
+    def read_mount_points(self, path_to_mounts="/proc/self/mounts"):
+        """Reads the mount points of the system, longest mount point first.
+        
+        Parameters
+        ----------
+        path_to_mounts : str
+            Path to the mounts file to read
+        
+        Returns
+        -------
+        mountpoints : list of str
+            List of mount points sorted from longest to shortest
+        """
+        mountpoints = ["/"]
+        try:
+            with open(path_to_mounts, "r") as mountsfile:
+                for mountline in mountsfile:
+                    mountfields = mountline.split(" ")
+                    if len(mountfields) > 1:
+                        # Spaces and other special characters are escaped as octal values (\040), other characters are kept as is
+                        mountpoints.append(VIPFileProber.OCTAL_ESCAPE.sub(lambda oe: chr(int(oe.group(1), 8)), mountfields[1]))
+        except (IOError, UnicodeError):
+            pass
+        return sorted(set(mountpoints), key=len, reverse=True)
+    
+    
+    def get_mount_point(self, filepath):
+        """Returns the mount point a file is on, based on its path only (the filesystem is not accessed).
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file
+        
+        Returns
+        -------
+        str
+            Mount point of the file
+        """
+        filedir = os.path.dirname(os.path.abspath(filepath))
+        if filedir not in self.mount_point_cache:
+            for mountpoint in self.mount_points:
+                if filedir == mountpoint or filedir.startswith(mountpoint.rstrip("/") + "/"):
+                    self.mount_point_cache[filedir] = mountpoint
+                    break
+            else:
+                self.mount_point_cache[filedir] = "/"
+        return self.mount_point_cache[filedir]
+    
+    
+    def register_probe(self, probename, probefunction, canonical=False):
+        """Registers a function to check files with on the worker threads.
+        
+        Parameters
+        ----------
+        probename : str
+            Name to queue files and get results for the probe with
+        probefunction : function
+            Function that receives the path of a file and returns a tuple with a status as first value
+        canonical : bool
+            Whether the function only depends on the contents of the file, so it is run once per physical
+            file (with the canonical path) instead of once per path
+        """
+        self.probe_functions[probename] = probefunction
+        if canonical:
+            self.canonical_probes.add(probename)
+    
+    
+    def start_worker(self):
+        """Starts a new worker thread if the maximum number of workers is not reached yet."""
+        if self.number_of_workers < self.max_workers:
+            # Daemon threads so a worker stuck on a hanging filesystem does not keep the program from exiting
+            worker = threading.Thread(target=self.run_worker, daemon=True)
+            worker.start()
+            self.workers.append(worker)
+            self.number_of_workers += 1
+    
+    
+    def run_worker(self):
+        """Checks the queued files until the prober is closed. A probe that raises an exception gets an error result."""
+        while True:
+            with self.condition:
+                probekey, queuekey = self.get_next_probe()
+                while probekey is None:
+                    if self.stopped:
+                        return
+                    self.condition.wait()
+                    probekey, queuekey = self.get_next_probe()
+                self.queue_active[queuekey] += 1
+                starttime = time.monotonic()
+                self.probe_start_times[probekey] = starttime
+                self.queue_progress[queuekey] = starttime
+            
+            try:
+                proberesult = self.run_probe(probekey[0], probekey[1])
+            except Exception as pe:
+                # Keep the worker alive, an unexpected error in a probe should only affect the file it checks
+                print(f"[ERROR]: Could not check file {probekey[1]} ({probekey[0]}): {pe}")
+                proberesult = (VIPFileProber.PROBE_ERROR, None)
+            latency = time.monotonic() - starttime
+            
+            with self.condition:
+                self.queue_active[queuekey] -= 1
+                self.queue_progress[queuekey] = time.monotonic()
+                del self.probe_start_times[probekey]
+                # Only stats are a measure of the responsiveness of the mount point
+                if probekey[0] == "stat":
+                    self.adjust_mount_limit(queuekey[0], latency)
+                self.set_probe_result(probekey, proberesult)
+                self.condition.notify_all()
+    
+    
+    def run_probe(self, probename, filepath):
+        """Runs a probe for a file on the current worker thread.
+        
+        For a canonical probe the symbolic links in the path are resolved first. If the physical file is
+        already being checked by another worker (through another path), its result is waited for and shared,
+        at most for the rest of the read timeout of this check.
+        
+        Parameters
+        ----------
+        probename : str
+            Name of the probe to run
+        filepath : str
+            Path to the file to check
+        
+        Returns
+        -------
+        tuple
+            Result of the probe
+        """
+        if probename not in self.canonical_probes:
+            return self.probe_functions[probename](filepath)
+        try:
+            canonicalstatus, canonicalpath, filestat = self.path_canonicalizer.canonicalize_path(filepath)
+        except (OSError, ValueError):
+            canonicalstatus, canonicalpath = (VIPPathCanonicalizer.NOT_FOUND, filepath)
+        if canonicalstatus != VIPPathCanonicalizer.RESOLVED:
+            # Not shared, the probe itself reports the file as unreadable
+            return self.probe_functions[probename](filepath)
+        
+        with self.condition:
+            sharedprobe = self.canonical_results.get((probename, canonicalpath))
+            isowner = sharedprobe is None
+            if isowner:
+                sharedprobe = [threading.Event(), (VIPFileProber.PROBE_ERROR, None)]
+                self.canonical_results[(probename, canonicalpath)] = sharedprobe
+        if isowner:
+            try:
+                sharedprobe[1] = self.probe_functions[probename](canonicalpath)
+            finally:
+                sharedprobe[0].set()
+        else:
+            with self.condition:
+                starttime = self.probe_start_times.get((probename, filepath), time.monotonic())
+            if not sharedprobe[0].wait(max(starttime + self.read_timeout - time.monotonic(), 0)):
+                return (VIPFileProber.PROBE_TIMEOUT, None)
+        return sharedprobe[1]
+    
+    
+    def get_next_probe(self):
+        """Returns the next file to check from a queue that is below its concurrency limit.
+        
+        The queues (per mount point and probe) are visited in turn so one mount point or probe with many
+        files can not starve the others. Must be called while holding the condition lock.
+        
+        Returns
+        -------
+        tuple
+            Probe name and path of the file to check and its queue (mount point and probe name),
+            (None, None) if no file can be checked now
+        """
+        queuekeys = list(self.probe_queues)
+        for qi in range(len(queuekeys)):
+            queuekey = queuekeys[(self.next_queue_index + qi) % len(queuekeys)]
+            if len(self.probe_queues[queuekey]) > 0 and self.queue_active[queuekey] < self.get_queue_limit(queuekey):
+                self.next_queue_index = (self.next_queue_index + qi + 1) % len(queuekeys)
+                return self.probe_queues[queuekey].popleft(), queuekey
+        return None, None
+    
+    
+    def get_queue_limit(self, queuekey):
+        """Returns the number of concurrent checks allowed for a queue.
+        
+        Must be called while holding the condition lock.
+        
+        Parameters
+        ----------
+        queuekey : tuple
+            Mount point and probe name of the queue
+        
+        Returns
+        -------
+        int
+            Concurrency limit of the queue
+        """
+        if queuekey[1] == "stat":
+            return int(self.mount_limits[queuekey[0]])
+        return VIPFileProber.READ_PROBE_LIMIT
+    
+    
+    def start_needed_workers(self):
+        """Starts workers until there is one for every check the queues with work allow (up to the maximum).
+        
+        Must be called while holding the condition lock.
+        """
+        neededworkers = sum(self.get_queue_limit(qk) for qk in self.probe_queues if len(self.probe_queues[qk]) > 0 or self.queue_active[qk] > 0)
+        while self.number_of_workers < min(neededworkers, self.max_workers):
+            self.start_worker()
+    
+    
+    def adjust_mount_limit(self, mountpoint, latency):
+        """Adjusts the concurrency limit of a mount point based on the latency of a file check.
+        
+        A check is slow if it takes more than SLOW_LATENCY_FACTOR times the fastest check seen on the mount
+        point (and more than MIN_SLOW_LATENCY seconds). A fast check raises the limit by 1/limit, so by about
+        one per round of checks; a slow check halves the limit, at most once per round.
+        Must be called while holding the condition lock.
+        
+        Parameters
+        ----------
+        mountpoint : str
+            Mount point the file was checked on
+        latency : float
+            Number of seconds the check took
+        """
+        self.mount_probes[mountpoint] += 1
+        minlatency = min(self.mount_min_latency.get(mountpoint, latency), latency)
+        self.mount_min_latency[mountpoint] = minlatency
+        
+        if latency > max(minlatency * VIPFileProber.SLOW_LATENCY_FACTOR, VIPFileProber.MIN_SLOW_LATENCY):
+            self.decrease_mount_limit(mountpoint)
+        else:
+            self.mount_limits[mountpoint] = min(self.mount_limits[mountpoint] + 1 / self.mount_limits[mountpoint], self.max_workers)
+            self.start_needed_workers()
+    
+    
+    def decrease_mount_limit(self, mountpoint):
+        """Halves the concurrency limit of a mount point, at most once per round of checks.
+        
+        Must be called while holding the condition lock.
+        
+        Parameters
+        ----------
+        mountpoint : str
+            Mount point to decrease the limit of
+        """
+        if self.mount_probes[mountpoint] - self.mount_last_decrease.get(mountpoint, -self.max_workers) >= int(self.mount_limits[mountpoint]):
+            self.mount_limits[mountpoint] = max(self.mount_limits[mountpoint] / 2, 1)
+            self.mount_last_decrease[mountpoint] = self.mount_probes[mountpoint]
+    
+    
+    def stat_file(self, filepath):
+        """Checks whether a path is a regular file and gets its size, modification time and canonical path.
+        
+        Symbolic links are resolved to the physical file, a symbolic link to a file that does not exist
+        is reported as dangling link.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file to check
+        
+        Returns
+        -------
+        tuple
+            Probe status, size and modification time (in nanoseconds) of the file (None if the path is not a file)
+            and the canonical path of the file (for a dangling link the path it points to, None if not found)
+        """
+        try:
+            canonicalstatus, canonicalpath, filestat = self.path_canonicalizer.canonicalize_path(filepath)
+        except (OSError, ValueError):
+            return (VIPFileProber.PROBE_NOT_FILE, None, None, None)
+        if canonicalstatus == VIPPathCanonicalizer.DANGLING_LINK:
+            return (VIPFileProber.PROBE_DANGLING_LINK, None, None, canonicalpath)
+        if canonicalstatus == VIPPathCanonicalizer.RESOLVED and stat.S_ISREG(filestat.st_mode):
+            return (VIPFileProber.PROBE_FILE, filestat.st_size, filestat.st_mtime_ns, canonicalpath)
+        return (VIPFileProber.PROBE_NOT_FILE, None, None, None)
+    
+    
+    def set_probe_result(self, probekey, proberesult):
+        """Saves the result of a file check and signals it is available.
+        
+        Must be called while holding the condition lock.
+        
+        Parameters
+        ----------
+        probekey : tuple
+            Probe name and path of the checked file
+        proberesult : tuple
+            Result of the probe, with the probe status as first value
+        """
+        self.probe_results[probekey] = proberesult
+        probeevent = self.probe_events.get(probekey)
+        if probeevent is not None:
+            probeevent.set()
+    
+    
+    def prefetch(self, filepaths, probename="stat"):
+        """Queues files to be checked in the background. Files that are already queued or checked are skipped.
+        
+        Parameters
+        ----------
+        filepaths : list of str
+            Paths of the files to check
+        probename : str
+            Name of the probe to check the files with
+        """
+        with self.condition:
+            if self.number_of_workers == 0:
+                for i in range(self.initial_workers):
+                    self.start_worker()
+            for filepath in filepaths:
+                probekey = (probename, filepath)
+                if probekey not in self.probe_events:
+                    self.probe_events[probekey] = threading.Event()
+                    mountpoint = self.get_mount_point(filepath)
+                    if mountpoint in self.unavailable_mounts:
+                        self.set_probe_result(probekey, (VIPFileProber.PROBE_MOUNT_UNAVAILABLE, None))
+                    else:
+                        if mountpoint not in self.mount_limits:
+                            self.mount_limits[mountpoint] = VIPFileProber.INITIAL_MOUNT_LIMIT
+                            self.mount_probes[mountpoint] = 0
+                        queuekey = (mountpoint, probename)
+                        if queuekey not in self.probe_queues:
+                            self.probe_queues[queuekey] = deque()
+                            self.queue_active[queuekey] = 0
+                        if len(self.probe_queues[queuekey]) == 0 and self.queue_active[queuekey] == 0:
+                            self.queue_progress[queuekey] = time.monotonic()
+                        self.probe_queues[queuekey].append(probekey)
+            self.start_needed_workers()
+            self.condition.notify_all()
+    
+    
+    def cancel_pending(self):
+        """Removes all files that are queued but not checked yet."""
+        with self.condition:
+            for queuekey in self.probe_queues:
+                while len(self.probe_queues[queuekey]) > 0:
+                    del self.probe_events[self.probe_queues[queuekey].popleft()]
+    
+    
+    def get_file_status(self, filepath):
+        """Returns whether a path is a file and its size, waiting at most the timeout for the check.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file to check
+        
+        Returns
+        -------
+        tuple
+            Probe status (file, not_file, dangling_link, timeout or mount_unavailable) and size of the file (None if unknown)
+        """
+        return self.get_probe_result("stat", filepath)[:2]
+    
+    
+    def get_file_modification_time(self, filepath):
+        """Returns the modification time of a file from the same check as get_file_status().
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file to check
+        
+        Returns
+        -------
+        int
+            Modification time of the file in nanoseconds, None if unknown
+        """
+        statresult = self.get_probe_result("stat", filepath)
+        return statresult[2] if len(statresult) > 2 else None
+    
+    
+    def get_canonical_path(self, filepath):
+        """Returns the path of the physical file (symbolic links resolved) from the same check as get_file_status().
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file to check
+        
+        Returns
+        -------
+        str
+            Canonical path of the file, for a dangling link the path it points to, the path as supplied if unknown
+        """
+        statresult = self.get_probe_result("stat", filepath)
+        return statresult[3] if len(statresult) > 3 and statresult[3] is not None else filepath
+    
+    
+    def get_probe_result(self, probename, filepath):
+        """Returns the result of a probe for a file, waiting at most the (stat or read) timeout for the check.
+        
+        The timeout starts when a worker starts the check. While the file is still queued, it is waited for
+        as long as the other checks in its queue make progress (a check started or finished within the
+        timeout), otherwise the check is reported as not started.
+        
+        Parameters
+        ----------
+        probename : str
+            Name of the probe to get the result of
+        filepath : str
+            Path to the file to check
+        
+        Returns
+        -------
+        tuple
+            Result of the probe, (timeout, None), (not_started, None) or (mount_unavailable, None) if the
+            file could not be checked
+        """
+        probekey = (probename, filepath)
+        self.prefetch([filepath], probename)
+        with self.condition:
+            if probekey not in self.probe_results and self.get_mount_point(filepath) in self.unavailable_mounts:
+                # Already being checked when its mount point stopped responding, do not wait for it
+                self.set_probe_result(probekey, (VIPFileProber.PROBE_MOUNT_UNAVAILABLE, None))
+        probeevent = self.probe_events[probekey]
+        probetimeout = self.timeout if probename == "stat" else self.read_timeout
+        queuekey = (self.get_mount_point(filepath), probename)
+        while not probeevent.is_set():
+            with self.condition:
+                currenttime = time.monotonic()
+                starttime = self.probe_start_times.get(probekey)
+                if starttime is None:
+                    starttime = self.queue_progress.get(queuekey, currenttime)
+                waittime = starttime + probetimeout - currenttime
+            if waittime <= 0:
+                break
+            probeevent.wait(waittime)
+        if not probeevent.is_set():
+            self.register_timeout(probekey)
+        return self.probe_results[probekey]
+    
+    
+    def register_timeout(self, probekey):
+        """Registers a timed out file check and stops checking its mount point after too many timed out stats.
+        
+        A check that was not started yet is reported as not started instead, without counting as timeout.
+        
+        Timed out read probes do not count towards the timeouts of the mount point, as reading a large
+        file can take long on a responsive mount point.
+        
+        Parameters
+        ----------
+        probekey : tuple
+            Probe name and path of the file for which the check timed out
+        """
+        mountpoint = self.get_mount_point(probekey[1])
+        with self.condition:
+            if probekey in self.probe_results:
+                return
+            if probekey not in self.probe_start_times:
+                # Never started because its queue is stuck, so it says nothing about the mount point
+                queuekey = (mountpoint, probekey[0])
+                if probekey in self.probe_queues.get(queuekey, ()):
+                    self.probe_queues[queuekey].remove(probekey)
+                self.set_probe_result(probekey, (VIPFileProber.PROBE_NOT_STARTED, None))
+                return
+            self.probe_results[probekey] = (VIPFileProber.PROBE_TIMEOUT, None)
+            if probekey[0] == "stat":
+                self.register_mount_timeout(mountpoint)
+            # The worker checking this file is probably stuck, so start a new one for the other mount points
+            self.start_worker()
+    
+    
+    def register_mount_timeout(self, mountpoint):
+        """Counts a timed out stat for a mount point and stops checking the mount point after too many.
+        
+        Must be called while holding the condition lock.
+        
+        Parameters
+        ----------
+        mountpoint : str
+            Mount point the stat timed out on
+        """
+        self.mount_timeouts[mountpoint] = self.mount_timeouts.get(mountpoint, 0) + 1
+        if mountpoint in self.mount_limits:
+            self.decrease_mount_limit(mountpoint)
+        if self.mount_timeouts[mountpoint] >= self.max_timeouts and mountpoint not in self.unavailable_mounts:
+            print(f"[ERROR]: Mount point {mountpoint} is not responding, files on it will not be checked")
+            self.unavailable_mounts.add(mountpoint)
+            # Files of this mount point still in the queues will not be checked anymore
+            for queuekey in self.probe_queues:
+                if queuekey[0] == mountpoint:
+                    while len(self.probe_queues[queuekey]) > 0:
+                        self.set_probe_result(self.probe_queues[queuekey].popleft(), (VIPFileProber.PROBE_MOUNT_UNAVAILABLE, None))
+    
+    
+    def close(self):
+        """Stops the workers after the files they are checking, files that are still queued are not checked.
+        
+        Workers are waited for at most the read timeout each, a worker stuck on a hanging filesystem is left
+        behind (as daemon thread it does not keep the program from exiting).
+        """
+        self.cancel_pending()
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+            workers = self.workers
+            self.workers = []
+        for worker in workers:
+            worker.join(self.read_timeout)
+    
+    
+    def get_unavailable_mounts(self):
+        """Returns the mount points that are no longer checked due to repeated timeouts.
+        
+        Returns
+        -------
+        self.unavailable_mounts : set of str
+            Mount points that are no longer checked
+        """
+        return self.unavailable_mounts
+    
+    
+    def get_mount_limits(self):
+        """Returns the current concurrency limit of each mount point.
+        
+        Returns
+        -------
+        dict
+            Concurrency limit per mount point
+        """
+        with self.condition:
+            return {mountpoint: int(self.mount_limits[mountpoint]) for mountpoint in self.mount_limits}
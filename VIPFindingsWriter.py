@@ -0,0 +1,102 @@
+import json
+
+class VIPFindingsWriter:
+    FINDINGS_FORMATS = ["jsonl", "tsv"]
+    FINDINGS_COLUMNS = ["samplesheet", "line", "column", "severity", "code", "message"]
+    
+    def __init__(self, path_to_findingsfile, findingsformat):
+        """Initializes the writer and opens the findings file.
+        
+        Each finding is written to the findings file as soon as it is reported, so nothing
+        is buffered other than the regular file buffer.
+        
+        Parameters
+        ----------
+        path_to_findingsfile : str
+            Path to write the findings file to
+        findingsformat : str
+            Format of the findings file (jsonl or tsv)
+        """
+        self.file_path = path_to_findingsfile
+        self.findings_format = findingsformat
+        self.number_of_findings = 0
+        self.findings_file = self.open_findings_file(path_to_findingsfile)
+    
+    
+    def open_findings_file(self, path_to_findingsfile):
+        """Opens the findings file and writes the header line if the format is tsv.
+        
+        Parameters
+        ----------
+        path_to_findingsfile : str
+            Path to the findings file to open
+        
+        Returns
+        -------
+        file object
+            The opened findings file, None if it could not be opened
+        """
+        try:
+            findingsfile = open(path_to_findingsfile, "w")
+            if self.findings_format == "tsv":
+                findingsfile.write("\t".join(VIPFindingsWriter.FINDINGS_COLUMNS) + "\n")
+            return findingsfile
+        except IOError:
+            print(f"[ERROR]: Could not open findings file {path_to_findingsfile}")
+        return None
+    
+    
+    def write_finding(self, samplesheetpath, linenumber, columnname, severity, code, message):
+        """Writes a single finding as one record to the findings file.
+        
+        Parameters
+        ----------
+        samplesheetpath : str
+            Path to the samplesheet the finding was reported for
+        linenumber : int
+            Line number of the sample with the finding (None for samplesheet findings)
+        columnname : str
+            Name of the column the finding is about
+        severity : str
+            Severity of the finding (error or info)
+        code : str
+            Code identifying the type of finding
+        message : str
+            The finding message
+        """
+        if self.findings_file is None:
+            return
+        try:
+            if self.findings_format == "tsv":
+                findingvalues = [samplesheetpath, "" if linenumber is None else str(linenumber), columnname, severity, code, message]
+                self.findings_file.write("\t".join([fv.replace("\t", " ").replace("\n", " ") for fv in findingvalues]) + "\n")
+            else:
+                self.findings_file.write(json.dumps({"samplesheet": samplesheetpath, "line": linenumber, "column": columnname, "severity": severity, "code": code, "message": message}) + "\n")
+            self.number_of_findings += 1
+        except IOError:
+            print(f"[ERROR]: Could not write to findings file {self.file_path}")
+            self.findings_file = None
+    
+    
+    def flush(self):
+        """Flushes the written findings so they can already be read by other tools."""
+        if self.findings_file is not None:
+            self.findings_file.flush()
+    
+    
+    def close(self):
+        """Closes the findings file."""
+        if self.findings_file is not None:
+            self.findings_file.close()
+            self.findings_file = None
+    
+    
+    def get_number_of_findings(self):
+        """Returns the number of findings written to the findings file.
+        
+        Returns
+        -------
+        self.number_of_findings : int
+            Number of written findings
+        """
+        return self.number_of_findings
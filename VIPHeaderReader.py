@@ -0,0 +1,538 @@
+import bz2
+import lzma
+import os
+import re
+import zlib
+
+class VIPHeaderReader:
+    HEADER_READ = "read"
+    HEADER_UNREADABLE = "unreadable"
+    GZIP_MAGIC = b"\x1f\x8b\x08"
+    READ_CHUNK_SIZE = 65536
+    MAX_HEADER_BYTES = 8388608
+    
+    CRAM_FILE_DEFINITION_SIZE = 26
+    CRAM_CONTAINER_HEADER_SIZE = 128
+    CRAM_BLOCK_DECOMPRESSORS = {
+        0: lambda blockdata: blockdata,
+        1: lambda blockdata: zlib.decompress(blockdata, 31),
+        2: bz2.decompress,
+        3: lzma.decompress
+    }
+    
+    # Lengths of chromosomes 1, 2 and X (contig names without a chr prefix) per assembly
+    ASSEMBLY_FINGERPRINTS = {
+        "GRCh37": {"1": 249250621, "2": 243199373, "X": 155270560},
+        "GRCh38": {"1": 248956422, "2": 242193529, "X": 156040895},
+        "T2T": {"1": 248387328, "2": 242696752, "X": 154259566}
+    }
+    ASSEMBLY_REFERENCE_NAMES = {
+        "GRCh37": ["grch37", "hg19", "b37", "hs37"],
+        "GRCh38": ["grch38", "hg38", "hs38"],
+        "T2T": ["t2t", "chm13"]
+    }
+    
+    SAM_HEADER_TAGS = [b"@HD\t", b"@SQ\t", b"@RG\t", b"@PG\t", b"@CO\t"]
+    # Sampled on the prober threads: zlib releases the GIL while decompressing and the cap keeps the CPU
+    # time per file in the milliseconds, less than sending the work to another process would cost
+    FASTQ_SAMPLE_RECORDS = 1000
+    FASTQ_SAMPLE_BYTES = 4194304
+    FASTQ_PAIR_READ_NAMES = 100
+    # Read name formats per platform: Illumina (CASAVA 1.8 and older), PacBio movie names and nanopore read UUIDs
+    FASTQ_READ_NAME_FORMATS = {
+        "illumina": re.compile(rb"^@[\w-]+:\d+:[\w-]+:\d+:\d+:\d+:\d+(\s|$)|^@[\w-]+:\d+:\d+:\d+:\d+#"),
+        "pacbio_hifi": re.compile(rb"^@m\d+\w*_\d{6}_\d{6}(_s\d)?/\d+/ccs"),
+        "nanopore": re.compile(rb"^@[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(\s|$)")
+    }
+    SHORT_READ_PLATFORMS = ["illumina"]
+    LONG_READ_PLATFORMS = ["nanopore", "pacbio_hifi"]
+    MAX_SHORT_READ_LENGTH = 600
+    MIN_LONG_READ_LENGTH = 1000
+    
+    def __init__(self, maxheaderbytes=MAX_HEADER_BYTES):
+        """Initializes the reader that reads only the headers of data files.
+        
+        Parameters
+        ----------
+        maxheaderbytes : int
+            Maximum number of (decompressed) bytes to read from a file to find its header
+        """
+        self.max_header_bytes = maxheaderbytes
+        self.header_cache = {}
+    
+    
+    def read_file_header(self, filepath):
+        """Reads the header of a (compressed) VCF, BCF, SAM, BAM or CRAM file, or the first reads of a (compressed) FASTQ file.
+        
+        Only the header is read, reading stops at the end of the header (for VCF files the #CHROM line)
+        or when the maximum number of header bytes is reached. For FASTQ files only the first records are
+        read, up to a maximum number of records and bytes. Results are cached by path, size and
+        modification time.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file to read the header of
+        
+        Returns
+        -------
+        tuple
+            Status (read or unreadable) and a dict with the header information (None if not read)
+        """
+        try:
+            with open(filepath, "rb") as datafile:
+                filestat = os.fstat(datafile.fileno())
+                cachekey = (filepath, filestat.st_size, filestat.st_mtime_ns)
+                if cachekey not in self.header_cache:
+                    filestart = datafile.read(VIPHeaderReader.CRAM_FILE_DEFINITION_SIZE)
+                    if filestart.startswith(b"CRAM"):
+                        headerinfo = self.read_cram_header(datafile, filestart)
+                    else:
+                        datafile.seek(0)
+                        headerinfo = self.parse_header(self.read_decompressed_chunks(datafile))
+                    self.header_cache[cachekey] = (VIPHeaderReader.HEADER_READ, headerinfo)
+                return self.header_cache[cachekey]
+        except (OSError, ValueError, IndexError, EOFError, zlib.error, lzma.LZMAError):
+            return (VIPHeaderReader.HEADER_UNREADABLE, None)
+    
+    
+    def read_decompressed_chunks(self, datafile):
+        """Reads a plain or gzip/BGZF compressed file in decompressed chunks, up to the maximum number of header bytes.
+        
+        Parameters
+        ----------
+        datafile : file object
+            Opened file (binary mode) to read from
+        
+        Yields
+        ------
+        bytes
+            Next chunk of decompressed data
+        """
+        filedata = datafile.read(VIPHeaderReader.READ_CHUNK_SIZE)
+        iscompressed = filedata.startswith(VIPHeaderReader.GZIP_MAGIC)
+        decompressor = zlib.decompressobj(31)
+        numbytes = 0
+        while filedata and numbytes < self.max_header_bytes:
+            if iscompressed:
+                decompresseddata = decompressor.decompress(filedata, VIPHeaderReader.READ_CHUNK_SIZE)
+                if decompressor.eof:
+                    # Next gzip member (every BGZF block is a gzip member)
+                    filedata = decompressor.unused_data
+                    decompressor = zlib.decompressobj(31)
+                else:
+                    filedata = decompressor.unconsumed_tail
+                if not filedata:
+                    filedata = datafile.read(VIPHeaderReader.READ_CHUNK_SIZE)
+            else:
+                decompresseddata = filedata
+                filedata = datafile.read(VIPHeaderReader.READ_CHUNK_SIZE)
+            numbytes += len(decompresseddata)
+            yield decompresseddata
+    
+    
+    def read_bytes(self, headerdata, datachunks, numbytes):
+        """Extends already read decompressed data with the next chunks until it has at least the requested size.
+        
+        Parameters
+        ----------
+        headerdata : bytes
+            Already read decompressed data
+        datachunks : generator of bytes
+            Remaining decompressed data of the file
+        numbytes : int
+            Requested number of bytes
+        
+        Returns
+        -------
+        headerdata : bytes
+            Read data, shorter than requested if the end of the data was reached
+        """
+        while len(headerdata) < numbytes:
+            nextchunk = next(datachunks, None)
+            if nextchunk is None:
+                break
+            headerdata += nextchunk
+        return headerdata
+    
+    
+    def parse_header(self, datachunks):
+        """Parses the header from the decompressed data of a file based on its format.
+        
+        Parameters
+        ----------
+        datachunks : generator of bytes
+            Decompressed data of the file
+        
+        Returns
+        -------
+        dict
+            Header information, None if the format is not supported
+        """
+        headerdata = self.read_bytes(b"", datachunks, 9)
+        if headerdata.startswith(b"BCF\x02"):
+            # BCF: magic (5 bytes), length of the text header (4 bytes) and the VCF text header
+            return self.parse_vcf_header(headerdata[9:], datachunks)
+        if headerdata.startswith(b"##fileformat=VCF") or headerdata.startswith(b"#CHROM"):
+            return self.parse_vcf_header(headerdata, datachunks)
+        if headerdata.startswith(b"BAM\x01"):
+            return self.parse_bam_header(headerdata, datachunks)
+        if headerdata[:4] in VIPHeaderReader.SAM_HEADER_TAGS:
+            return self.parse_sam_header("SAM", self.read_sam_header_lines(headerdata, datachunks))
+        if headerdata.startswith(b"@"):
+            return self.parse_fastq_reads(headerdata, datachunks)
+        return None
+    
+    
+    def parse_vcf_header(self, headerdata, datachunks):
+        """Parses the VCF header lines up to and including the #CHROM line.
+        
+        Parameters
+        ----------
+        headerdata : bytes
+            Already read decompressed data at the start of the header
+        datachunks : generator of bytes
+            Remaining decompressed data of the file
+        
+        Returns
+        -------
+        headerinfo : dict
+            Header information with the file format, the samples (None if the #CHROM line was not found),
+            the contigs with their lengths and the reference
+        """
+        headerinfo = {"format": "VCF", "samples": None, "contigs": {}, "reference": None}
+        for headerline in self.read_header_lines(headerdata, datachunks):
+            if headerline.startswith(b"##contig="):
+                contigid = re.search(rb"[<,]ID=([^,>]+)", headerline)
+                contiglength = re.search(rb"[<,]length=(\d+)", headerline)
+                if contigid is not None:
+                    headerinfo["contigs"][contigid.group(1).decode("utf-8", "replace")] = int(contiglength.group(1)) if contiglength is not None else None
+            elif headerline.startswith(b"##reference="):
+                headerinfo["reference"] = headerline[12:].rstrip(b"\r").decode("utf-8", "replace")
+            elif headerline.startswith(b"#CHROM"):
+                headerinfo["samples"] = [sn.decode("utf-8", "replace") for sn in headerline.rstrip(b"\r").split(b"\t")[9:]]
+                break
+            elif not headerline.startswith(b"#"):
+                break
+        return headerinfo
+    
+    
+    def parse_bam_header(self, headerdata, datachunks):
+        """Parses the SAM header text and the reference sequences of a decompressed BAM file.
+        
+        Parameters
+        ----------
+        headerdata : bytes
+            Already read decompressed data at the start of the file
+        datachunks : generator of bytes
+            Remaining decompressed data of the file
+        
+        Returns
+        -------
+        headerinfo : dict
+            Header information read from the SAM header text (the binary reference sequences are used
+            if the text has no @SQ lines)
+        """
+        # BAM: magic (4 bytes), length of the header text (4 bytes), the header text and the reference sequences
+        textlength = int.from_bytes(headerdata[4:8], "little")
+        headerdata = self.read_bytes(headerdata, datachunks, 12 + textlength)
+        headerinfo = self.parse_sam_header("BAM", headerdata[8:8 + textlength].split(b"\n"))
+        if headerinfo["contigs"] or len(headerdata) < 12 + textlength:
+            return headerinfo
+        
+        numrefs = int.from_bytes(headerdata[8 + textlength:12 + textlength], "little")
+        position = 12 + textlength
+        for refindex in range(numrefs):
+            headerdata = self.read_bytes(headerdata, datachunks, position + 4)
+            namelength = int.from_bytes(headerdata[position:position + 4], "little")
+            headerdata = self.read_bytes(headerdata, datachunks, position + 8 + namelength)
+            if len(headerdata) < position + 8 + namelength:
+                break
+            # Reference names are NUL terminated
+            refname = headerdata[position + 4:position + 3 + namelength].decode("utf-8", "replace")
+            headerinfo["contigs"][refname] = int.from_bytes(headerdata[position + 4 + namelength:position + 8 + namelength], "little")
+            position += 8 + namelength
+        return headerinfo
+    
+    
+    def read_cram_header(self, datafile, filestart):
+        """Reads the SAM header from the header container of a CRAM file.
+        
+        Only the file definition, the container header and the first block (containing the SAM header) are read.
+        
+        Parameters
+        ----------
+        datafile : file object
+            Opened file (binary mode), positioned after the file definition
+        filestart : bytes
+            File definition (magic, version and file id)
+        
+        Returns
+        -------
+        dict
+            Header information read from the SAM header, None if the header could not be decoded
+        """
+        majorversion = filestart[4]
+        containerdata = datafile.read(4)
+        containerlength = int.from_bytes(containerdata, "little")
+        containerdata += datafile.read(min(containerlength + VIPHeaderReader.CRAM_CONTAINER_HEADER_SIZE, self.max_header_bytes))
+        
+        # Container header: reference sequence id, start, span, number of records, record counter,
+        # number of bases, number of blocks, landmarks and (CRAM 3) a CRC32
+        position = 4
+        for fieldindex in range(4):
+            fieldvalue, position = VIPHeaderReader.read_itf8(containerdata, position)
+        for fieldindex in range(2):
+            if majorversion >= 2:
+                fieldvalue, position = VIPHeaderReader.read_ltf8(containerdata, position)
+            else:
+                fieldvalue, position = VIPHeaderReader.read_itf8(containerdata, position)
+        numblocks, position = VIPHeaderReader.read_itf8(containerdata, position)
+        numlandmarks, position = VIPHeaderReader.read_itf8(containerdata, position)
+        for landmarkindex in range(numlandmarks):
+            fieldvalue, position = VIPHeaderReader.read_itf8(containerdata, position)
+        if majorversion >= 3:
+            position += 4
+        
+        # Block: compression method, content type, content id, compressed size, raw size and the data
+        blockmethod = containerdata[position]
+        contentid, position = VIPHeaderReader.read_itf8(containerdata, position + 2)
+        compressedsize, position = VIPHeaderReader.read_itf8(containerdata, position)
+        rawsize, position = VIPHeaderReader.read_itf8(containerdata, position)
+        if blockmethod not in VIPHeaderReader.CRAM_BLOCK_DECOMPRESSORS or len(containerdata) < position + compressedsize:
+            return None
+        blockdata = VIPHeaderReader.CRAM_BLOCK_DECOMPRESSORS[blockmethod](containerdata[position:position + compressedsize])
+        textlength = int.from_bytes(blockdata[:4], "little")
+        return self.parse_sam_header("CRAM", blockdata[4:4 + textlength].split(b"\n"))
+    
+    
+    @staticmethod
+    def read_itf8(data, position):
+        """Decodes a CRAM ITF8 integer (1 to 5 bytes).
+        
+        Parameters
+        ----------
+        data : bytes
+            Data to decode the integer from
+        position : int
+            Position of the integer in the data
+        
+        Returns
+        -------
+        tuple
+            Decoded integer and the position after it
+        """
+        firstbyte = data[position]
+        if firstbyte < 0x80:
+            return (firstbyte, position + 1)
+        if firstbyte < 0xC0:
+            return (((firstbyte & 0x3F) << 8) | data[position + 1], position + 2)
+        if firstbyte < 0xE0:
+            return (((firstbyte & 0x1F) << 16) | int.from_bytes(data[position + 1:position + 3], "big"), position + 3)
+        if firstbyte < 0xF0:
+            return (((firstbyte & 0x0F) << 24) | int.from_bytes(data[position + 1:position + 4], "big"), position + 4)
+        return (((firstbyte & 0x0F) << 28) | (int.from_bytes(data[position + 1:position + 4], "big") << 4) | (data[position + 4] & 0x0F), position + 5)
+    
+    
+    @staticmethod
+    def read_ltf8(data, position):
+        """Decodes a CRAM LTF8 integer (1 to 9 bytes).
+        
+        Parameters
+        ----------
+        data : bytes
+            Data to decode the integer from
+        position : int
+            Position of the integer in the data
+        
+        Returns
+        -------
+        tuple
+            Decoded integer and the position after it
+        """
+        firstbyte = data[position]
+        # The number of leading 1 bits is the number of following bytes
+        numbytes = 0
+        while numbytes < 8 and firstbyte & (0x80 >> numbytes):
+            numbytes += 1
+        ltf8value = firstbyte & (0xFF >> (numbytes + 1)) if numbytes < 8 else 0
+        return ((ltf8value << (8 * numbytes)) | int.from_bytes(data[position + 1:position + 1 + numbytes], "big"), position + 1 + numbytes)
+    
+    
+    def parse_sam_header(self, fileformat, headerlines):
+        """Parses the lines of a SAM header.
+        
+        Parameters
+        ----------
+        fileformat : str
+            Format of the file the header was read from (SAM, BAM or CRAM)
+        headerlines : iterable of bytes
+            SAM header lines
+        
+        Returns
+        -------
+        headerinfo : dict
+            Header information with the file format, the read group samples (@RG SM), the contigs with
+            their lengths and the reference
+        """
+        headerinfo = {"format": fileformat, "samples": [], "contigs": {}, "reference": None}
+        for headerline in headerlines:
+            if not headerline.startswith(b"@SQ\t") and not headerline.startswith(b"@RG\t"):
+                continue
+            linefields = dict(lf.split(":", 1) for lf in headerline.rstrip(b"\r").decode("utf-8", "replace").split("\t")[1:] if ":" in lf)
+            if headerline.startswith(b"@RG\t"):
+                if "SM" in linefields and linefields["SM"] not in headerinfo["samples"]:
+                    headerinfo["samples"].append(linefields["SM"])
+                continue
+            if "SN" in linefields:
+                headerinfo["contigs"][linefields["SN"]] = int(linefields["LN"]) if linefields.get("LN", "").isdigit() else None
+            if headerinfo["reference"] is None:
+                headerinfo["reference"] = linefields.get("AS", linefields.get("UR"))
+        return headerinfo
+    
+    
+    def parse_fastq_reads(self, headerdata, datachunks):
+        """Parses the first records of a FASTQ file and infers the sequencing platform from them.
+        
+        Parameters
+        ----------
+        headerdata : bytes
+            Already read decompressed data at the start of the file
+        datachunks : generator of bytes
+            Remaining decompressed data of the file
+        
+        Returns
+        -------
+        headerinfo : dict
+            Read information with the file format, the names of the first reads (without /1 or /2), the
+            number of sampled reads, the minimum, median and maximum read length, the possible platforms
+            (None if unknown) and the reason for them
+        """
+        readnames = []
+        readlengths = []
+        readnameformats = dict.fromkeys(VIPHeaderReader.FASTQ_READ_NAME_FORMATS, 0)
+        numbytes = 0
+        recordlines = []
+        for fastqline in self.read_header_lines(headerdata, datachunks):
+            recordlines.append(fastqline.rstrip(b"\r"))
+            numbytes += len(fastqline) + 1
+            if len(recordlines) == 4:
+                if not recordlines[0].startswith(b"@") or not recordlines[2].startswith(b"+"):
+                    break
+                readlengths.append(len(recordlines[1]))
+                if len(readnames) < VIPHeaderReader.FASTQ_PAIR_READ_NAMES:
+                    readname = (recordlines[0][1:].split(maxsplit=1) or [b""])[0]
+                    if readname.endswith(b"/1") or readname.endswith(b"/2"):
+                        readname = readname[:-2]
+                    readnames.append(readname.decode("utf-8", "replace"))
+                for platform, readnameformat in VIPHeaderReader.FASTQ_READ_NAME_FORMATS.items():
+                    if readnameformat.match(recordlines[0]):
+                        readnameformats[platform] += 1
+                        break
+                recordlines = []
+                if len(readlengths) >= VIPHeaderReader.FASTQ_SAMPLE_RECORDS or numbytes >= VIPHeaderReader.FASTQ_SAMPLE_BYTES:
+                    break
+        
+        headerinfo = {"format": "FASTQ", "readnames": readnames, "numreads": len(readlengths), "platforms": None, "reason": None}
+        if not readlengths:
+            return headerinfo
+        readlengths.sort()
+        headerinfo["minlength"] = readlengths[0]
+        headerinfo["medianlength"] = readlengths[len(readlengths) // 2]
+        headerinfo["maxlength"] = readlengths[-1]
+        
+        # The read name format is used if most reads have it, otherwise the read lengths
+        platform = max(readnameformats, key=readnameformats.get)
+        if readnameformats[platform] > len(readlengths) / 2:
+            headerinfo["platforms"] = [platform]
+            headerinfo["reason"] = f"{readnameformats[platform]} of the first {len(readlengths)} read names have the {platform} format"
+        elif headerinfo["maxlength"] <= VIPHeaderReader.MAX_SHORT_READ_LENGTH:
+            headerinfo["platforms"] = VIPHeaderReader.SHORT_READ_PLATFORMS
+            headerinfo["reason"] = f"the first {len(readlengths)} reads are at most {headerinfo['maxlength']} bases long"
+        elif headerinfo["medianlength"] >= VIPHeaderReader.MIN_LONG_READ_LENGTH:
+            headerinfo["platforms"] = VIPHeaderReader.LONG_READ_PLATFORMS
+            headerinfo["reason"] = f"the median length of the first {len(readlengths)} reads is {headerinfo['medianlength']} bases"
+        return headerinfo
+    
+    
+    def read_sam_header_lines(self, headerdata, datachunks):
+        """Returns the header lines (starting with @) of a SAM file.
+        
+        Parameters
+        ----------
+        headerdata : bytes
+            Already read decompressed data at the start of the file
+        datachunks : generator of bytes
+            Remaining decompressed data of the file
+        
+        Yields
+        ------
+        bytes
+            Next SAM header line
+        """
+        for headerline in self.read_header_lines(headerdata, datachunks):
+            if not headerline.startswith(b"@"):
+                return
+            yield headerline
+    
+    
+    def read_header_lines(self, headerdata, datachunks):
+        """Splits decompressed data into lines, reading more data only when needed.
+        
+        Parameters
+        ----------
+        headerdata : bytes
+            Already read decompressed data
+        datachunks : generator of bytes
+            Remaining decompressed data of the file
+        
+        Yields
+        ------
+        bytes
+            Next complete line (without newline)
+        """
+        while True:
+            newlineindex = headerdata.find(b"\n")
+            while newlineindex == -1:
+                nextchunk = next(datachunks, None)
+                if nextchunk is None:
+                    return
+                headerdata += nextchunk
+                newlineindex = headerdata.find(b"\n")
+            yield headerdata[:newlineindex]
+            headerdata = headerdata[newlineindex + 1:]
+    
+    
+    def infer_assembly(self, headerinfo):
+        """Infers the assembly of a file from the contig lengths in its header, or otherwise from its reference.
+        
+        Contig names are compared without a chr prefix, so both 1 and chr1 naming is supported.
+        
+        Parameters
+        ----------
+        headerinfo : dict
+            Header information read from the file
+        
+        Returns
+        -------
+        tuple
+            Inferred assembly and the reason it was inferred, (None, None) if the assembly could not be inferred
+        """
+        matchedassemblies = {}
+        for contigname, contiglength in headerinfo["contigs"].items():
+            # Contigs without a length can not be compared (and would match contigs missing from the fingerprints)
+            if contiglength is None:
+                continue
+            shortname = contigname[3:] if contigname.lower().startswith("chr") else contigname
+            for assembly, fingerprint in VIPHeaderReader.ASSEMBLY_FINGERPRINTS.items():
+                if fingerprint.get(shortname) == contiglength:
+                    matchedassemblies.setdefault(assembly, f"contig {contigname} has length {contiglength}")
+        if len(matchedassemblies) == 1:
+            return list(matchedassemblies.items())[0]
+        
+        if not matchedassemblies and headerinfo["reference"] is not None:
+            lowerreference = headerinfo["reference"].lower()
+            for assembly, referencenames in VIPHeaderReader.ASSEMBLY_REFERENCE_NAMES.items():
+                if any(rn in lowerreference for rn in referencenames):
+                    return (assembly, f"reference {headerinfo['reference']}")
+        return (None, None)
@@ -0,0 +1,77 @@
+import os
+import stat
+
+class VIPPathCanonicalizer:
+    RESOLVED = "resolved"
+    NOT_FOUND = "not_found"
+    DANGLING_LINK = "dangling_link"
+    MAX_LINK_DEPTH = 40
+    
+    def __init__(self):
+        """Initializes the canonicalizer that resolves symbolic links in file paths to the physical file."""
+        self.directory_cache = {}
+    
+    
+    def resolve_directory(self, dirpath):
+        """Returns the canonical path of a directory. Every directory is only resolved once.
+        
+        Parameters
+        ----------
+        dirpath : str
+            Path to the directory
+        
+        Returns
+        -------
+        str
+            Absolute path of the directory without symbolic links
+        """
+        if dirpath not in self.directory_cache:
+            self.directory_cache[dirpath] = os.path.realpath(dirpath if dirpath != "" else ".")
+        return self.directory_cache[dirpath]
+    
+    
+    def canonicalize_path(self, filepath, linkdepth=0):
+        """Resolves the symbolic links in the path of a file.
+        
+        The directory of the file is resolved with the (cached) directory canonical path, so for many
+        files in the same directory only the file itself is checked. Symbolic links to files are followed
+        until the physical file is found.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to the file
+        linkdepth : int
+            Number of symbolic links followed so far
+        
+        Returns
+        -------
+        tuple
+            Status (resolved, not_found or dangling_link), canonical path (for a dangling link the path
+            the link points to) and the stat of the physical file (None if not resolved)
+        
+        Raises
+        ------
+        OSError
+            If the symbolic link could not be read
+        """
+        dirpath, filename = os.path.split(filepath)
+        if filename in ["", ".", ".."]:
+            canonicalpath = os.path.realpath(filepath)
+        else:
+            canonicalpath = os.path.join(self.resolve_directory(dirpath), filename)
+        try:
+            filestat = os.lstat(canonicalpath)
+        except OSError:
+            return (VIPPathCanonicalizer.NOT_FOUND, canonicalpath, None)
+        if not stat.S_ISLNK(filestat.st_mode):
+            return (VIPPathCanonicalizer.RESOLVED, canonicalpath, filestat)
+        
+        # Relative link targets are relative to the directory of the link
+        linktarget = os.path.join(os.path.dirname(canonicalpath), os.readlink(canonicalpath))
+        if linkdepth >= VIPPathCanonicalizer.MAX_LINK_DEPTH:
+            return (VIPPathCanonicalizer.DANGLING_LINK, linktarget, None)
+        linkstatus, targetpath, targetstat = self.canonicalize_path(linktarget, linkdepth + 1)
+        if linkstatus == VIPPathCanonicalizer.NOT_FOUND:
+            return (VIPPathCanonicalizer.DANGLING_LINK, targetpath, None)
+        return (linkstatus, targetpath, targetstat)
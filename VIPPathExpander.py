@@ -0,0 +1,83 @@
+import fnmatch
+import os
+
+class VIPPathExpander:
+    EXPANDED = "expanded"
+    DIRECTORY_NOT_FOUND = "directory_not_found"
+    GLOB_CHARACTERS = ["*", "?", "["]
+    
+    def __init__(self):
+        """Initializes the expander that expands directories and glob patterns into the files they contain."""
+        self.scandir_cache = {}
+    
+    
+    @staticmethod
+    def is_pattern(filepath):
+        """Returns whether a path is a directory (ending with /) or glob pattern instead of a single file.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path to check
+        
+        Returns
+        -------
+        bool
+            True if the path is a directory or glob pattern, False if not
+        """
+        return filepath.endswith("/") or any(gc in filepath for gc in VIPPathExpander.GLOB_CHARACTERS)
+    
+    
+    def scan_directory(self, dirpath):
+        """Returns the regular files in a directory with their sizes. Every directory is only scanned once.
+        
+        Parameters
+        ----------
+        dirpath : str
+            Path to the directory
+        
+        Returns
+        -------
+        list of tuple
+            Name and size of each file in the directory
+        
+        Raises
+        ------
+        OSError
+            If the directory could not be read
+        """
+        if dirpath not in self.scandir_cache:
+            direntries = []
+            with os.scandir(dirpath) as dirscan:
+                for direntry in dirscan:
+                    if direntry.is_file():
+                        direntries.append((direntry.name, direntry.stat().st_size))
+            direntries.sort()
+            self.scandir_cache[dirpath] = direntries
+        return self.scandir_cache[dirpath]
+    
+    
+    def expand_path(self, filepath):
+        """Expands a directory (ending with /) or glob pattern into the matching files.
+        
+        Glob patterns are only supported in the last part of the path, the directory is scanned once
+        and the file names are matched against the pattern.
+        
+        Parameters
+        ----------
+        filepath : str
+            Directory or glob pattern to expand
+        
+        Returns
+        -------
+        tuple
+            Status (expanded or directory_not_found) and a list with the path and size of each matching file
+        """
+        dirpath, filepattern = os.path.split(filepath)
+        if filepattern == "":
+            filepattern = "*"
+        try:
+            direntries = self.scan_directory(dirpath if dirpath != "" else ".")
+        except OSError:
+            return (VIPPathExpander.DIRECTORY_NOT_FOUND, None)
+        return (VIPPathExpander.EXPANDED, [(os.path.join(dirpath, fn), fs) for fn, fs in direntries if fnmatch.fnmatchcase(fn, filepattern)])
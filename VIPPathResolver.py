@@ -0,0 +1,105 @@
+import os
+import re
+
+class VIPPathResolver:
+    VARIABLE_REFERENCE = re.compile(r"\$(?:\{(\w+)\}|(\w+))")
+    
+    def __init__(self, envfile=None, environment=None):
+        """Initializes the resolver that replaces bash variables ($VAR and ${VAR}) in file paths.
+        
+        Parameters
+        ----------
+        envfile : str
+            Path to a file with VAR=value lines, overriding the variables of the environment (not used if not supplied)
+        environment : dict of str
+            Variables to resolve the paths with (the environment of the process if not supplied)
+        """
+        self.variables = dict(os.environ if environment is None else environment)
+        if envfile is not None:
+            self.variables.update(self.read_env_file(envfile))
+        self.prefix_cache = {}
+    
+    
+    def read_env_file(self, envfile):
+        """Reads the variables from an env file.
+        
+        Lines are in the format VAR=value (optionally starting with export), empty lines and lines starting
+        with # are skipped. Values can be quoted and can refer to variables that are already set.
+        
+        Parameters
+        ----------
+        envfile : str
+            Path to the env file
+        
+        Returns
+        -------
+        envvariables : dict of str
+            Variables in the env file
+        """
+        envvariables = {}
+        with open(envfile, "r") as envvarfile:
+            for envline in envvarfile:
+                envline = envline.strip()
+                if envline == "" or envline.startswith("#") or "=" not in envline:
+                    continue
+                if envline.startswith("export "):
+                    envline = envline[len("export "):].lstrip()
+                varname, varvalue = envline.split("=", 1)
+                varvalue = varvalue.strip()
+                if len(varvalue) > 1 and varvalue[0] == varvalue[-1] and varvalue[0] in ["\"", "'"]:
+                    varvalue = varvalue[1:-1]
+                resolvedvalue = self.substitute_variables(varvalue, {**self.variables, **envvariables})
+                envvariables[varname.strip()] = resolvedvalue if resolvedvalue is not None else varvalue
+        return envvariables
+    
+    
+    def substitute_variables(self, template, variables):
+        """Replaces all variables in a template.
+        
+        Parameters
+        ----------
+        template : str
+            Text containing variables
+        variables : dict of str
+            Values of the variables
+        
+        Returns
+        -------
+        str
+            Template with the variables replaced, None if one of the variables is not set
+        """
+        if any((vr.group(1) or vr.group(2)) not in variables for vr in VIPPathResolver.VARIABLE_REFERENCE.finditer(template)):
+            return None
+        return VIPPathResolver.VARIABLE_REFERENCE.sub(lambda vr: variables[vr.group(1) or vr.group(2)], template)
+    
+    
+    def resolve_path(self, filepath):
+        """Resolves the variables in a file path.
+        
+        Only the part of the path up to and including the last variable is resolved, and is cached, so
+        paths sharing a template prefix (like ${DATA_ROOT}/project) are resolved once.
+        
+        Parameters
+        ----------
+        filepath : str
+            Path that may contain variables
+        
+        Returns
+        -------
+        str
+            Resolved path, the path as supplied if it has no variables or one of the variables is not set
+        """
+        if "$" not in filepath:
+            return filepath
+        lastvariable = None
+        for lastvariable in VIPPathResolver.VARIABLE_REFERENCE.finditer(filepath):
+            pass
+        if lastvariable is None:
+            return filepath
+        templateprefix = filepath[:lastvariable.end()]
+        if templateprefix not in self.prefix_cache:
+            self.prefix_cache[templateprefix] = self.substitute_variables(templateprefix, self.variables)
+        resolvedprefix = self.prefix_cache[templateprefix]
+        if resolvedprefix is None:
+            return filepath
+        return resolvedprefix + filepath[lastvariable.end():]
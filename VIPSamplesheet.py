@@ -1,10 +1,11 @@
-import re
+from array import array
 from pathlib import Path
 # from VIPSamplesheetSample import VIPSamplesheetSample
 from VIPSamplesheetSample2 import VIPSamplesheetSample2
+from VIPSamplesheetFindings import VIPSamplesheetFindings
 
 class VIPSamplesheet:
-    def __init__(self, path_to_samplesheet):
+    def __init__(self, path_to_samplesheet, findings=None):
         """Intializes several variables with default values reads the file.
         
         To read the samplesheet file the method read_samplesheet() is called.
@@ -13,17 +14,23 @@ class VIPSamplesheet:
         ----------
         path_to_samplesheet : str
             Path to the samplesheet file to read
+        findings : VIPSamplesheetFindings
+            Storage to save the errors and info messages of the samplesheet in (a new one is made if not supplied)
         """
         self.file_path = path_to_samplesheet
+        if findings is None:
+            findings = VIPSamplesheetFindings(path_to_samplesheet)
+        self.findings = findings
         self.headerfields = []
         self.samplesheet_data = {}
         self.incorrect_files = []
         self.individuals = {}
+        self.individualid_set = None
         self.project_sequencing_methods = {}
         self.project_sequencing_platforms = {}
         self.project_assemblies = {}
         self.project_individualids = {}
-        self.samplesheet_errors = {}
+        self.samplesheet_errors = array("L")
         self.projectid_to_samples = {}
         self.read_file = self.read_samplesheet(path_to_samplesheet)
     
@@ -100,7 +107,9 @@ class VIPSamplesheet:
             VIP samplesheet sample with saved data
         """
         vipsample = VIPSamplesheetSample2()
+        vipsample.set_line_number(samplenum)
         vipsample.set_number_of_columns(len(filelinedata))
+        vipsample.set_findings(self.findings)
         self.check_number_of_columns(len(headerdata), len(filelinedata), samplenum)
         
         lineindex = 0
@@ -115,9 +124,9 @@ class VIPSamplesheet:
                     case "individual_id":
                         vipsample.set_individual_id(filelinedata[lineindex])
                         if hasprojectid:
-                            self.add_projectid_to_individualid(filelinedata[projectidindex], re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip()))
+                            self.add_projectid_to_individualid(filelinedata[projectidindex], VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip()))
                         else:
-                            self.add_projectid_to_individualid("vip", re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip()))
+                            self.add_projectid_to_individualid("vip", VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip()))
                     case "paternal_id":
                         vipsample.set_paternal_id(filelinedata[lineindex])
                     case "maternal_id":
@@ -126,21 +135,21 @@ class VIPSamplesheet:
                         vipsample.set_sample_sex(filelinedata[lineindex])
                     case "affected":
                         vipsample.set_affected(filelinedata[lineindex])
-                        if re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip()) == "true":
+                        if VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip()) == "true":
                             vipsample.set_is_affected()
                     case "proband":
                         vipsample.set_proband(filelinedata[lineindex])
-                        if re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip()) == "true":
+                        if VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip()) == "true":
                             vipsample.set_is_proband()
                     case "hpo_ids":
                         vipsample.set_hpo(filelinedata[lineindex])
-                        vipsample.set_hpo_ids(self.get_hpo_terms(re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip())))
+                        vipsample.set_hpo_ids(self.get_hpo_terms(VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip())))
                     case "sequencing_method":
                         vipsample.set_sequencing_method(filelinedata[lineindex])
                         if hasprojectid:
-                            self.add_sequencing_method(filelinedata[projectidindex], re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip()))
+                            self.add_sequencing_method(filelinedata[projectidindex], VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip()))
                         else:
-                            self.add_sequencing_method("vip", re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip()))
+                            self.add_sequencing_method("vip", VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip()))
                     case "regions":
                         vipsample.set_bed_file(filelinedata[lineindex])
                     case "adaptive_sampling":
@@ -157,17 +166,17 @@ class VIPSamplesheet:
                     case "sequencing_platform":
                         vipsample.set_sequencing_platform(filelinedata[lineindex])
                         if hasprojectid:
-                            self.add_sequencing_platform(filelinedata[projectidindex], re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip()))
+                            self.add_sequencing_platform(filelinedata[projectidindex], VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip()))
                         else:
-                            self.add_sequencing_platform("vip", re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip()))
+                            self.add_sequencing_platform("vip", VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip()))
                     case "cram":
                         vipsample.set_cram_file(filelinedata[lineindex])
                     case "assembly":
                         vipsample.set_assembly(filelinedata[lineindex])
                         if hasprojectid:
-                            self.add_assembly(filelinedata[projectidindex], re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip()))
+                            self.add_assembly(filelinedata[projectidindex], VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip()))
                         else:
-                            self.add_assembly("vip", re.sub(r"[\x00-\x1f]", "", filelinedata[lineindex].strip()))
+                            self.add_assembly("vip", VIPSamplesheetSample2.remove_nonprintable_chars(filelinedata[lineindex].strip()))
                     case "gvcf":
                         vipsample.set_gvcf_file(filelinedata[lineindex])
                     case "vcf":
@@ -459,6 +468,22 @@ class VIPSamplesheet:
         return individuals
     
     
+    def get_individual_id_set(self):
+        """Returns the set of all individual_id values in the samplesheet.
+        
+        The set is only made once so checking whether a value is an individual_id of the samplesheet
+        does not require going over all samples for each sample.
+        
+        Returns
+        -------
+        self.individualid_set : set of str
+            Set of individual_id values
+        """
+        if self.individualid_set is None:
+            self.individualid_set = set(self.get_individual_ids())
+        return self.individualid_set
+    
+    
     def get_proband_individuals(self):
         """Returns all proband individuals in the samplesheet.
         
@@ -598,32 +623,46 @@ class VIPSamplesheet:
         return {i: self.individuals[i] for i in self.individuals if len(self.individuals[i]) > 1}
     
     
-    def add_samplesheet_error(self, errortype, errormessage):
-        """Adds a samplesheet error message.
+    def add_samplesheet_error(self, errortype, errorcode, *messageargs):
+        """Adds a samplesheet error.
         
-        The type is for example trio or duplicate individual_id.
+        The type is for example trio or duplicate individual_id. The error is saved
+        in the findings storage with line number 0.
         
         Parameters
         ----------
         errortype : str
             Type of error in the samplesheet
-        errormessage : str
-            The specific error message
+        errorcode : str
+            Code identifying the error
+        messageargs : str
+            Arguments to render the error message with
         """
-        if errortype not in self.samplesheet_errors:
-            self.samplesheet_errors[errortype] = []
-        self.samplesheet_errors[errortype].append(errormessage)
+        findingindex = self.findings.add_finding(0, "error", errortype, errorcode, messageargs)
+        if findingindex is not None:
+            self.samplesheet_errors.append(findingindex)
     
     
     def get_samplesheet_errors(self):
-        """Returns the found samplesheet errors.
+        """Returns the found samplesheet error messages.
+        
+        Returns
+        -------
+        dict of str
+            Dictionary containing samplesheet error messages per error type
+        """
+        return self.findings.get_findings_messages(self.samplesheet_errors, "error")
+    
+    
+    def get_findings(self):
+        """Returns the findings storage of the samplesheet.
         
         Returns
         -------
-        self.samplesheet_errors : dict of str
-            Dictionary containing samplesheet errors
+        self.findings : VIPSamplesheetFindings
+            Storage with all errors and info messages of the samplesheet
         """
-        return self.samplesheet_errors
+        return self.findings
     
     
     def display_sample_errors(self, sheetsample):
@@ -651,10 +690,11 @@ class VIPSamplesheet:
     
     def display_samplesheet_errors(self):
         """Displays all samplesheet errors."""
-        if len(self.samplesheet_errors) > 0:
+        samplesheeterrors = self.get_samplesheet_errors()
+        if len(samplesheeterrors) > 0:
             print(f"Print overall samplesheet errors for samplesheet {self.file_path}:")
-            for errortype in self.samplesheet_errors:
-                for errormessage in self.samplesheet_errors[errortype]:
+            for errortype in samplesheeterrors:
+                for errormessage in samplesheeterrors[errortype]:
                     print(f"\t[{errortype}]: {errormessage}")
     
     
@@ -740,14 +780,14 @@ class VIPSamplesheet:
         """
         duplicate_values = {}
         for projid in self.project_individualids:
-            dupvalues = []
+            dupvalues = set()
             for individ in self.project_individualids[projid]:
                 if individ in dupvalues:
                     if projid not in duplicate_values:
                         duplicate_values[projid] = []
                     duplicate_values[projid].append(individ)
                 else:
-                    dupvalues.append(individ)
+                    dupvalues.add(individ)
         return duplicate_values
     
     
@@ -765,6 +805,8 @@ class VIPSamplesheet:
             projectid = "vip"
         if projectid not in self.projectid_to_samples:
             self.projectid_to_samples[projectid] = []
-        if samplenum not in self.projectid_to_samples[projectid]:
-            self.projectid_to_samples[projectid].append(samplenum)
+        # Samples are added in line order, so a sample can only already be saved as the last one
+        projectsamples = self.projectid_to_samples[projectid]
+        if len(projectsamples) == 0 or projectsamples[-1] != samplenum:
+            projectsamples.append(samplenum)
     
@@ -1,6 +1,12 @@
-import os
 import re
-from pathlib import Path
+from VIPFileProber import VIPFileProber
+from VIPFileInspector import VIPFileInspector
+from VIPHeaderReader import VIPHeaderReader
+from VIPPathExpander import VIPPathExpander
+from VIPBedValidator import VIPBedValidator
+from VIPFileFingerprinter import VIPFileFingerprinter
+from VIPChecksumVerifier import VIPChecksumVerifier
+from VIPPathResolver import VIPPathResolver
 
 class VIPSamplesheetChecker:
     GLOBAL_REQUIRED_SAMPLESHEET_COLUMNS = ["individual_id"]
@@ -37,6 +43,60 @@ class VIPSamplesheetChecker:
         "vcf": ["vcf", "vcf.gz", "vcf.bgz", "bcf", "bcf.gz", "bcf.bgz"]
     }
     
+    FILE_COLUMNS = ["regions", "fastq", "fastq_r1", "fastq_r2", "cram", "gvcf", "vcf"]
+    
+    VALID_FILE_FORMATS = {
+        "fastq": ["FASTQ"],
+        "fastq_r1": ["FASTQ"],
+        "fastq_r2": ["FASTQ"],
+        "cram": ["SAM", "BAM", "CRAM"],
+        "gvcf": ["VCF", "BCF"],
+        "vcf": ["VCF", "BCF"]
+    }
+    
+    # Read number in FASTQ file names, for example R1 in sample_S1_L001_R1_001.fastq.gz or 1 in sample_1.fq.gz
+    FASTQ_READ_NUMBER = re.compile(r"(?<![0-9A-Za-z])(R|r|read|Read|READ)?1(?![0-9A-Za-z])")
+    MAX_PAIR_SIZE_RATIO = 2.0
+    
+    # Possible index files per data file extension, as the part to remove from and the part to add to the data file path
+    INDEX_FILE_EXTENSIONS = {
+        "cram": [("", ".crai"), (".cram", ".crai")],
+        "bam": [("", ".bai"), (".bam", ".bai"), ("", ".csi")],
+        "vcf.gz": [("", ".tbi"), ("", ".csi")],
+        "vcf.bgz": [("", ".tbi"), ("", ".csi")],
+        "gvcf.gz": [("", ".tbi"), ("", ".csi")],
+        "gvcf.bgz": [("", ".tbi"), ("", ".csi")],
+        "bcf": [("", ".csi")],
+        "bcf.gz": [("", ".csi")],
+        "bcf.bgz": [("", ".csi")]
+    }
+    INDEXED_COLUMNS = ["cram", "gvcf", "vcf"]
+    DATA_FILE_COLUMNS = ["fastq", "fastq_r1", "fastq_r2", "cram", "gvcf", "vcf"]
+    
+    UNVERIFIABLE_REASONS = {
+        VIPFileProber.PROBE_TIMEOUT: "timeout",
+        VIPFileProber.PROBE_MOUNT_UNAVAILABLE: "mount point not responding",
+        VIPFileProber.PROBE_NOT_STARTED: "check could not be started in time",
+        VIPFileProber.PROBE_ERROR: "check failed"
+    }
+    
+    HEADER_COLUMNS = ["fastq", "fastq_r1", "fastq_r2", "cram", "gvcf", "vcf"]
+    MAX_REPORTED_HEADER_SAMPLES = 5
+    
+    DEFAULT_ASSEMBLY = "GRCh38"
+    # Naming of the primary contigs in the reference of each assembly
+    ASSEMBLY_CONTIG_PREFIXES = {
+        "GRCh37": "",
+        "GRCh38": "chr",
+        "T2T": "chr"
+    }
+    
+    DEFAULT_SEQUENCING_METHOD = "WGS"
+    # Plausible number of bases covered by the regions and CRAM file sizes (in bytes) for WES and WGS data
+    MAX_WES_COVERED_BASES = 500000000
+    MIN_WGS_CRAM_SIZE = 3000000000
+    MAX_WES_CRAM_SIZE = 40000000000
+    
     DEFAULT_SEQPLATFORM_VALUES = {
         "fastq": "nanopore",
         "cram": "illumina",
@@ -44,10 +104,68 @@ class VIPSamplesheetChecker:
         "vcf": ""
     }
     
+    def __init__(self, fileprober=None, fileinspector=None, headerreader=None, pathexpander=None, bedvalidator=None, fingerprinter=None, checksumverifier=None, pathresolver=None):
+        """Initializes the checker.
+        
+        Parameters
+        ----------
+        fileprober : VIPFileProber
+            Prober to check the files in the samplesheet with (a new one is made if not supplied)
+        fileinspector : VIPFileInspector
+            Inspector to check the contents of the files with (a new one is made if not supplied)
+        headerreader : VIPHeaderReader
+            Reader to check the headers of the files with (headers are not checked if not supplied)
+        pathexpander : VIPPathExpander
+            Expander to expand fastq directories and glob patterns with (a new one is made if not supplied)
+        bedvalidator : VIPBedValidator
+            Validator to check the BED files with (a new one is made if not supplied)
+        fingerprinter : VIPFileFingerprinter
+            Fingerprinter to find data files with the same contents with (not checked if not supplied)
+        checksumverifier : VIPChecksumVerifier
+            Verifier to check the data files against their MD5 checksum files with (not checked if not supplied)
+        pathresolver : VIPPathResolver
+            Resolver to replace the bash variables in file paths with (a new one using the environment is made if not supplied)
+        """
+        if fileprober is None:
+            fileprober = VIPFileProber()
+        if fileinspector is None:
+            fileinspector = VIPFileInspector()
+        if pathexpander is None:
+            pathexpander = VIPPathExpander()
+        if bedvalidator is None:
+            bedvalidator = VIPBedValidator()
+        if pathresolver is None:
+            pathresolver = VIPPathResolver()
+        self.file_prober = fileprober
+        self.file_inspector = fileinspector
+        self.header_reader = headerreader
+        self.path_expander = pathexpander
+        self.bed_validator = bedvalidator
+        self.fingerprinter = fingerprinter
+        self.fingerprint_index = {}
+        self.sheet_fingerprints = []
+        self.checksum_verifier = checksumverifier
+        self.path_resolver = pathresolver
+        self.file_prober.register_probe("inspect", self.file_inspector.inspect_file)
+        self.file_prober.register_probe("expand", self.path_expander.expand_path)
+        if self.file_inspector.integrity_mode == "deep":
+            self.file_prober.register_probe("deep", self.file_inspector.start_deep_check_if_file)
+        # Probes that only read the contents of a file are run once per physical file (symbolic links resolved)
+        self.file_prober.register_probe("bed", self.bed_validator.validate_bed_file, canonical=True)
+        if self.header_reader is not None:
+            self.file_prober.register_probe("header", self.header_reader.read_file_header, canonical=True)
+        if self.fingerprinter is not None:
+            self.file_prober.register_probe("fingerprint", self.fingerprinter.fingerprint_file, canonical=True)
+        if self.checksum_verifier is not None:
+            self.file_prober.register_probe("checksum", self.checksum_verifier.prepare_checksum)
+    
     
     def check_sample_column_values(self, runmode, headerfields, samplesheet, samplesheetsample):
         """Checks all the values in the columns of a single samlpesheet sample.
         
+        Only the values themselves are checked (including the extensions of the file paths). Whether
+        the files exist is checked separately with check_sample_files() as that requires filesystem access.
+        
         Parameters
         ----------
         runmode : str
@@ -59,7 +177,11 @@ class VIPSamplesheetChecker:
         samplesheetsample : VIPSamplesheetSample
             Specific samplesheet sample to check the values of
         """
+        sheetfindings = samplesheet.get_findings()
         for hf in headerfields:
+            # Cancel the remaining checks for this sample once the error budget is exhausted
+            if sheetfindings.error_budget_exhausted():
+                return
             match hf:
                 case "individual_id":
                     self.check_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_individual_id())
@@ -67,11 +189,11 @@ class VIPSamplesheetChecker:
                     self.check_for_multiple_values(samplesheetsample, hf, samplesheetsample.get_individual_id_raw())
                 case "paternal_id":
                     self.check_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_paternal_id_raw())
-                    self.check_paternal(samplesheetsample, samplesheet.get_individual_ids())
+                    self.check_paternal(samplesheetsample, samplesheet.get_individual_id_set())
                     self.check_for_multiple_values(samplesheetsample, hf, samplesheetsample.get_paternal_id())
                 case "maternal_id":
                     self.check_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_maternal_id_raw())
-                    self.check_maternal(samplesheetsample, samplesheet.get_individual_ids())
+                    self.check_maternal(samplesheetsample, samplesheet.get_individual_id_set())
                     self.check_for_multiple_values(samplesheetsample, hf, samplesheetsample.get_maternal_id())
                 case "sex":
                     self.check_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_sample_sex_raw())
@@ -103,28 +225,30 @@ class VIPSamplesheetChecker:
                     self.check_for_multiple_values(samplesheetsample, hf, samplesheetsample.get_assembly())
                 case "regions":
                     self.check_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_bed_file_raw())
-                    self.check_bed_file(samplesheetsample, hf)
+                    self.check_sample_file_paths(runmode, samplesheetsample, hf)
                     self.check_for_multiple_values(samplesheetsample, hf, samplesheetsample.get_bed_file())
                 case "fastq":
                     self.check_fastq_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_fastq_files_raw())
-                    self.check_fastq_files(samplesheetsample, hf, samplesheetsample.get_fastq_files())
+                    self.check_sample_file_paths(runmode, samplesheetsample, hf)
                 case "fastq_r1":
                     self.check_fastq_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_fastq_r1_files_raw())
-                    self.check_fastq_files(samplesheetsample, hf, samplesheetsample.get_fastq_r1_files())
+                    self.check_sample_file_paths(runmode, samplesheetsample, hf)
                 case "fastq_r2":
                     self.check_fastq_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_fastq_r2_files_raw())
-                    self.check_fastq_files(samplesheetsample, hf, samplesheetsample.get_fastq_r2_files())
+                    self.check_sample_file_paths(runmode, samplesheetsample, hf)
+                    if "fastq_r1" in headerfields:
+                        self.check_fastq_pairs(samplesheetsample)
                 case "cram":
                     self.check_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_cram_file_raw())
-                    self.check_cram_file(samplesheetsample, hf, runmode)
+                    self.check_sample_file_paths(runmode, samplesheetsample, hf)
                     self.check_for_multiple_values(samplesheetsample, hf, samplesheetsample.get_cram_file())
                 case "gvcf":
                     self.check_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_gvcf_file_raw())
-                    self.check_gvcf_file(samplesheetsample, hf, runmode)
+                    self.check_sample_file_paths(runmode, samplesheetsample, hf)
                     self.check_for_multiple_values(samplesheetsample, hf, samplesheetsample.get_gvcf_file())
                 case "vcf":
                     self.check_for_nonprintable_chars(samplesheetsample, hf, samplesheetsample.get_vcf_file_raw())
-                    self.check_vcf_file(samplesheetsample, hf)
+                    self.check_sample_file_paths(runmode, samplesheetsample, hf)
                     self.check_for_multiple_values(samplesheetsample, hf, samplesheetsample.get_vcf_file())
     
     
@@ -142,11 +266,11 @@ class VIPSamplesheetChecker:
         """
         if len(samplesheet.get_sheet_sequencing_methods()) > 1:
             print(samplesheet.get_sheet_sequencing_methods())
-            samplesheet.add_samplesheet_error("sequencing_method", "Samplesheet contains multiple values for sequencing method.")
+            samplesheet.add_samplesheet_error("sequencing_method", "multiple_sheet_values")
         if len(samplesheet.get_sheet_sequencing_platforms()) > 1:
-            samplesheet.add_samplesheet_error("sequencing_platform", "Samplesheet contains multiple values for sequencing_platform.")
+            samplesheet.add_samplesheet_error("sequencing_platform", "multiple_sheet_values")
         if len(samplesheet.get_sheet_assemblies()) > 1:
-            samplesheet.add_samplesheet_error("assembly", "Samplesheet contains multiple values for assembly.")
+            samplesheet.add_samplesheet_error("assembly", "multiple_sheet_values")
     
     
     def check_sheet_projectid_consistency(self, samplesheet, projectids_multi_value, columnname):
@@ -169,7 +293,7 @@ class VIPSamplesheetChecker:
             projectid_to_sample = samplesheet.get_projectid_to_sample_list()
             for projid in projectids_multi_value:
                 for samplenum in projectid_to_sample[projid]:
-                    sheetsamples[samplenum].add_sample_error(columnname, f"There is more than one value for project \"{projid}\".")
+                    sheetsamples[samplenum].add_sample_error(columnname, "multiple_project_values", projid)
     
     
     def check_sheet_sequencing_method_consistency(self, samplesheet):
@@ -227,8 +351,8 @@ class VIPSamplesheetChecker:
             for individ in dupindivids:
                 for samplenum in dupindivids[individ]:
                     sheetsample = samplesheet.get_sample_by_linenumber(samplenum)
-                    sheetsample.add_sample_error("individual_id", f"Value \"{sheetsample.get_individual_id()}\" appears more than once in the samplesheet.")
-                    # samplesheet.add_samplesheet_error("individual_id", f"Value for individual_id appears more than once in the samplesheet.")
+                    sheetsample.add_sample_error("individual_id", "duplicate_individual_id", sheetsample.get_individual_id())
+                    # samplesheet.add_samplesheet_error("individual_id", "duplicate_individual_id")
     
     
     def check_sheet_trios(self, samplesheet):
@@ -256,7 +380,7 @@ class VIPSamplesheetChecker:
             Sample for which to check the individual_id of
         """
         if sheetsample.get_individual_id() == "":
-            sheetsample.add_sample_error("individual_id", "Value for individual_id cannot be empty.")
+            sheetsample.add_sample_error("individual_id", "empty_individual_id")
     
     
     def check_maternal(self, sheetsample, samplesheet_individuals):
@@ -266,13 +390,13 @@ class VIPSamplesheetChecker:
         ----------
         sheetsample : VIPSamplesheetSample
             Sample to check maternal_id of
-        samplesheet_individuals : list of str
-            List of all individual ids found in the samplesheet
+        samplesheet_individuals : set of str
+            Set of all individual ids found in the samplesheet
         """
         maternalid = sheetsample.get_maternal_id()
         if maternalid != "":
             if maternalid not in samplesheet_individuals:
-                sheetsample.add_sample_error("maternal_id", f"Maternal id \"{maternalid}\" was not found in the samplesheet as individual.")
+                sheetsample.add_sample_error("maternal_id", "maternal_id_not_found", maternalid)
     
     
     def check_paternal(self, sheetsample, samplesheet_individuals):
@@ -282,13 +406,13 @@ class VIPSamplesheetChecker:
         ----------
         sheetsample : VIPSamplesheetSample
             Sample to check paternal_id of
-        samplesheet_individuals : list of str
-            List of all individual ids found in the samplesheet
+        samplesheet_individuals : set of str
+            Set of all individual ids found in the samplesheet
         """
         paternalid = sheetsample.get_paternal_id()
         if paternalid != "":
             if paternalid not in samplesheet_individuals:
-                sheetsample.add_sample_error("paternal_id", f"Paternal id \"{paternalid}\" was not found in the samplesheet as individual.")
+                sheetsample.add_sample_error("paternal_id", "paternal_id_not_found", paternalid)
     
     
     def check_header_fields(self, runmode, headerfields):
@@ -337,9 +461,9 @@ class VIPSamplesheetChecker:
         """
         sexvalue = sheetsample.get_sample_sex()
         if sexvalue not in VIPSamplesheetChecker.VALID_COLUMN_VALUES["sex"]:
-            sheetsample.add_sample_error("sex", f"Assigned value for sex is incorrect. Please use one of the following values: {VIPSamplesheetChecker.VALID_COLUMN_VALUES["sex"]}")
+            sheetsample.add_sample_error("sex", "invalid_value", sexvalue, VIPSamplesheetChecker.VALID_COLUMN_VALUES["sex"])
         elif sexvalue == "":
-            sheetsample.add_sample_info("sex", "No assigned value for sex, by default this sample will be treated as female.")
+            sheetsample.add_sample_info("sex", "default_value", "female")
     
     
     def check_affected_value(self, sheetsample):
@@ -351,7 +475,7 @@ class VIPSamplesheetChecker:
             Samplesheet sample with an affected value
         """
         if sheetsample.get_affected() not in VIPSamplesheetChecker.VALID_COLUMN_VALUES["affected"]:
-            sheetsample.add_sample_error("affected", f"Assigned value for affectede is incorrect. Please use one of the following values: {VIPSamplesheetChecker.VALID_COLUMN_VALUES["affected"]}")
+            sheetsample.add_sample_error("affected", "invalid_value", sheetsample.get_affected(), VIPSamplesheetChecker.VALID_COLUMN_VALUES["affected"])
     
     
     def check_proband_value(self, sheetsample):
@@ -364,7 +488,7 @@ class VIPSamplesheetChecker:
         """
         probandvalue = sheetsample.get_proband()
         if probandvalue not in VIPSamplesheetChecker.VALID_COLUMN_VALUES["proband"]:
-            sheetsample.add_sample_error("proband", f"Assigned value is incorrect. Please use one of the following values: {VIPSamplesheetChecker.VALID_COLUMN_VALUES["proband"]}")
+            sheetsample.add_sample_error("proband", "invalid_value", probandvalue, VIPSamplesheetChecker.VALID_COLUMN_VALUES["proband"])
     
     
     def check_sequencing_method_value(self, samplesheet, sheetsample):
@@ -379,9 +503,11 @@ class VIPSamplesheetChecker:
         """
         seqmethodvalue = sheetsample.get_sequencing_method()
         if seqmethodvalue not in VIPSamplesheetChecker.VALID_COLUMN_VALUES["sequencing_method"]:
-            sheetsample.add_sample_error("sequencing_method", f"Assigned value is incorrect. Please use one of the following values: {VIPSamplesheetChecker.VALID_COLUMN_VALUES["sequencing_method"]}")
+            sheetsample.add_sample_error("sequencing_method", "invalid_value", seqmethodvalue, VIPSamplesheetChecker.VALID_COLUMN_VALUES["sequencing_method"])
         elif seqmethodvalue == "":
-            sheetsample.add_sample_info("sequencing_method", "No assigned value, will be WGS by default.")
+            sheetsample.add_sample_info("sequencing_method", "default_value", VIPSamplesheetChecker.DEFAULT_SEQUENCING_METHOD)
+        elif seqmethodvalue == "WES" and (sheetsample.get_datafield("regions") or "").strip() == "":
+            sheetsample.add_sample_info("sequencing_method", "wes_without_regions")
         # samplesheet.add_sequencing_method(seqmethodvalue)
     
     
@@ -398,9 +524,9 @@ class VIPSamplesheetChecker:
         """
         seqplatformvalue = sheetsample.get_sequencing_platform()
         if seqplatformvalue not in VIPSamplesheetChecker.VALID_COLUMN_VALUES["sequencing_platform"]:
-            sheetsample.add_sample_error("sequencing_platform", f"Assigned value is incorrect. Please supply one of the following values: {VIPSamplesheetChecker.VALID_COLUMN_VALUES["sequencing_platform"]}")
+            sheetsample.add_sample_error("sequencing_platform", "invalid_value", seqplatformvalue, VIPSamplesheetChecker.VALID_COLUMN_VALUES["sequencing_platform"])
         elif seqplatformvalue.strip() == "":
-            sheetsample.add_sample_info(f"No assigned value, will be {DEFAULT_SEQPLATFORM_VALUES[runmode]} by default.")
+            sheetsample.add_sample_info("sequencing_platform", "default_value", VIPSamplesheetChecker.DEFAULT_SEQPLATFORM_VALUES[runmode])
         # samplesheet.add_sequencing_platform(seqplatformvalue.strip())
     
     
@@ -416,9 +542,9 @@ class VIPSamplesheetChecker:
         """
         assemblyvalue = sheetsample.get_assembly()
         if assemblyvalue not in VIPSamplesheetChecker.VALID_COLUMN_VALUES["assembly"]:
-            sheetsample.add_sample_error("assembly", f"Assigned value is incorrect. Please use one of the following values: {VIPSamplesheetChecker.VALID_COLUMN_VALUES["assembly"]}.")
+            sheetsample.add_sample_error("assembly", "invalid_value", assemblyvalue, VIPSamplesheetChecker.VALID_COLUMN_VALUES["assembly"])
         elif assemblyvalue == "":
-            sheetsample.add_sample_info("assembly", "No assigned value, will be assumed to be GRCh38 by default.")
+            sheetsample.add_sample_info("assembly", "default_value", "GRCh38")
         # samplesheet.add_assembly(assemblyvalue)
     
     
@@ -434,99 +560,741 @@ class VIPSamplesheetChecker:
         """
         pcrperformedvalue = sheetsample.get_pcr_performed()
         if pcrperformedvalue not in VIPSamplesheetChecker.VALID_COLUMN_VALUES["pcr_performed"]:
-            sheetsample.add_sample_error("pcr_performed", f"Assigned value is incorrect. Please use one of the following values: {VIPSamplesheetChecker.VALID_COLUMN_VALUES["pcr_performed"]}")
+            sheetsample.add_sample_error("pcr_performed", "invalid_value", pcrperformedvalue, VIPSamplesheetChecker.VALID_COLUMN_VALUES["pcr_performed"])
         elif pcrperformedvalue == "":
-            sheetsample.add_sample_info("pcr_performed", "No assigned value, will be set to false by default.")
+            sheetsample.add_sample_info("pcr_performed", "default_value", "false")
     
     
-    def check_fastq_files(self, sheetsample, columnname, fastqfiles):
-        """Checks whether the list of fastq files exist.
+    def get_sample_column_files(self, runmode, sheetsample, columnname):
+        """Returns the files to check for a file column of a sample, with the bash variables in their paths resolved.
+        
+        Parameters
+        ----------
+        runmode : str
+            Specific runmode to check the sample for
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample containing the files
+        columnname : str
+            Name of the samplesheet column containing the files
+        
+        Returns
+        -------
+        columnfiles : list of tuple
+            Filetype, path and valid extensions for each file to check
+        """
+        columnfiles = []
+        match columnname:
+            case "regions":
+                columnfiles.append(("BED", self.path_resolver.resolve_path(sheetsample.get_bed_file()), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["bed"]))
+            case "fastq" | "fastq_r1" | "fastq_r2":
+                if columnname == "fastq":
+                    fastqfiles = sheetsample.get_fastq_files()
+                elif columnname == "fastq_r1":
+                    fastqfiles = sheetsample.get_fastq_r1_files()
+                else:
+                    fastqfiles = sheetsample.get_fastq_r2_files()
+                for fastqfile in fastqfiles.split(","):
+                    columnfiles.append(("FASTQ", self.path_resolver.resolve_path(fastqfile), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["fastq"]))
+            case "cram":
+                if runmode == "cram" or sheetsample.get_cram_file() != "":
+                    columnfiles.append(("SAM/BAM/CRAM", self.path_resolver.resolve_path(sheetsample.get_cram_file()), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["cram"]))
+            case "gvcf":
+                if runmode == "gvcf" or sheetsample.get_gvcf_file() != "":
+                    columnfiles.append(("GVCF", self.path_resolver.resolve_path(sheetsample.get_gvcf_file()), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["gvcf"]))
+            case "vcf":
+                columnfiles.append(("VCF", self.path_resolver.resolve_path(sheetsample.get_vcf_file()), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["vcf"]))
+        return columnfiles
+    
+    
+    def check_sample_file_paths(self, runmode, sheetsample, columnname):
+        """Checks the file paths in a file column of a sample without accessing the filesystem.
         
         Parameters
         ----------
+        runmode : str
+            Specific runmode to check the sample for
         sheetsample : VIPSamplesheetSample
-            Samplesheet sample containing the fastq files
+            Samplesheet sample containing the files
         columnname : str
-            Name of te column containing the fastq files
-        fastqfiles : list of str
-            List of fastq files to check
-        """
-        fastqfiles = fastqfiles.split(",")
-        if len(fastqfiles) > 0:
-            for fastqfile in fastqfiles:
-                self.check_file_exists(sheetsample, columnname, "FASTQ", fastqfile, VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["fastq"])
-        else:
-            sheetsample.add_sample_error(columnname, "There are no fastq files.")
+            Name of the samplesheet column containing the files
+        """
+        columnfiles = self.get_sample_column_files(runmode, sheetsample, columnname)
+        if columnname.startswith("fastq") and len(columnfiles) == 0:
+            sheetsample.add_sample_error(columnname, "no_fastq_files")
+        for filetype, filetocheck, fileexts in columnfiles:
+            if VIPSamplesheetChecker.has_unresolved_variable(filetocheck):
+                sheetsample.add_sample_info(columnname, "unresolved_variable", filetype, filetocheck)
+            # The files matching fastq directories and glob patterns are filtered on their extension instead
+            if not VIPSamplesheetChecker.is_fastq_pattern(columnname, filetocheck):
+                self.check_file_extension(sheetsample, columnname, filetype, filetocheck, fileexts)
+    
+    
+    def check_sample_files(self, runmode, headerfields, samplesheetsample):
+        """Checks whether the files of a single samplesheet sample exist, are not empty and have the expected contents.
+        
+        Parameters
+        ----------
+        runmode : str
+            Specific runmode
+        headerfields : list of str
+            List of headerfields of the samplesheet
+        samplesheetsample : VIPSamplesheetSample
+            Specific samplesheet sample to check the files of
+        """
+        for hf in headerfields:
+            if hf in VIPSamplesheetChecker.FILE_COLUMNS:
+                for filetype, filetocheck, fileexts in self.get_sample_column_files(runmode, samplesheetsample, hf):
+                    if VIPSamplesheetChecker.is_fastq_pattern(hf, filetocheck):
+                        self.check_expanded_files(runmode, samplesheetsample, hf, filetype, filetocheck, fileexts)
+                    elif self.check_file_exists(samplesheetsample, hf, filetype, filetocheck):
+                        if hf in VIPSamplesheetChecker.INDEXED_COLUMNS:
+                            self.check_file_index(samplesheetsample, hf, filetype, filetocheck)
+                        if self.fingerprinter is not None and hf in VIPSamplesheetChecker.DATA_FILE_COLUMNS:
+                            self.check_file_fingerprint(samplesheetsample, hf, filetype, filetocheck)
+                        if self.checksum_verifier is not None and hf in VIPSamplesheetChecker.DATA_FILE_COLUMNS:
+                            self.check_file_checksum(samplesheetsample, hf, filetype, filetocheck)
+                        self.check_file_contents(runmode, samplesheetsample, hf, filetype, filetocheck)
+        if "fastq_r1" in headerfields and "fastq_r2" in headerfields:
+            self.check_fastq_pair_files(samplesheetsample)
+        self.check_sequencing_method_data(samplesheetsample)
+    
+    
+    def prefetch_sample_files(self, runmode, headerfields, samplesheetsamples):
+        """Starts checking the files of multiple samples in the background.
+        
+        Parameters
+        ----------
+        runmode : str
+            Specific runmode
+        headerfields : list of str
+            List of headerfields of the samplesheet
+        samplesheetsamples : list of VIPSamplesheetSample
+            Samplesheet samples to check the files of
+        """
+        filestocheck = []
+        referencedfiles = []
+        headerstocheck = []
+        patternstoexpand = []
+        bedstocheck = []
+        datafilestocheck = []
+        for samplesheetsample in samplesheetsamples:
+            for hf in headerfields:
+                if hf in VIPSamplesheetChecker.FILE_COLUMNS:
+                    for filetype, filetocheck, fileexts in self.get_sample_column_files(runmode, samplesheetsample, hf):
+                        if VIPSamplesheetChecker.has_unresolved_variable(filetocheck):
+                            continue
+                        if VIPSamplesheetChecker.is_fastq_pattern(hf, filetocheck):
+                            patternstoexpand.append(filetocheck)
+                        else:
+                            filestocheck.append(filetocheck)
+                            referencedfiles.append(filetocheck)
+                            if hf in VIPSamplesheetChecker.INDEXED_COLUMNS:
+                                # Checked in the same batch as the data files
+                                filestocheck.extend(VIPSamplesheetChecker.get_index_files(filetocheck))
+                            if hf == "regions":
+                                bedstocheck.append(filetocheck)
+                            if hf in VIPSamplesheetChecker.DATA_FILE_COLUMNS:
+                                datafilestocheck.append(filetocheck)
+                            if hf in VIPSamplesheetChecker.HEADER_COLUMNS:
+                                headerstocheck.append(filetocheck)
+        self.file_prober.prefetch(filestocheck)
+        self.file_prober.prefetch(patternstoexpand, "expand")
+        self.file_prober.prefetch(bedstocheck, "bed")
+        if self.fingerprinter is not None:
+            self.file_prober.prefetch(datafilestocheck, "fingerprint")
+        if self.checksum_verifier is not None:
+            self.file_prober.prefetch(datafilestocheck, "checksum")
+        if self.header_reader is not None:
+            self.file_prober.prefetch(headerstocheck, "header")
+        
+        # Index candidates are only checked for existence
+        self.file_prober.prefetch([rf for rf in referencedfiles if self.file_inspector.needs_inspection(rf)], "inspect")
+        if self.file_inspector.integrity_mode == "deep":
+            # Only started for existing, non empty files (the stat is done on the prober)
+            self.file_prober.prefetch([rf for rf in referencedfiles if self.file_inspector.is_compressed_file(rf)], "deep")
+    
     
+    def cancel_file_checks(self):
+        """Cancels the file checks that were started in the background but are not done yet."""
+        self.file_prober.cancel_pending()
+        self.file_inspector.cancel_deep_checks()
+        self.sheet_fingerprints = []
+        if self.checksum_verifier is not None:
+            self.checksum_verifier.cancel_checksums()
     
-    def check_bed_file(self, sheetsample, columnname):
-        """Checks whether the provided BED file of a sample exists.
+    
+    @staticmethod
+    def has_unresolved_variable(filetocheck):
+        """Returns whether a file path still contains a bash variable after resolving (making it not possible to check).
+        
+        Parameters
+        ----------
+        filetocheck : str
+            Path to the file
+        
+        Returns
+        -------
+        bool
+            True if the path contains a variable, False if not
+        """
+        return "$" in filetocheck
+    
+    
+    @staticmethod
+    def is_fastq_pattern(columnname, filetocheck):
+        """Returns whether a path in a fastq column is a directory (ending with /) or glob pattern to expand.
         
         Parameters
         ----------
-        sheetsample : VIPSamplesheetSample
-            Samplesheet sample with a BED file
         columnname : str
-            Name of the samplesheet column containing the BED file
+            Name of the samplesheet column containing the path
+        filetocheck : str
+            Path to check
+        
+        Returns
+        -------
+        bool
+            True if the path should be expanded, False if not
         """
-        self.check_file_exists(sheetsample, columnname, "BED", sheetsample.get_bed_file(), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["bed"])
+        return columnname.startswith("fastq") and VIPPathExpander.is_pattern(filetocheck)
     
     
-    def check_cram_file(self, sheetsample, columnname, runmode):
-        """Checks whether the provided SAM/BAM/CRAM file of a sample exists.
+    def check_file_exists(self, sheetsample, columnname, filetype, filetocheck):
+        """Checks whether a supplied file exists and is not empty.
+        
+        Paths containing a bash variable that could not be resolved are not checked. If the file could not be checked in time
+        (for example due to a hanging network mount), this is reported as info.
         
         Parameters
         ----------
         sheetsample : VIPSamplesheetSample
-            Samplesheet sample with a SAM/BAM/CRAM file
+            Samplesheet sample with a file to check
         columnname : str
-            Name of the samplesheet column containing the CRAM file
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (BED, CRAM, etc)
+        filetocheck : str
+            Path to the file to check
+        
+        Returns
+        -------
+        bool
+            True if the file exists and is not empty, False if not (or if it could not be checked)
+        """
+        if VIPSamplesheetChecker.has_unresolved_variable(filetocheck):
+            return False
+        filestatus, filesize = self.file_prober.get_file_status(filetocheck)
+        if filestatus in VIPSamplesheetChecker.UNVERIFIABLE_REASONS:
+            sheetsample.add_sample_info(columnname, "file_unverifiable", filetype, filetocheck, VIPSamplesheetChecker.UNVERIFIABLE_REASONS[filestatus])
+        elif filestatus == VIPFileProber.PROBE_DANGLING_LINK:
+            sheetsample.add_sample_error(columnname, "dangling_link", filetype, filetocheck, self.file_prober.get_canonical_path(filetocheck))
+        elif filestatus == VIPFileProber.PROBE_NOT_FILE:
+            sheetsample.add_sample_error(columnname, "file_not_found", filetype, filetocheck)
+        elif filesize == 0:
+            sheetsample.add_sample_error(columnname, "file_empty", filetype, filetocheck)
+        else:
+            return True
+        return False
+    
+    
+    def check_expanded_files(self, runmode, sheetsample, columnname, filetype, filetocheck, fileexts):
+        """Checks the files matching a fastq directory or glob pattern.
+        
+        The directory is scanned once (also when used by multiple samples) and the results of the matching
+        files are aggregated into a single message. The contents of the first matching file are checked
+        with the set content checks.
+        
+        Parameters
+        ----------
         runmode : str
             Specific runmode to check the sample for
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample with the files to check
+        columnname : str
+            Name of the samplesheet column containing the directory or glob pattern
+        filetype : str
+            Filetype (FASTQ)
+        filetocheck : str
+            Directory or glob pattern to check
+        fileexts : list of str
+            Valid extensions of the files to match
+        """
+        if VIPSamplesheetChecker.has_unresolved_variable(filetocheck):
+            return
+        expandstatus, expandedfiles = self.file_prober.get_probe_result("expand", filetocheck)
+        if expandstatus in VIPSamplesheetChecker.UNVERIFIABLE_REASONS:
+            sheetsample.add_sample_info(columnname, "file_unverifiable", filetype, filetocheck, VIPSamplesheetChecker.UNVERIFIABLE_REASONS[expandstatus])
+            return
+        if expandstatus == VIPPathExpander.DIRECTORY_NOT_FOUND:
+            sheetsample.add_sample_error(columnname, "directory_not_found", filetype, filetocheck)
+            return
+        
+        matchedfiles = [(fp, fs) for fp, fs in expandedfiles if any(fp.endswith(f".{fe}") for fe in fileexts)]
+        if not matchedfiles:
+            sheetsample.add_sample_error(columnname, "no_matching_files", filetype, filetocheck)
+            return
+        emptyfiles = [fp for fp, fs in matchedfiles if fs == 0]
+        if emptyfiles:
+            sheetsample.add_sample_error(columnname, "matching_files_empty", filetype, filetocheck, len(emptyfiles), len(matchedfiles), emptyfiles[0])
+        sheetsample.add_sample_info(columnname, "matching_files", filetype, filetocheck, len(matchedfiles), sum(fs for fp, fs in matchedfiles))
+        self.check_file_contents(runmode, sheetsample, columnname, filetype, matchedfiles[0][0])
+    
+    
+    @staticmethod
+    def get_index_files(filetocheck):
+        """Returns the possible index files of a data file based on its extension.
+        
+        Parameters
+        ----------
+        filetocheck : str
+            Path to the data file
+        
+        Returns
+        -------
+        list of str
+            Paths of the possible index files, empty if the file does not need an index
         """
-        if runmode == "cram":
-            self.check_file_exists(sheetsample, columnname, "SAM/BAM/CRAM", sheetsample.get_cram_file(), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["cram"])
-        elif runmode != "cram" and sheetsample.get_cram_file() != "":
-            self.check_file_exists(sheetsample, columnname, "SAM/BAM/CRAM", sheetsample.get_cram_file(), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["cram"])
+        for dataext, indexexts in VIPSamplesheetChecker.INDEX_FILE_EXTENSIONS.items():
+            if filetocheck.endswith(f".{dataext}"):
+                return [filetocheck[:len(filetocheck) - len(removeext)] + addext for removeext, addext in indexexts]
+        return []
     
     
-    def check_gvcf_file(self, sheetsample, columnname, runmode):
-        """Checks whether the provided GVCF of a sample file exists.
+    def check_file_index(self, sheetsample, columnname, filetype, filetocheck):
+        """Checks whether an existing data file has an index file that is not older than the data file.
+        
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample with a file to check
+        columnname : str
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (CRAM, VCF, etc)
+        filetocheck : str
+            Path to the data file to check
+        """
+        indexfiles = VIPSamplesheetChecker.get_index_files(filetocheck)
+        for indexfile in indexfiles:
+            indexstatus, indexsize = self.file_prober.get_file_status(indexfile)
+            if indexstatus in VIPSamplesheetChecker.UNVERIFIABLE_REASONS:
+                return
+            if indexstatus == VIPFileProber.PROBE_FILE:
+                indexmtime = self.file_prober.get_file_modification_time(indexfile)
+                datamtime = self.file_prober.get_file_modification_time(filetocheck)
+                if indexmtime is not None and datamtime is not None and indexmtime < datamtime:
+                    sheetsample.add_sample_error(columnname, "index_outdated", filetype, filetocheck, indexfile)
+                return
+        if indexfiles:
+            sheetsample.add_sample_error(columnname, "index_not_found", filetype, filetocheck, " or ".join(indexfiles))
+    
+    
+    def check_file_fingerprint(self, sheetsample, columnname, filetype, filetocheck):
+        """Adds the fingerprint of a data file to the index of the fingerprints of all checked data files.
+        
+        The index is kept over all samplesheets, so a copy of a file that is used for another individual in
+        another samplesheet is found as well. Files with the same fingerprint are reported once all files of
+        the samplesheet are checked (see check_sheet_file_fingerprints()).
         
         Parameters
         ----------
         sheetsample : VIPSamplesheetSample
-            Sampelsheet sample with a GVCF file
+            Samplesheet sample with a file to check
         columnname : str
-            Name of the samplesheet column containing the GVCF file
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (FASTQ, CRAM, etc)
+        filetocheck : str
+            Path to the data file to check
+        """
+        fingerprintstatus, fingerprint = self.file_prober.get_probe_result("fingerprint", filetocheck)
+        if fingerprint is None:
+            return
+        fingerprintfiles = self.fingerprint_index.setdefault(fingerprint, [])
+        if (filetocheck, sheetsample.get_individual_id()) not in fingerprintfiles:
+            fingerprintfiles.append((filetocheck, sheetsample.get_individual_id()))
+        self.sheet_fingerprints.append((sheetsample, columnname, filetype, filetocheck, fingerprint))
+    
+    
+    def check_sheet_file_fingerprints(self):
+        """Reports the data files of the checked samplesheet that have the same fingerprint as a data file with another path.
+        
+        Every file of a group of files with the same fingerprint is reported, with the other files of the
+        group (also the ones in earlier samplesheets). Files used for another individual are reported as
+        error (a probable sample swap), files used for the same individual (for example in two runmodes) as info.
+        """
+        for sheetsample, columnname, filetype, filetocheck, fingerprint in self.sheet_fingerprints:
+            individualid = sheetsample.get_individual_id()
+            physicalfiles = []
+            contentfiles = []
+            for otherfile, otherindividualid in self.fingerprint_index[fingerprint]:
+                if otherfile == filetocheck:
+                    continue
+                if self.file_prober.get_canonical_path(otherfile) == self.file_prober.get_canonical_path(filetocheck):
+                    physicalfiles.append((otherfile, otherindividualid))
+                else:
+                    contentfiles.append((otherfile, otherindividualid))
+            for findingcode, otherfiles in [("same_physical_file", physicalfiles), ("same_file_contents", contentfiles)]:
+                if not otherfiles:
+                    continue
+                otherfilestext = ", ".join(f"\"{of}\" (individual {oi})" for of, oi in otherfiles)
+                if any(oi != individualid for of, oi in otherfiles):
+                    sheetsample.add_sample_error(columnname, findingcode, filetype, filetocheck, otherfilestext)
+                else:
+                    sheetsample.add_sample_info(columnname, findingcode, filetype, filetocheck, otherfilestext)
+        self.sheet_fingerprints = []
+    
+    
+    def check_file_checksum(self, sheetsample, columnname, filetype, filetocheck):
+        """Checks whether a data file matches the MD5 checksum in the .md5 or .md5sum file next to it.
+        
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample with a file to check
+        columnname : str
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (FASTQ, CRAM, etc)
+        filetocheck : str
+            Path to the data file to check
+        """
+        preparedchecksum = self.file_prober.get_probe_result("checksum", filetocheck)
+        if preparedchecksum[0] in VIPSamplesheetChecker.UNVERIFIABLE_REASONS:
+            sheetsample.add_sample_info(columnname, "file_unverifiable", filetype, filetocheck, VIPSamplesheetChecker.UNVERIFIABLE_REASONS[preparedchecksum[0]])
+            return
+        checksumstatus, checksumfile, expectedchecksum, calculatedchecksum = self.checksum_verifier.get_checksum_result(filetocheck, preparedchecksum)
+        if checksumstatus == VIPChecksumVerifier.CHECKSUM_MISMATCH:
+            sheetsample.add_sample_error(columnname, "checksum_mismatch", filetype, filetocheck, checksumfile, expectedchecksum, calculatedchecksum)
+        elif checksumstatus == VIPChecksumVerifier.CHECKSUM_FILE_INVALID:
+            sheetsample.add_sample_error(columnname, "checksum_file_invalid", filetype, filetocheck, checksumfile)
+        elif checksumstatus == VIPChecksumVerifier.NO_CHECKSUM_FILE:
+            sheetsample.add_sample_info(columnname, "checksum_not_found", filetype, filetocheck)
+    
+    
+    def check_file_contents(self, runmode, sheetsample, columnname, filetype, filetocheck):
+        """Checks the contents of an existing file with the set content checks.
+        
+        Parameters
+        ----------
         runmode : str
             Specific runmode to check the sample for
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample with a file to check
+        columnname : str
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (BED, CRAM, etc)
+        filetocheck : str
+            Path to the file to check
         """
-        if runmode == "gvcf":
-            self.check_file_exists(sheetsample, columnname, "GVCF", sheetsample.get_gvcf_file(), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["gvcf"])
-        elif runmode != "gvcf" and sheetsample.get_gvcf_file() != "":
-            self.check_file_exists(sheetsample, columnname, "GVCF", sheetsample.get_gvcf_file(), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["gvcf"])
+        if self.file_inspector.needs_inspection(filetocheck):
+            inspectresult = self.file_prober.get_probe_result("inspect", filetocheck)
+            if inspectresult[0] == VIPFileInspector.INSPECTED:
+                inspectstatus, fileformat, integritystatus, problem = inspectresult
+                self.check_file_integrity(sheetsample, columnname, filetype, filetocheck, integritystatus, problem)
+                self.check_file_format(runmode, sheetsample, columnname, filetype, filetocheck, fileformat)
+        if columnname == "regions":
+            self.check_bed_contents(sheetsample, columnname, filetype, filetocheck)
+        if self.header_reader is not None and columnname in VIPSamplesheetChecker.HEADER_COLUMNS:
+            self.check_file_header(runmode, sheetsample, columnname, filetype, filetocheck)
+    
+    
+    def check_file_integrity(self, sheetsample, columnname, filetype, filetocheck, integritystatus, problem):
+        """Checks whether a compressed file is not corrupt or truncated (if an integrity check mode is set).
+        
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample with a file to check
+        columnname : str
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (BED, CRAM, etc)
+        filetocheck : str
+            Path to the file to check
+        integritystatus : str
+            Integrity status found by the quick check
+        problem : str
+            Description of the problem found by the quick check
+        """
+        if self.file_inspector.integrity_mode == "none" or not self.file_inspector.is_compressed_file(filetocheck):
+            return
+        if integritystatus == VIPFileInspector.INTEGRITY_OK and self.file_inspector.integrity_mode == "deep":
+            integritystatus, problem = self.file_inspector.get_deep_check_result(filetocheck)
+        if integritystatus == VIPFileInspector.INTEGRITY_TIMEOUT:
+            sheetsample.add_sample_info(columnname, "file_unverifiable", filetype, filetocheck, f"deep integrity check not done within {self.file_inspector.deep_check_timeout:g} seconds")
+        elif integritystatus == VIPFileInspector.INTEGRITY_CORRUPT:
+            sheetsample.add_sample_error(columnname, "corrupt_file", filetype, filetocheck, problem)
+    
+    
+    def check_file_format(self, runmode, sheetsample, columnname, filetype, filetocheck, fileformat):
+        """Checks whether the format found in a file can be used for the column and matches the extension.
+        
+        Parameters
+        ----------
+        runmode : str
+            Specific runmode to check the sample for
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample with a file to check
+        columnname : str
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (BED, CRAM, etc)
+        filetocheck : str
+            Path to the file to check
+        fileformat : str
+            Format found in the file (None if unknown)
+        """
+        if fileformat is None or columnname not in VIPSamplesheetChecker.VALID_FILE_FORMATS:
+            return
+        extensionformat = self.file_inspector.get_extension_file_format(filetocheck)
+        if fileformat not in VIPSamplesheetChecker.VALID_FILE_FORMATS[columnname]:
+            sheetsample.add_sample_error(columnname, "wrong_file_format", filetype, filetocheck, fileformat, runmode)
+        elif extensionformat is not None and extensionformat != fileformat:
+            sheetsample.add_sample_error(columnname, "file_format_mismatch", filetype, filetocheck, fileformat, extensionformat)
     
     
-    def check_vcf_file(self, sheetsample, columnname):
-        """Checks whether the provided VCF file of a sample exists.
+    def check_file_header(self, runmode, sheetsample, columnname, filetype, filetocheck):
+        """Checks the header of a file against the values of the samplesheet sample.
+        
+        Parameters
+        ----------
+        runmode : str
+            Specific runmode to check the sample for
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample with a file to check
+        columnname : str
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (BED, CRAM, etc)
+        filetocheck : str
+            Path to the file to check
+        """
+        headerstatus, headerinfo = self.file_prober.get_probe_result("header", filetocheck)
+        if headerstatus != VIPHeaderReader.HEADER_READ or headerinfo is None:
+            return
+        if headerinfo["format"] == "FASTQ":
+            self.check_header_platform(runmode, sheetsample, columnname, filetype, filetocheck, headerinfo)
+            return
+        self.check_header_samples(sheetsample, columnname, filetype, filetocheck, headerinfo)
+        if "assembly" in VIPSamplesheetChecker.OPTIONAL_SAMPLE_SHEET_COLUMNS[runmode]:
+            self.check_header_assembly(sheetsample, columnname, filetype, filetocheck, headerinfo)
+    
+    
+    def check_header_samples(self, sheetsample, columnname, filetype, filetocheck, headerinfo):
+        """Checks whether the individual id of the sample is one of the samples in the header of a file.
+        
+        For VCF files these are the sample columns, for SAM/BAM/CRAM files the read group samples (@RG SM).
         
         Parameters
         ----------
         sheetsample : VIPSamplesheetSample
-            Samplesheet sample with a VCF file
+            Samplesheet sample with a file to check
         columnname : str
-            Name of the samplesheet column containing the VCF file
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (BED, CRAM, etc)
+        filetocheck : str
+            Path to the file to check
+        headerinfo : dict
+            Header information read from the file
         """
-        self.check_file_exists(sheetsample, columnname, "VCF", sheetsample.get_vcf_file(), VIPSamplesheetChecker.VALID_FILE_EXTENSIONS["vcf"])
+        individualid = sheetsample.get_individual_id()
+        if individualid == "":
+            return
+        if headerinfo["samples"] is None:
+            sheetsample.add_sample_info(columnname, "file_unverifiable", filetype, filetocheck, "no #CHROM header line found")
+            return
+        if headerinfo["format"] != "VCF" and not headerinfo["samples"]:
+            # Files without read groups do not name their sample
+            return
+        if "sample_set" not in headerinfo:
+            headerinfo["sample_set"] = set(headerinfo["samples"])
+        if individualid not in headerinfo["sample_set"]:
+            headersamples = ", ".join(headerinfo["samples"][:VIPSamplesheetChecker.MAX_REPORTED_HEADER_SAMPLES])
+            if len(headerinfo["samples"]) > VIPSamplesheetChecker.MAX_REPORTED_HEADER_SAMPLES:
+                headersamples += ", ..."
+            sheetsample.add_sample_error(columnname, "sample_not_in_file", filetype, filetocheck, individualid, headersamples if headersamples != "" else "none")
+    
+    
+    def check_header_assembly(self, sheetsample, columnname, filetype, filetocheck, headerinfo):
+        """Checks whether the assembly inferred from the contigs in the header of a file matches the assembly of the sample.
+        
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample with a file to check
+        columnname : str
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (BED, CRAM, etc)
+        filetocheck : str
+            Path to the file to check
+        headerinfo : dict
+            Header information read from the file
+        """
+        # The assembly column is optional, without it the default assembly is used
+        sampleassembly, assemblyvalue = self.get_sample_assembly(sheetsample)
+        if sampleassembly is None:
+            return
+        fileassembly, reason = self.header_reader.infer_assembly(headerinfo)
+        if fileassembly is not None and fileassembly != sampleassembly:
+            sheetsample.add_sample_error(columnname, "assembly_mismatch", filetype, filetocheck, fileassembly, reason, assemblyvalue)
     
     
-    def check_file_exists(self, sheetsample, columnname, filetype, filetocheck, fileexts):
-        """Checks whether a supplied file exists.
+    def get_sample_assembly(self, sheetsample):
+        """Returns the assembly of a sample, which is the default assembly if the assembly column is empty or missing.
         
-        The filepath is checked whether the file exists or whether the path
-        contains a bash variable (making it not possible to check).
-        It is also checked whether the file is of the correct type via its extension.
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample to get the assembly of
+        
+        Returns
+        -------
+        tuple
+            Assembly (None if the value is invalid) and the assembly to display in messages
+        """
+        assemblyvalue = sheetsample.get_datafield("assembly")
+        assemblyvalue = assemblyvalue.strip() if assemblyvalue is not None else ""
+        if assemblyvalue == "":
+            return (VIPSamplesheetChecker.DEFAULT_ASSEMBLY, f"{VIPSamplesheetChecker.DEFAULT_ASSEMBLY} (default)")
+        if assemblyvalue not in VIPSamplesheetChecker.VALID_COLUMN_VALUES["assembly"]:
+            return (None, assemblyvalue)
+        return (assemblyvalue, assemblyvalue)
+    
+    
+    def check_header_platform(self, runmode, sheetsample, columnname, filetype, filetocheck, headerinfo):
+        """Checks whether the sequencing platform inferred from the first reads of a FASTQ file matches the platform of the sample.
+        
+        The inferred platform is a heuristic (trimmed or renamed reads can look like another platform), so a
+        mismatch is reported as info rather than as error.
+        
+        Parameters
+        ----------
+        runmode : str
+            Specific runmode to check the sample for
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample with a file to check
+        columnname : str
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (BED, CRAM, etc)
+        filetocheck : str
+            Path to the file to check
+        headerinfo : dict
+            Read information read from the file
+        """
+        # The sequencing_platform column is optional, without it the default platform of the runmode is used
+        seqplatformvalue = sheetsample.get_datafield("sequencing_platform")
+        seqplatformvalue = seqplatformvalue.strip() if seqplatformvalue is not None else ""
+        if seqplatformvalue not in VIPSamplesheetChecker.VALID_COLUMN_VALUES["sequencing_platform"] or headerinfo["platforms"] is None:
+            return
+        expectedplatform = seqplatformvalue if seqplatformvalue != "" else VIPSamplesheetChecker.DEFAULT_SEQPLATFORM_VALUES[runmode]
+        if expectedplatform not in headerinfo["platforms"]:
+            sheetsample.add_sample_info(columnname, "platform_mismatch", filetype, filetocheck, " or ".join(headerinfo["platforms"]), headerinfo["reason"], seqplatformvalue if seqplatformvalue != "" else f"{expectedplatform} (default)")
+    
+    
+    def check_bed_contents(self, sheetsample, columnname, filetype, filetocheck):
+        """Checks the regions in a BED file and the naming of its contigs for the assembly of the sample.
+        
+        Each BED file is only validated once, also when it is used by multiple samples.
+        
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample with a BED file to check
+        columnname : str
+            Name of the samplesheet column containing the file
+        filetype : str
+            Filetype (BED)
+        filetocheck : str
+            Path to the file to check
+        """
+        bedstatus, bedinfo = self.file_prober.get_probe_result("bed", filetocheck)
+        if bedstatus in VIPSamplesheetChecker.UNVERIFIABLE_REASONS:
+            sheetsample.add_sample_info(columnname, "file_unverifiable", filetype, filetocheck, VIPSamplesheetChecker.UNVERIFIABLE_REASONS[bedstatus])
+            return
+        if bedinfo is None:
+            return
+        if bedinfo["numinvalid"] > 0:
+            sheetsample.add_sample_error(columnname, "bed_invalid_lines", filetype, filetocheck, bedinfo["numinvalid"], bedinfo["firstinvalid"][0], bedinfo["firstinvalid"][1])
+        if bedinfo["numregions"] == 0:
+            sheetsample.add_sample_error(columnname, "bed_no_regions", filetype, filetocheck)
+            return
+        if bedinfo["firstunsorted"] is not None:
+            sheetsample.add_sample_error(columnname, "bed_unsorted", filetype, filetocheck, bedinfo["firstunsorted"])
+        
+        sampleassembly, assemblyvalue = self.get_sample_assembly(sheetsample)
+        if sampleassembly is not None:
+            if VIPSamplesheetChecker.ASSEMBLY_CONTIG_PREFIXES[sampleassembly] == "chr" and bedinfo["nochrcontig"] is not None:
+                sheetsample.add_sample_error(columnname, "bed_contig_naming", filetype, filetocheck, bedinfo["nochrcontig"], assemblyvalue, "with chr prefix")
+            elif VIPSamplesheetChecker.ASSEMBLY_CONTIG_PREFIXES[sampleassembly] == "" and bedinfo["chrcontig"] is not None:
+                sheetsample.add_sample_error(columnname, "bed_contig_naming", filetype, filetocheck, bedinfo["chrcontig"], assemblyvalue, "without chr prefix")
+        if bedinfo["coveredbases"] is not None:
+            sheetsample.add_sample_info(columnname, "bed_regions", filetype, filetocheck, bedinfo["numregions"], bedinfo["coveredbases"])
+    
+    
+    def check_sequencing_method_data(self, sheetsample):
+        """Checks whether the sequencing method of a sample is plausible for the size of its regions and CRAM file.
+        
+        The number of bases covered by the regions is taken from the (cached) BED file validation, so it is
+        only computed once per BED file. Genome sized regions for WES are reported as error, exome or panel
+        sized regions for WGS (restricting the analysis) and unusual CRAM file sizes are reported as info.
+        The size of the CRAM file itself (taken from the cached stat) is used as proxy for the amount of
+        data, the index is not read. Only done for samples with an explicit sequencing_method, the default
+        method says nothing about the data.
+        
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample to check
+        """
+        seqmethodvalue = (sheetsample.get_datafield("sequencing_method") or "").strip()
+        if seqmethodvalue == "" or seqmethodvalue not in VIPSamplesheetChecker.VALID_COLUMN_VALUES["sequencing_method"]:
+            return
+        
+        bedfile = self.path_resolver.resolve_path((sheetsample.get_datafield("regions") or "").strip())
+        if bedfile != "" and self.get_existing_file_size(bedfile) is not None:
+            bedstatus, bedinfo = self.file_prober.get_probe_result("bed", bedfile)
+            # Unsorted BED files have no number of covered bases
+            if bedinfo is not None and bedinfo["coveredbases"] is not None and bedinfo["numregions"] > 0:
+                if seqmethodvalue == "WES" and bedinfo["coveredbases"] > VIPSamplesheetChecker.MAX_WES_COVERED_BASES:
+                    sheetsample.add_sample_error("regions", "sequencing_method_regions", seqmethodvalue, bedinfo["coveredbases"], bedfile, "genome sized")
+                elif seqmethodvalue == "WGS" and bedinfo["coveredbases"] <= VIPSamplesheetChecker.MAX_WES_COVERED_BASES:
+                    sheetsample.add_sample_info("regions", "sequencing_method_regions", seqmethodvalue, bedinfo["coveredbases"], bedfile, "exome or panel sized, only these regions are analysed")
+        
+        cramfile = self.path_resolver.resolve_path((sheetsample.get_datafield("cram") or "").strip())
+        if cramfile.endswith(".cram"):
+            cramsize = self.get_existing_file_size(cramfile)
+            if cramsize is None:
+                return
+            if (seqmethodvalue == "WGS" and cramsize < VIPSamplesheetChecker.MIN_WGS_CRAM_SIZE) or (seqmethodvalue == "WES" and cramsize > VIPSamplesheetChecker.MAX_WES_CRAM_SIZE):
+                sheetsample.add_sample_info("cram", "sequencing_method_data_size", seqmethodvalue, cramfile, cramsize)
+    
+    
+    def get_existing_file_size(self, filetocheck):
+        """Returns the size of a file from the (cached) file checks.
+        
+        Parameters
+        ----------
+        filetocheck : str
+            Path to the file
+        
+        Returns
+        -------
+        int
+            Size of the file in bytes, None if the file does not exist or could not be checked
+        """
+        if VIPSamplesheetChecker.has_unresolved_variable(filetocheck):
+            return None
+        filestatus, filesize = self.file_prober.get_file_status(filetocheck)
+        return filesize if filestatus == VIPFileProber.PROBE_FILE else None
+    
+    
+    def check_file_extension(self, sheetsample, columnname, filetype, filetocheck, fileexts):
+        """Checks whether a supplied file is of the correct type via its extension.
         
         Parameters
         ----------
@@ -541,21 +1309,125 @@ class VIPSamplesheetChecker:
         fileexts : list of str
             List of valid file extensions
         """
-        if "$" in filetocheck or "${" in filetocheck:
-            sheetsample.add_sample_info(columnname, f"Path to {filetype} file \"{filetocheck}\" contains a bash variable and might exist but could not be checked.")
-        elif not Path(filetocheck).is_file():
-            sheetsample.add_sample_error(columnname, f"{filetype} file \"{filetocheck}\" does not exist.")
-        elif Path(filetocheck).is_file():
-            if os.stat(filetocheck).st_size == 0:
-                sheetsample.add_sample_error(columnname, f"{filetype} file \"{filetocheck}\" has a size of 0 bytes.")
         #if filetocheck.split(".")[-1] not in fileexts or filetocheck.split(".")[-2] + "." + filetocheck.split(".")[-1] not in fileexts:
         #    print(f"{filetype} file \"{filetocheck}\" doesn't seem to be of the correct type.\n")
         if filetocheck.split(".")[-1] not in fileexts:
             if len(filetocheck.split(".")) > 2:
                 if filetocheck.split(".")[-2] + "." + filetocheck.split(".")[-1] not in fileexts:
-                    sheetsample.add_sample_error(columnname, f"{filetype} file \"{filetocheck}\" doesn't seem to be of the correct type.")
+                    sheetsample.add_sample_error(columnname, "wrong_file_type", filetype, filetocheck)
+            else:
+                sheetsample.add_sample_error(columnname, "wrong_file_type", filetype, filetocheck)
+    
+    
+    def get_fastq_pairs(self, sheetsample):
+        """Returns the R1 and R2 fastq files of a sample.
+        
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample containing the fastq files
+        
+        Returns
+        -------
+        tuple of list of str
+            R1 files and R2 files (without empty values, with the bash variables resolved)
+        """
+        r1files = [self.path_resolver.resolve_path(r1f) for r1f in sheetsample.get_fastq_r1_files().split(",") if r1f != ""]
+        r2files = [self.path_resolver.resolve_path(r2f) for r2f in sheetsample.get_fastq_r2_files().split(",") if r2f != ""]
+        return (r1files, r2files)
+    
+    
+    @staticmethod
+    def get_mate_file_names(fastqfile):
+        """Returns the possible file names of the R2 mate of a R1 fastq file.
+        
+        Parameters
+        ----------
+        fastqfile : str
+            Path to the R1 fastq file
+        
+        Returns
+        -------
+        set of str
+            File names (without directory) with one of the read numbers replaced by 2, empty if the name has no read number
+        """
+        filename = fastqfile.split("/")[-1]
+        return {filename[:rn.start()] + rn.group(0)[:-1] + "2" + filename[rn.end():] for rn in VIPSamplesheetChecker.FASTQ_READ_NUMBER.finditer(filename)}
+    
+    
+    def check_fastq_pairs(self, sheetsample):
+        """Checks whether the R1 and R2 fastq files of a sample are paired by position, based on their file names.
+        
+        The name of each R2 file should be the name of the R1 file at the same position with its read number
+        (for example R1 or _1) replaced by 2. Files without a read number in their name are not checked.
+        
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample containing the fastq files
+        """
+        r1files, r2files = self.get_fastq_pairs(sheetsample)
+        if len(r1files) != len(r2files):
+            sheetsample.add_sample_error("fastq_r2", "fastq_pair_count", len(r1files), len(r2files))
+            return
+        r2filenames = {r2f.split("/")[-1] for r2f in r2files}
+        for r1file, r2file in zip(r1files, r2files):
+            if r1file.split("/")[-1] in VIPSamplesheetChecker.get_mate_file_names(r2file):
+                sheetsample.add_sample_error("fastq_r2", "fastq_pair_mismatch", r1file, r2file, "R1 and R2 seem to be swapped")
+                continue
+            matenames = VIPSamplesheetChecker.get_mate_file_names(r1file)
+            if not matenames or r2file.split("/")[-1] in matenames:
+                continue
+            if matenames & r2filenames:
+                sheetsample.add_sample_error("fastq_r2", "fastq_pair_mismatch", r1file, r2file, "the R2 file of the R1 file is at another position")
             else:
-                sheetsample.add_sample_error(columnname, f"{filetype} file \"{filetocheck}\" doesn't seem to be of the correct type.")
+                sheetsample.add_sample_error("fastq_r2", "fastq_pair_mismatch", r1file, r2file, "the file names do not only differ in the read number")
+    
+    
+    def check_fastq_pair_files(self, sheetsample):
+        """Checks whether the existing R1 and R2 fastq files of a sample have comparable sizes and (with header checks) the same first read names.
+        
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample containing the fastq files
+        """
+        r1files, r2files = self.get_fastq_pairs(sheetsample)
+        if len(r1files) != len(r2files):
+            return
+        for r1file, r2file in zip(r1files, r2files):
+            if any(VIPSamplesheetChecker.has_unresolved_variable(fp) or VIPPathExpander.is_pattern(fp) for fp in [r1file, r2file]):
+                continue
+            r1status, r1size = self.file_prober.get_file_status(r1file)
+            r2status, r2size = self.file_prober.get_file_status(r2file)
+            if r1status != VIPFileProber.PROBE_FILE or r2status != VIPFileProber.PROBE_FILE or not r1size or not r2size:
+                continue
+            if max(r1size, r2size) / min(r1size, r2size) > VIPSamplesheetChecker.MAX_PAIR_SIZE_RATIO:
+                sheetsample.add_sample_error("fastq_r2", "fastq_pair_size_imbalance", r1file, r1size, r2file, r2size)
+            if self.header_reader is not None:
+                self.check_fastq_pair_read_names(sheetsample, r1file, r2file)
+    
+    
+    def check_fastq_pair_read_names(self, sheetsample, r1file, r2file):
+        """Checks whether the first reads of a R1 and R2 fastq file have the same names (in the same order).
+        
+        Parameters
+        ----------
+        sheetsample : VIPSamplesheetSample
+            Samplesheet sample containing the fastq files
+        r1file : str
+            Path to the R1 fastq file
+        r2file : str
+            Path to the R2 fastq file
+        """
+        r1status, r1info = self.file_prober.get_probe_result("header", r1file)
+        r2status, r2info = self.file_prober.get_probe_result("header", r2file)
+        if r1info is None or r2info is None or r1info["format"] != "FASTQ" or r2info["format"] != "FASTQ":
+            return
+        for r1readname, r2readname in zip(r1info["readnames"], r2info["readnames"]):
+            if r1readname != r2readname:
+                sheetsample.add_sample_error("fastq_r2", "fastq_pair_read_names", r1file, r2file, r1readname, r2readname)
+                return
     
     
     def check_for_multiple_values(self, sheetsample, columnname, columnvalue):
@@ -588,9 +1460,8 @@ class VIPSamplesheetChecker:
         columnvalue : str
             Specific value to check
         """
-        separated_values = columnvalue.split(separator)
-        if len(separated_values) > 1:
-            sheetsample.add_sample_error(columnname, f"Contains multiple values separated by {separator}.")
+        if separator in columnvalue:
+            sheetsample.add_sample_error(columnname, "multiple_values", separator)
     
     
     def check_for_nonprintable_chars(self, sheetsample, columnname, columnvalue):
@@ -606,7 +1477,7 @@ class VIPSamplesheetChecker:
             Specific value to check
         """
         if not columnvalue.isprintable():
-            sheetsample.add_sample_error(columnname, f"Value {re.sub(r"[\x00-\x1f]", "", columnvalue.strip())} contains nonprintable characters and might cause unexpected things.")
+            sheetsample.add_sample_error(columnname, "nonprintable_characters", columnvalue)
             # print(f"[ERROR]: Value {re.sub(r"[\x00-\x1f]", "", columnvalue.strip())} for {columnname} contains nonprintable characters and might cause unexpected things.")
     
     # Check for number of columns per sample
@@ -639,7 +1510,7 @@ class VIPSamplesheetChecker:
         """
         for fqfile in fastqfiles:
             if not fqfile.isprintable():
-                sheetsample.add_sample_error(columnname, f"Path to FASTQ file {re.sub(r"[\x00-\x1f]", "", fqfile.strip())} contains nonprintable characters and might cause unexpected things.")
+                sheetsample.add_sample_error(columnname, "nonprintable_characters", fqfile)
     
     
     def check_sheet_individualid_consistency(self, samplesheet):
@@ -655,8 +1526,9 @@ class VIPSamplesheetChecker:
         projectids_samplenums = samplesheet.get_projectid_to_sample_list()
         
         for projid in dupindivids:
+            projectdupindivids = set(dupindivids[projid])
             for samplenum in projectids_samplenums[projid]:
-                if sheetsamples[samplenum].get_datafield("individual_id") in dupindivids[projid]:
-                    sheetsamples[samplenum].add_sample_error("individual_id", f"Individual ID {sheetsamples[samplenum].get_datafield("individual_id")} occurs more than once for project_id {projid}")
+                if sheetsamples[samplenum].get_datafield("individual_id") in projectdupindivids:
+                    sheetsamples[samplenum].add_sample_error("individual_id", "duplicate_project_individual_id", sheetsamples[samplenum].get_datafield("individual_id"), projid)
     
     
@@ -0,0 +1,442 @@
+import re
+from array import array
+
+class VIPSamplesheetFindings:
+    SEVERITIES = ["error", "info"]
+    
+    # Message templates per finding code. The column name is available as {column}, the
+    # finding arguments as {0}, {1}, etc. Messages are only rendered when they are output.
+    FINDING_MESSAGES = {
+        "missing_columns": "Missing required columns: {0}",
+        "unreadable_samplesheet": "Samplesheet could not be read.",
+        "multiple_sheet_values": "Samplesheet contains multiple values for {column}.",
+        "multiple_project_values": "There is more than one value for project \"{0}\".",
+        "duplicate_individual_id": "Value \"{0}\" appears more than once in the samplesheet.",
+        "duplicate_project_individual_id": "Individual ID {0} occurs more than once for project_id {1}",
+        "empty_individual_id": "Value for individual_id cannot be empty.",
+        "maternal_id_not_found": "Maternal id \"{0}\" was not found in the samplesheet as individual.",
+        "paternal_id_not_found": "Paternal id \"{0}\" was not found in the samplesheet as individual.",
+        "invalid_value": "Assigned value \"{0}\" for {column} is incorrect. Please use one of the following values: {1}",
+        "default_value": "No assigned value for {column}, will be {0} by default.",
+        "multiple_values": "Contains multiple values separated by {0}.",
+        "nonprintable_characters": "Value {0} contains nonprintable characters and might cause unexpected things.",
+        "no_fastq_files": "There are no fastq files.",
+        "unresolved_variable": "Path to {0} file \"{1}\" contains a bash variable that is not set (in the environment or env file) and might exist but could not be checked.",
+        "file_not_found": "{0} file \"{1}\" does not exist.",
+        "dangling_link": "{0} file \"{1}\" is a broken symbolic link, the file it points to (\"{2}\") does not exist.",
+        "file_empty": "{0} file \"{1}\" has a size of 0 bytes.",
+        "wrong_file_type": "{0} file \"{1}\" doesn't seem to be of the correct type.",
+        "file_unverifiable": "{0} file \"{1}\" is unverifiable ({2}).",
+        "corrupt_file": "{0} file \"{1}\" seems to be corrupt or truncated ({2}).",
+        "wrong_file_format": "{0} file \"{1}\" contains {2} data, which can not be used for {column} in runmode {3}.",
+        "file_format_mismatch": "{0} file \"{1}\" contains {2} data, but its extension indicates {3}.",
+        "sample_not_in_file": "{0} file \"{1}\" does not contain sample {2} (samples in file: {3}).",
+        "assembly_mismatch": "{0} file \"{1}\" seems to be based on assembly {2} ({3}), but the assembly of the sample is {4}.",
+        "platform_mismatch": "{0} file \"{1}\" seems to contain {2} reads ({3}), but the sequencing platform of the sample is {4}.",
+        "fastq_pair_count": "There are {0} fastq_r1 files, but {1} fastq_r2 files.",
+        "fastq_pair_mismatch": "FASTQ files \"{0}\" and \"{1}\" do not seem to be a R1/R2 pair ({2}).",
+        "fastq_pair_size_imbalance": "FASTQ files \"{0}\" ({1} bytes) and \"{2}\" ({3} bytes) differ too much in size to be a R1/R2 pair.",
+        "fastq_pair_read_names": "The first reads of FASTQ files \"{0}\" and \"{1}\" do not have the same names (\"{2}\" and \"{3}\").",
+        "directory_not_found": "Directory of {0} path \"{1}\" does not exist.",
+        "no_matching_files": "{0} path \"{1}\" does not match any {0} files.",
+        "matching_files_empty": "{0} path \"{1}\": {2} of the {3} matching files have a size of 0 bytes (for example \"{4}\").",
+        "matching_files": "{0} path \"{1}\" matches {2} files with a total size of {3} bytes.",
+        "bed_invalid_lines": "{0} file \"{1}\" contains {2} invalid lines (first on line {3}: {4}).",
+        "bed_no_regions": "{0} file \"{1}\" does not contain any regions.",
+        "bed_unsorted": "{0} file \"{1}\" is not sorted (first unsorted region on line {2}), so its covered bases are not counted.",
+        "bed_contig_naming": "{0} file \"{1}\" contains contig {2}, but assembly {3} names its contigs {4}.",
+        "bed_regions": "{0} file \"{1}\" contains {2} regions covering {3} bases.",
+        "wes_without_regions": "Sequencing method is WES, but there is no regions file with the sequenced regions.",
+        "sequencing_method_regions": "Sequencing method {0} does not seem to match the {1} bases covered by regions file \"{2}\" ({3}).",
+        "sequencing_method_data_size": "Sequencing method {0} does not seem to match the size of CRAM file \"{1}\" ({2} bytes).",
+        "index_not_found": "{0} file \"{1}\" has no index file (expected {2}).",
+        "index_outdated": "{0} file \"{1}\" is newer than its index file \"{2}\".",
+        "same_file_contents": "{0} file \"{1}\" seems to have the same contents as {2}.",
+        "same_physical_file": "{0} file \"{1}\" is the same file as {2} through a symbolic link.",
+        "checksum_mismatch": "{0} file \"{1}\" does not match the checksum in \"{2}\" (expected {3}, calculated {4}), the file is probably corrupt or incomplete.",
+        "checksum_file_invalid": "Checksum file \"{2}\" does not contain an MD5 checksum for {0} file \"{1}\".",
+        "checksum_not_found": "No .md5 or .md5sum checksum file found for {0} file \"{1}\"."
+    }
+    
+    def __init__(self, samplesheetpath="", findingswriter=None, errorbudget=None):
+        """Initializes the array backed storage of the findings of one samplesheet.
+        
+        Each finding is saved as a compact record: the line number, severity, code id and column id
+        in typed arrays, and a tuple with the message arguments. Codes, columns and arguments are
+        interned so repeated findings share the same objects.
+        
+        Parameters
+        ----------
+        samplesheetpath : str
+            Path to the samplesheet the findings belong to
+        findingswriter : VIPFindingsWriter
+            Optional writer to write each finding to as soon as it is added
+        errorbudget : VIPErrorBudget
+            Optional error budget to count the errors against
+        """
+        self.samplesheet_path = samplesheetpath
+        self.findings_writer = findingswriter
+        self.error_budget = errorbudget
+        self.codes = []
+        self.code_ids = {}
+        self.columns = []
+        self.column_ids = {}
+        self.interned_args = {}
+        self.finding_lines = array("L")
+        self.finding_severities = array("B")
+        self.finding_codes = array("H")
+        self.finding_columns = array("H")
+        self.finding_args = []
+        self.number_of_errors = 0
+        self.number_of_infos = 0
+        self.column_counts = {}
+        self.code_counts = {}
+    
+    
+    def get_column_id(self, columnname):
+        """Returns the id of a column name, the column name is interned if not seen before.
+        
+        Parameters
+        ----------
+        columnname : str
+            Name of the column
+        
+        Returns
+        -------
+        int
+            Id of the column
+        """
+        if columnname not in self.column_ids:
+            self.column_ids[columnname] = len(self.columns)
+            self.columns.append(columnname)
+        return self.column_ids[columnname]
+    
+    
+    def count_finding(self, linenumber, severity, columnname, code, newline):
+        """Updates the finding counters per column and per rule (column and code).
+        
+        Parameters
+        ----------
+        linenumber : int
+            Line number of the sample with the finding (0 for samplesheet findings)
+        severity : str
+            Severity of the finding (error or info)
+        columnname : str
+            Name of the column the finding is about
+        code : str
+            Code identifying the type of finding
+        newline : bool
+            Whether this is the first finding with this severity for the column on this line
+        """
+        if columnname not in self.column_counts:
+            self.column_counts[columnname] = [0, 0, 0, 0]
+        columncounts = self.column_counts[columnname]
+        severityid = VIPSamplesheetFindings.SEVERITIES.index(severity)
+        columncounts[severityid] += 1
+        if newline and linenumber > 0:
+            columncounts[severityid+2] += 1
+        
+        if (columnname, code) not in self.code_counts:
+            self.code_counts[(columnname, code)] = [0, 0]
+        self.code_counts[(columnname, code)][severityid] += 1
+        
+        if severity == "error":
+            self.number_of_errors += 1
+            if self.error_budget is not None:
+                self.error_budget.count_error()
+        else:
+            self.number_of_infos += 1
+    
+    
+    def error_budget_exhausted(self):
+        """Returns whether the error budget for the run or this samplesheet is exhausted.
+        
+        Returns
+        -------
+        bool
+            True if the error budget is exhausted, False if not (or if there is no error budget)
+        """
+        return self.error_budget is not None and self.error_budget.is_exhausted()
+    
+    
+    def write_finding(self, linenumber, severity, columnname, code, messageargs):
+        """Writes a finding to the findings writer if one is set.
+        
+        Parameters
+        ----------
+        linenumber : int
+            Line number of the sample with the finding (0 for samplesheet findings)
+        severity : str
+            Severity of the finding (error or info)
+        columnname : str
+            Name of the column the finding is about
+        code : str
+            Code identifying the type of finding
+        messageargs : tuple
+            Arguments to render the finding message with
+        """
+        if self.findings_writer is not None:
+            self.findings_writer.write_finding(self.samplesheet_path, linenumber if linenumber > 0 else None, columnname, severity, code, VIPSamplesheetFindings.render_message(code, columnname, messageargs))
+    
+    
+    def add_finding(self, linenumber, severity, columnname, code, messageargs, newline=True):
+        """Saves a finding and writes it to the findings writer if one is set.
+        
+        Parameters
+        ----------
+        linenumber : int
+            Line number of the sample with the finding (0 for samplesheet findings)
+        severity : str
+            Severity of the finding (error or info)
+        columnname : str
+            Name of the column the finding is about
+        code : str
+            Code identifying the type of finding (key of FINDING_MESSAGES)
+        messageargs : tuple
+            Arguments to render the finding message with
+        newline : bool
+            Whether this is the first finding with this severity for the column on this line
+        
+        Returns
+        -------
+        findingindex : int
+            Index of the saved finding
+        """
+        if code not in self.code_ids:
+            self.code_ids[code] = len(self.codes)
+            self.codes.append(code)
+        columnid = self.get_column_id(columnname)
+        
+        # Message arguments that are the same for many rows (such as an invalid value) are saved once.
+        # Unhashable arguments (such as the lists of valid values) are the same object for each row
+        # and are therefore interned by identity.
+        internkey = tuple([ma if ma.__hash__ is not None else id(ma) for ma in messageargs])
+        messageargs = self.interned_args.setdefault(internkey, messageargs)
+        
+        findingindex = len(self.finding_args)
+        self.finding_lines.append(linenumber)
+        self.finding_severities.append(VIPSamplesheetFindings.SEVERITIES.index(severity))
+        self.finding_codes.append(self.code_ids[code])
+        self.finding_columns.append(columnid)
+        self.finding_args.append(messageargs)
+        
+        self.count_finding(linenumber, severity, columnname, code, newline)
+        self.write_finding(linenumber, severity, columnname, code, messageargs)
+        return findingindex
+    
+    
+    def get_finding_line(self, findingindex):
+        """Returns the line number of a finding.
+        
+        Parameters
+        ----------
+        findingindex : int
+            Index of the finding
+        """
+        return self.finding_lines[findingindex]
+    
+    
+    def get_finding_severity(self, findingindex):
+        """Returns the severity (error or info) of a finding.
+        
+        Parameters
+        ----------
+        findingindex : int
+            Index of the finding
+        """
+        return VIPSamplesheetFindings.SEVERITIES[self.finding_severities[findingindex]]
+    
+    
+    def get_finding_code(self, findingindex):
+        """Returns the code of a finding.
+        
+        Parameters
+        ----------
+        findingindex : int
+            Index of the finding
+        """
+        return self.codes[self.finding_codes[findingindex]]
+    
+    
+    def get_finding_column(self, findingindex):
+        """Returns the name of the column of a finding.
+        
+        Parameters
+        ----------
+        findingindex : int
+            Index of the finding
+        """
+        return self.columns[self.finding_columns[findingindex]]
+    
+    
+    def get_finding_args(self, findingindex):
+        """Returns the message arguments of a finding.
+        
+        Parameters
+        ----------
+        findingindex : int
+            Index of the finding
+        """
+        return self.finding_args[findingindex]
+    
+    
+    @staticmethod
+    def render_message(code, columnname, messageargs):
+        """Renders a finding message from its code, column name and arguments.
+        
+        Non printable characters are removed from the arguments while rendering.
+        
+        Parameters
+        ----------
+        code : str
+            Code identifying the type of finding
+        columnname : str
+            Name of the column the finding is about
+        messageargs : tuple
+            Arguments to render the finding message with
+        
+        Returns
+        -------
+        str
+            The finding message
+        """
+        messageargs = [re.sub(r"[\x00-\x1f]", "", ma) if isinstance(ma, str) else ma for ma in messageargs]
+        return VIPSamplesheetFindings.FINDING_MESSAGES[code].format(*messageargs, column=columnname)
+    
+    
+    def get_finding_message(self, findingindex):
+        """Renders the message of a finding from its code and arguments.
+        
+        Parameters
+        ----------
+        findingindex : int
+            Index of the finding
+        
+        Returns
+        -------
+        str
+            The finding message
+        """
+        return VIPSamplesheetFindings.render_message(self.get_finding_code(findingindex), self.get_finding_column(findingindex), self.finding_args[findingindex])
+    
+    
+    def get_findings_messages(self, findingindices, severity):
+        """Renders the messages of the supplied findings with a certain severity per column name.
+        
+        Parameters
+        ----------
+        findingindices : list of int
+            Indices of the findings to render
+        severity : str
+            Severity of the findings to render (error or info)
+        
+        Returns
+        -------
+        findingsmessages : dict of str
+            Finding messages per column name
+        """
+        severityid = VIPSamplesheetFindings.SEVERITIES.index(severity)
+        findingsmessages = {}
+        for findingindex in findingindices:
+            if self.finding_severities[findingindex] == severityid:
+                columnname = self.get_finding_column(findingindex)
+                if columnname not in findingsmessages:
+                    findingsmessages[columnname] = []
+                findingsmessages[columnname].append(self.get_finding_message(findingindex))
+        return findingsmessages
+    
+    
+    def get_aggregated_findings(self, severity):
+        """Groups identical sample findings with a certain severity into line number ranges.
+        
+        Findings are identical when they have the same column, code and message arguments.
+        The groups are made in one pass over all findings. As the message arguments are interned,
+        identical arguments are the same object and the groups can be keyed by their identity.
+        Samplesheet findings (line number 0) are not included.
+        
+        Parameters
+        ----------
+        severity : str
+            Severity of the findings to group (error or info)
+        
+        Returns
+        -------
+        aggregatedfindings : list of list
+            Per group the index of its first finding, the number of findings and the list of line number ranges
+        """
+        severityid = VIPSamplesheetFindings.SEVERITIES.index(severity)
+        findinggroups = {}
+        aggregatedfindings = []
+        for findingindex in range(len(self.finding_args)):
+            linenumber = self.finding_lines[findingindex]
+            if self.finding_severities[findingindex] != severityid or linenumber == 0:
+                continue
+            groupkey = (self.finding_columns[findingindex], self.finding_codes[findingindex], id(self.finding_args[findingindex]))
+            if groupkey not in findinggroups:
+                findinggroups[groupkey] = [findingindex, 0, []]
+                aggregatedfindings.append(findinggroups[groupkey])
+            findinggroup = findinggroups[groupkey]
+            findinggroup[1] += 1
+            
+            # Extend the last line number range if the line directly follows it
+            lineranges = findinggroup[2]
+            if len(lineranges) > 0 and lineranges[-1][0] <= linenumber <= lineranges[-1][1] + 1:
+                lineranges[-1][1] = max(lineranges[-1][1], linenumber)
+            else:
+                lineranges.append([linenumber, linenumber])
+        return aggregatedfindings
+    
+    
+    def get_number_of_findings(self):
+        """Returns the number of saved findings.
+        
+        Returns
+        -------
+        int
+            Number of findings
+        """
+        return len(self.finding_args)
+    
+    
+    def get_number_of_errors(self):
+        """Returns the number of saved errors.
+        
+        Returns
+        -------
+        self.number_of_errors : int
+            Number of errors
+        """
+        return self.number_of_errors
+    
+    
+    def get_number_of_infos(self):
+        """Returns the number of saved info messages.
+        
+        Returns
+        -------
+        self.number_of_infos : int
+            Number of info messages
+        """
+        return self.number_of_infos
+    
+    
+    def get_column_counts(self):
+        """Returns the finding counters per column.
+        
+        Returns
+        -------
+        self.column_counts : dict of list of int
+            Number of errors, info messages, lines with errors and lines with info messages per column
+        """
+        return self.column_counts
+    
+    
+    def get_code_counts(self):
+        """Returns the finding counters per rule.
+        
+        Returns
+        -------
+        self.code_counts : dict of list of int
+            Number of errors and info messages per column name and finding code
+        """
+        return self.code_counts
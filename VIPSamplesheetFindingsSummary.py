@@ -0,0 +1,48 @@
+from VIPSamplesheetFindings import VIPSamplesheetFindings
+
+class VIPSamplesheetFindingsSummary(VIPSamplesheetFindings):
+    def __init__(self, samplesheetpath="", findingswriter=None, errorbudget=None):
+        """Initializes the findings storage that only keeps counters.
+        
+        Findings are counted per column and per rule (column and code) and written to
+        the findings writer if one is set, but not saved. Memory use therefore only
+        depends on the number of columns and rules, not on the number of findings.
+        
+        Parameters
+        ----------
+        samplesheetpath : str
+            Path to the samplesheet the findings belong to
+        findingswriter : VIPFindingsWriter
+            Optional writer to write each finding to as soon as it is added
+        errorbudget : VIPErrorBudget
+            Optional error budget to count the errors against
+        """
+        super().__init__(samplesheetpath, findingswriter, errorbudget)
+    
+    
+    def add_finding(self, linenumber, severity, columnname, code, messageargs, newline=True):
+        """Counts a finding and writes it to the findings writer if one is set.
+        
+        Parameters
+        ----------
+        linenumber : int
+            Line number of the sample with the finding (0 for samplesheet findings)
+        severity : str
+            Severity of the finding (error or info)
+        columnname : str
+            Name of the column the finding is about
+        code : str
+            Code identifying the type of finding
+        messageargs : tuple
+            Arguments to render the finding message with
+        newline : bool
+            Whether this is the first finding with this severity for the column on this line
+        
+        Returns
+        -------
+        None
+            The finding is not saved so there is no finding index
+        """
+        self.count_finding(linenumber, severity, columnname, code, newline)
+        self.write_finding(linenumber, severity, columnname, code, messageargs)
+        return None
@@ -1,4 +1,6 @@
 import re
+from array import array
+from VIPSamplesheetFindings import VIPSamplesheetFindings
 
 class VIPSamplesheetSample2:
     def __init__(self):
@@ -8,8 +10,44 @@ class VIPSamplesheetSample2:
         self.is_proband = False
         self.pcr_is_performed = False
         self.hpo_ids = {}
-        self.sample_errors = {}
-        self.sample_info = {}
+        self.findings = None
+        self.finding_indices = None
+        self.flagged_columns = 0
+        self.number_of_errors = 0
+        self.line_number = 0
+    
+    
+    def get_line_number(self):
+        """Returns the line number of the sample in the samplesheet.
+        
+        Returns
+        -------
+        self.line_number : int
+            Line number of the sample
+        """
+        return self.line_number
+    
+    
+    def set_line_number(self, linenumber):
+        """Sets the line number of the sample in the samplesheet.
+        
+        Parameters
+        ----------
+        linenumber : int
+            Line number of the sample
+        """
+        self.line_number = linenumber
+    
+    
+    def set_findings(self, findings):
+        """Sets the findings storage the errors and info messages of this sample are saved in.
+        
+        Parameters
+        ----------
+        findings : VIPSamplesheetFindings
+            Findings storage of the samplesheet containing this sample
+        """
+        self.findings = findings
     
     
     def get_data(self):
@@ -34,6 +72,27 @@ class VIPSamplesheetSample2:
         return headerfield in self.sampledata
     
     
+    @staticmethod
+    def remove_nonprintable_chars(value):
+        """Returns the value without the non printable characters \\x00 to \\x1f.
+        
+        Most values are printable, those are returned as is without using the (slower) regular expression.
+        
+        Parameters
+        ----------
+        value : str
+            Value to remove the non printable characters from
+        
+        Returns
+        -------
+        str
+            The value without non printable characters
+        """
+        if value.isprintable():
+            return value
+        return re.sub(r"[\x00-\x1f]", "", value)
+    
+    
     def get_datafield(self, headerfield):
         """Returns the data for the specified column. Will return None if not available.
         
@@ -43,7 +102,7 @@ class VIPSamplesheetSample2:
             Column name indicating which data to get
         """
         if headerfield in self.sampledata:
-            return re.sub(r"[\x00-\x1f]", "", self.sampledata[headerfield])
+            return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata[headerfield])
         return None
     
     
@@ -90,7 +149,7 @@ class VIPSamplesheetSample2:
         str
             self.project_id stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["project_id"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["project_id"].strip())
     
     
     def get_project_id_raw(self):
@@ -123,7 +182,7 @@ class VIPSamplesheetSample2:
         str
             self.family_id stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["family_id"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["family_id"].strip())
     
     
     def get_family_id_raw(self):
@@ -156,7 +215,7 @@ class VIPSamplesheetSample2:
         str
             Saved individual_id stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["individual_id"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["individual_id"].strip())
     
     
     def get_individual_id_raw(self):
@@ -189,7 +248,7 @@ class VIPSamplesheetSample2:
         str
             Saved paternal_id stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["paternal_id"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["paternal_id"].strip())
     
     
     def get_paternal_id_raw(self):
@@ -222,7 +281,7 @@ class VIPSamplesheetSample2:
         str
             Saved maternal_id stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["maternal_id"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["maternal_id"].strip())
     
     
     def get_maternal_id_raw(self):
@@ -255,7 +314,7 @@ class VIPSamplesheetSample2:
         str
             Saved sample sex stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["sex"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["sex"].strip())
     
     
     def get_sample_sex_raw(self):
@@ -288,7 +347,7 @@ class VIPSamplesheetSample2:
         str
             Saved affected status stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["affected"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["affected"].strip())
     
     
     def get_affected_raw(self):
@@ -336,7 +395,7 @@ class VIPSamplesheetSample2:
         str
             Saved proband status stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["proband"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["proband"].strip())
     
     
     def get_proband_raw(self):
@@ -385,7 +444,7 @@ class VIPSamplesheetSample2:
         str
             HPO terms stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["hpo_ids"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["hpo_ids"].strip())
     
     
     def get_hpo_raw(self):
@@ -439,7 +498,7 @@ class VIPSamplesheetSample2:
         str
             Sequencing method stripped of potential non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["sequencing_method"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["sequencing_method"].strip())
     
     
     def get_sequencing_method_raw(self):
@@ -472,7 +531,7 @@ class VIPSamplesheetSample2:
         str
             Saved pcr performed value stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["pcr_performed"])
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["pcr_performed"])
     
     
     def get_pcr_performed_raw(self):
@@ -521,7 +580,7 @@ class VIPSamplesheetSample2:
         str
             Path to BED file stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["regions"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["regions"].strip())
     
     
     def get_bed_file_raw(self):
@@ -554,7 +613,7 @@ class VIPSamplesheetSample2:
         str
             Adaptive sampling value stripped of non printable characters
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["adaptive_sampling"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["adaptive_sampling"].strip())
     
     
     def get_adaptive_sampling_raw(self):
@@ -587,7 +646,7 @@ class VIPSamplesheetSample2:
         str
             Paths to fastq files as string
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["fastq"])
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["fastq"])
         # return [re.sub(r"[\x00-\x1f]", "", x.strip()) for x in self.sampledata["fastq"]]
     
     
@@ -621,7 +680,7 @@ class VIPSamplesheetSample2:
         str
             Paths to fastq r1 files as string
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["fastq_r1"])
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["fastq_r1"])
         # return [re.sub(r"[\x00-\x1f]", "", x.strip()) for x in self.sampledata["fastq_r1"]]
     
     
@@ -655,7 +714,7 @@ class VIPSamplesheetSample2:
         str
             Paths to the fastq r2 files as string
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["fastq_r2"])
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["fastq_r2"])
         # return [re.sub(r"[\x00-\x1f]", "", x.strip()) for x in self.sampledata["fastq_r2"]]
     
     
@@ -689,7 +748,7 @@ class VIPSamplesheetSample2:
         str
             The value for sequencing_platform
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["sequencing_platform"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["sequencing_platform"].strip())
     
     
     def get_sequencing_platform_raw(self):
@@ -722,7 +781,7 @@ class VIPSamplesheetSample2:
         str
             Saved path to the CRAM file
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["cram"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["cram"].strip())
     
     
     def get_cram_file_raw(self):
@@ -755,7 +814,7 @@ class VIPSamplesheetSample2:
         str
             Saved assembly value
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["assembly"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["assembly"].strip())
     
     
     def get_assembly_raw(self):
@@ -788,7 +847,7 @@ class VIPSamplesheetSample2:
         str
             Saves path to the GVCF file
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["gvcf"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["gvcf"].strip())
     
     
     def get_gvcf_file_raw(self):
@@ -821,7 +880,7 @@ class VIPSamplesheetSample2:
         str
             Saved path to the VCF file
         """
-        return re.sub(r"[\x00-\x1f]", "", self.sampledata["vcf"].strip())
+        return VIPSamplesheetSample2.remove_nonprintable_chars(self.sampledata["vcf"].strip())
     
     
     def get_vcf_file_raw(self):
@@ -846,30 +905,80 @@ class VIPSamplesheetSample2:
         self.sampledata["vcf"] = vcffile
     
     
-    def add_sample_error(self, columnname, errormessage):
-        """Add an error message for a column.
+    def add_finding(self, severity, columnname, code, messageargs):
+        """Saves a finding for a column in the findings storage and remembers its index.
+        
+        Parameters
+        ----------
+        severity : str
+            Severity of the finding (error or info)
+        columnname : str
+            Name of the column the finding is about
+        code : str
+            Code identifying the type of finding
+        messageargs : tuple
+            Arguments to render the finding message with
+        """
+        if self.findings is None:
+            self.findings = VIPSamplesheetFindings()
+        
+        # Each column has an error and an info bit to know whether the column already has findings
+        severityid = VIPSamplesheetFindings.SEVERITIES.index(severity)
+        columnbit = 1 << (self.findings.get_column_id(columnname) * 2 + severityid)
+        newline = self.flagged_columns & columnbit == 0
+        self.flagged_columns |= columnbit
+        if severity == "error":
+            self.number_of_errors += 1
+        
+        # Summary findings storages do not save findings and return no index
+        findingindex = self.findings.add_finding(self.line_number, severity, columnname, code, messageargs, newline)
+        if findingindex is not None:
+            if self.finding_indices is None:
+                self.finding_indices = array("L")
+            self.finding_indices.append(findingindex)
+    
+    
+    def get_finding_indices(self):
+        """Returns the indices of the findings of this sample in the findings storage.
+        
+        Returns
+        -------
+        array of int
+            Indices of the findings of this sample
+        """
+        if self.finding_indices is None:
+            return []
+        return self.finding_indices
+    
+    
+    def add_sample_error(self, columnname, errorcode, *messageargs):
+        """Add an error for a column.
+        
+        Only the error code and message arguments are saved, the message is rendered when requested.
         
         Parameters
         ----------
         columnname : str
             Name of the column where the error occured
-        errormessage : str
-            The error message to save
+        errorcode : str
+            Code identifying the type of error
+        messageargs : str
+            Arguments to render the error message with
         """
-        if columnname not in self.sample_errors:
-            self.sample_errors[columnname] = []
-        self.sample_errors[columnname].append(errormessage)
+        self.add_finding("error", columnname, errorcode, messageargs)
     
     
     def get_sample_errors(self):
-        """Returns the dictionary with all sample errors.
+        """Returns the dictionary with all sample error messages.
         
         Returns
         -------
-        self.sample_errors : dict of str
-            Dictionary containing the sample errors per column name
+        dict of str
+            Dictionary containing the sample error messages per column name
         """
-        return self.sample_errors
+        if self.finding_indices is None:
+            return {}
+        return self.findings.get_findings_messages(self.finding_indices, "error")
     
     
     def get_sample_column_errors(self, columnname):
@@ -888,24 +997,27 @@ class VIPSamplesheetSample2:
         list of str
             List of error messages for the column
         """
-        if columnname in self.sample_errors:
-            return self.sample_errors[columnname]
+        sampleerrors = self.get_sample_errors()
+        if columnname in sampleerrors:
+            return sampleerrors[columnname]
         return []
     
     
-    def add_sample_info(self, columnname, infomessage):
-        """Adds the supplied information message.
+    def add_sample_info(self, columnname, infocode, *messageargs):
+        """Adds an information message for a column.
+        
+        Only the info code and message arguments are saved, the message is rendered when requested.
         
         Parameters
         ----------
         columnname : str
             Name of the column where the info message occured
-        infomessage : str
-            THe infomessage to save
+        infocode : str
+            Code identifying the type of info message
+        messageargs : str
+            Arguments to render the info message with
         """
-        if columnname not in self.sample_info:
-            self.sample_info[columnname] = []
-        self.sample_info[columnname].append(infomessage)
+        self.add_finding("info", columnname, infocode, messageargs)
     
     
     def get_sample_infos(self):
@@ -913,10 +1025,12 @@ class VIPSamplesheetSample2:
         
         Returns
         -------
-        self.sample_info : dict of str
-            Info messages of the sample
+        dict of str
+            Info messages of the sample per column name
         """
-        return self.sample_info
+        if self.finding_indices is None:
+            return {}
+        return self.findings.get_findings_messages(self.finding_indices, "info")
     
     
     def get_sample_column_infos(self, columnname):
@@ -932,11 +1046,23 @@ class VIPSamplesheetSample2:
         list of str
             Info messages for a specified column
         """
-        if columnname in self.sample_info:
-            return self.sample_info[columnname]
+        sampleinfos = self.get_sample_infos()
+        if columnname in sampleinfos:
+            return sampleinfos[columnname]
         return []
     
     
+    def has_sample_errors(self):
+        """Returns whether this sample has one or more errors.
+        
+        Returns
+        -------
+        bool
+            True if the sample has one or more errors, False if not
+        """
+        return self.number_of_errors > 0
+    
+    
     def field_has_errors(self, columnname):
         """Checks whether a supplied column has an error for this sample.
         
@@ -950,7 +1076,7 @@ class VIPSamplesheetSample2:
         bool
             True if sample has one or more errors in the supplied column, False if not
         """
-        return columnname in self.sample_errors
+        return self.field_has_findings("error", columnname)
     
     
     def field_has_info(self, columnname):
@@ -961,7 +1087,28 @@ class VIPSamplesheetSample2:
         columnname : str
             Name of the column to check for info messages
         """
-        return columnname in self.sample_info
+        return self.field_has_findings("info", columnname)
+    
+    
+    def field_has_findings(self, severity, columnname):
+        """Returns whether this sample has one or more findings with a certain severity for a column.
+        
+        Parameters
+        ----------
+        severity : str
+            Severity of the findings (error or info)
+        columnname : str
+            Name of the column to check
+        
+        Returns
+        -------
+        bool
+            True if the column has one or more findings with the severity, False if not
+        """
+        if self.findings is None or self.flagged_columns == 0:
+            return False
+        columnbit = 1 << (self.findings.get_column_id(columnname) * 2 + VIPSamplesheetFindings.SEVERITIES.index(severity))
+        return self.flagged_columns & columnbit != 0
     
     
     def get_sampledata_as_filelinestr(self, headerfields):
@@ -0,0 +1,71 @@
+from VIPBedValidator import VIPBedValidator
+
+
+def validate(*bedlines):
+    return VIPBedValidator().validate_bed_lines(bedlines)
+
+
+def test_sorted_regions_are_merged():
+    bedinfo = validate("track name=test", "chr1\t0\t10", "chr1\t5\t20", "chr1\t30\t40", "chr2\t1\t2")
+    assert bedinfo["numregions"] == 4
+    assert bedinfo["coveredbases"] == 31
+    assert bedinfo["firstunsorted"] is None
+    assert bedinfo["numinvalid"] == 0
+
+
+def test_adjacent_regions_are_merged():
+    assert validate("chr1\t0\t10", "chr1\t10\t20")["coveredbases"] == 20
+
+
+def test_unsorted_within_merged_regions():
+    bedinfo = validate("chr1\t0\t10", "chr1\t5\t20", "chr1\t3\t4")
+    assert bedinfo["firstunsorted"] == 3
+    assert bedinfo["coveredbases"] is None
+
+
+def test_unsorted_before_merged_regions():
+    bedinfo = validate("chr1\t100\t200", "chr1\t0\t150")
+    assert bedinfo["firstunsorted"] == 2
+    assert bedinfo["coveredbases"] is None
+
+
+def test_contig_split_over_file_is_unsorted():
+    bedinfo = validate("chr1\t0\t10", "chr2\t0\t10", "chr1\t20\t30")
+    assert bedinfo["firstunsorted"] == 3
+    assert bedinfo["coveredbases"] is None
+
+
+def test_invalid_lines():
+    bedinfo = validate("chr1\t0", "chr1\t10\t5", "chr1\t-1\t5", "chr1\t0\t10\tname", "chr1\t20\t30")
+    assert bedinfo["numinvalid"] == 4
+    assert bedinfo["firstinvalid"] == (1, "expected at least 3 tab separated columns")
+    assert bedinfo["numregions"] == 1
+
+
+def test_different_number_of_columns():
+    bedinfo = validate("chr1\t0\t10\tname", "chr1\t20\t30")
+    assert bedinfo["numinvalid"] == 1
+    assert bedinfo["firstinvalid"][0] == 2
+
+
+def test_non_ascii_digits_are_invalid():
+    bedinfo = validate("chr1\t0\t10", "chr1\t²\t20", "chr1\t١\t20")
+    assert bedinfo["numinvalid"] == 2
+    assert bedinfo["firstinvalid"] == (2, "start and end should be non negative integers")
+    assert bedinfo["numregions"] == 1
+
+
+def test_contig_naming():
+    bedinfo = validate("chr1\t0\t10", "X\t0\t10", "chrUn_gl000220\t0\t10")
+    assert bedinfo["chrcontig"] == "chr1"
+    assert bedinfo["nochrcontig"] == "X"
+
+
+def test_validate_bed_file_is_cached(tmp_path):
+    bedfile = tmp_path / "regions.bed"
+    bedfile.write_text("chr1\t0\t10\n")
+    bedvalidator = VIPBedValidator()
+    bedstatus, bedinfo = bedvalidator.validate_bed_file(str(bedfile))
+    assert bedstatus == VIPBedValidator.BED_VALIDATED
+    assert bedvalidator.validate_bed_file(str(bedfile))[1] is bedinfo
+    assert bedvalidator.validate_bed_file(str(tmp_path / "missing.bed")) == (VIPBedValidator.BED_UNREADABLE, None)
@@ -0,0 +1,131 @@
+import gzip
+import struct
+import zlib
+import pytest
+from VIPFileInspector import VIPFileInspector
+
+
+VCF_DATA = b"##fileformat=VCFv4.2\n#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n" + b"chr1\t1\t.\tA\tG\t.\tPASS\t.\n" * 2000
+
+
+def bgzf_block(blockdata):
+    """Compresses data into a single BGZF block (a gzip member with the BC extra subfield)."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    deflated = compressor.compress(blockdata) + compressor.flush()
+    blocksize = 18 + len(deflated) + 8
+    header = b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00" + struct.pack("<H", blocksize - 1)
+    return header + deflated + struct.pack("<II", zlib.crc32(blockdata), len(blockdata))
+
+
+def bgzf_compress(data):
+    """Compresses data as BGZF file with the end of file marker."""
+    return b"".join(bgzf_block(data[start:start + 65280]) for start in range(0, len(data), 65280)) + VIPFileInspector.BGZF_EOF
+
+
+@pytest.fixture
+def quick_inspector():
+    return VIPFileInspector("quick")
+
+
+def test_bgzf_with_eof_marker(tmp_path, quick_inspector):
+    vcffile = tmp_path / "sample.vcf.gz"
+    vcffile.write_bytes(bgzf_compress(VCF_DATA))
+    assert quick_inspector.inspect_file(str(vcffile)) == (VIPFileInspector.INSPECTED, None, VIPFileInspector.INTEGRITY_OK, None)
+
+
+def test_bgzf_without_eof_marker(tmp_path, quick_inspector):
+    vcffile = tmp_path / "sample.vcf.gz"
+    vcffile.write_bytes(bgzf_compress(VCF_DATA)[:-len(VIPFileInspector.BGZF_EOF)])
+    inspectresult = quick_inspector.inspect_file(str(vcffile))
+    assert inspectresult[2] == VIPFileInspector.INTEGRITY_CORRUPT
+    assert "BGZF end of file marker" in inspectresult[3]
+
+
+def test_plain_gzip_passes_quick_check(tmp_path, quick_inspector):
+    fastqfile = tmp_path / "reads.fastq.gz"
+    fastqfile.write_bytes(gzip.compress(b"@read1\nACGT\n+\nFFFF\n")[:20])
+    assert quick_inspector.inspect_file(str(fastqfile))[2] == VIPFileInspector.INTEGRITY_OK
+
+
+def test_not_gzip_compressed(tmp_path, quick_inspector):
+    vcffile = tmp_path / "sample.vcf.gz"
+    vcffile.write_bytes(VCF_DATA)
+    assert quick_inspector.inspect_file(str(vcffile))[2:] == (VIPFileInspector.INTEGRITY_CORRUPT, "not gzip compressed")
+
+
+def test_uncompressed_bcf(tmp_path, quick_inspector):
+    bcffile = tmp_path / "sample.bcf"
+    bcffile.write_bytes(b"BCF\x02\x02" + b"\x00" * 20)
+    assert quick_inspector.inspect_file(str(bcffile))[2] == VIPFileInspector.INTEGRITY_OK
+
+
+def test_missing_file(tmp_path, quick_inspector):
+    assert quick_inspector.inspect_file(str(tmp_path / "missing.vcf.gz"))[0] == VIPFileInspector.INTEGRITY_UNREADABLE
+
+
+def test_sniff_file_formats(tmp_path):
+    fileinspector = VIPFileInspector(sniffformats=True)
+    assert fileinspector.sniff_file_format(b"CRAM\x03\x00") == "CRAM"
+    assert fileinspector.sniff_file_format(gzip.compress(b"BAM\x01")) == "BAM"
+    assert fileinspector.sniff_file_format(bgzf_block(VCF_DATA[:1000])) == "VCF"
+    assert fileinspector.sniff_file_format(b"@HD\tVN:1.6\n") == "SAM"
+    assert fileinspector.sniff_file_format(b"@read1\nACGT\n+\nFFFF\n") == "FASTQ"
+    assert fileinspector.sniff_file_format(b"@not a fastq\n") is None
+    assert fileinspector.get_extension_file_format("/data/sample.g.vcf.gz") == "VCF"
+    assert fileinspector.get_extension_file_format("/data/reads.fq") == "FASTQ"
+
+
+def test_deep_check_complete_files(tmp_path):
+    bgzffile = tmp_path / "sample.vcf.gz"
+    bgzffile.write_bytes(bgzf_compress(VCF_DATA))
+    multimemberfile = tmp_path / "reads.fastq.gz"
+    multimemberfile.write_bytes(gzip.compress(VCF_DATA) + gzip.compress(VCF_DATA))
+    assert VIPFileInspector.decompress_gzip_file(str(bgzffile)) == (VIPFileInspector.INTEGRITY_OK, None)
+    assert VIPFileInspector.decompress_gzip_file(str(multimemberfile)) == (VIPFileInspector.INTEGRITY_OK, None)
+
+
+def test_deep_check_truncated_file(tmp_path):
+    gzipfile = tmp_path / "reads.fastq.gz"
+    gzipdata = gzip.compress(VCF_DATA)
+    gzipfile.write_bytes(gzipdata[:len(gzipdata) // 2])
+    integritystatus, problem = VIPFileInspector.decompress_gzip_file(str(gzipfile))
+    assert integritystatus == VIPFileInspector.INTEGRITY_CORRUPT
+    assert "truncated" in problem
+
+
+def test_deep_check_corrupt_file(tmp_path):
+    gzipfile = tmp_path / "reads.fastq.gz"
+    gzipdata = bytearray(gzip.compress(VCF_DATA))
+    gzipdata[20:40] = b"\xff" * 20
+    gzipfile.write_bytes(bytes(gzipdata))
+    integritystatus, problem = VIPFileInspector.decompress_gzip_file(str(gzipfile))
+    assert integritystatus == VIPFileInspector.INTEGRITY_CORRUPT
+    assert problem.startswith("decompression failed")
+
+
+def test_deep_check_results_on_process_pool(tmp_path):
+    goodfile = tmp_path / "good.vcf.gz"
+    goodfile.write_bytes(bgzf_compress(VCF_DATA))
+    truncatedfile = tmp_path / "truncated.fastq.gz"
+    truncatedfile.write_bytes(gzip.compress(VCF_DATA)[:200])
+    fileinspector = VIPFileInspector("deep", numprocesses=1)
+    try:
+        assert fileinspector.start_deep_check_if_file(str(tmp_path / "missing.gz")) == (VIPFileInspector.DEEP_CHECK_SKIPPED, None)
+        assert fileinspector.start_deep_check_if_file(str(goodfile)) == (VIPFileInspector.DEEP_CHECK_STARTED, None)
+        assert fileinspector.get_deep_check_result(str(goodfile)) == (VIPFileInspector.INTEGRITY_OK, None)
+        assert fileinspector.get_deep_check_result(str(truncatedfile))[0] == VIPFileInspector.INTEGRITY_CORRUPT
+    finally:
+        fileinspector.close()
+
+
+def test_deep_check_timeout_counts_from_start(tmp_path):
+    gzipfile = tmp_path / "reads.fastq.gz"
+    gzipfile.write_bytes(gzip.compress(VCF_DATA))
+    fileinspector = VIPFileInspector("deep", numprocesses=1, deepchecktimeout=0)
+    try:
+        fileinspector.start_deep_checks([str(gzipfile)])
+        assert fileinspector.get_deep_check_result(str(gzipfile)) in [(VIPFileInspector.INTEGRITY_TIMEOUT, None), (VIPFileInspector.INTEGRITY_OK, None)]
+        fileinspector.deep_check_timeout = 60
+        assert fileinspector.get_deep_check_result(str(gzipfile)) == (VIPFileInspector.INTEGRITY_OK, None)
+    finally:
+        fileinspector.close()
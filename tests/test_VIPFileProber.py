@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+import pytest
+from VIPFileProber import VIPFileProber
+
+
+@pytest.fixture
+def hangrelease():
+    """Event that releases the probes hanging in a test, so their workers can stop."""
+    releaseevent = threading.Event()
+    yield releaseevent
+    releaseevent.set()
+
+
+def make_prober(hangrelease, **proberargs):
+    fileprober = VIPFileProber(**proberargs)
+    fileprober.register_probe("hang", lambda filepath: (hangrelease.wait(10), filepath))
+    return fileprober
+
+
+def test_stat_file(tmp_path):
+    datafile = tmp_path / "sample.vcf"
+    datafile.write_text("data")
+    os.symlink(datafile, tmp_path / "link.vcf")
+    os.symlink(tmp_path / "gone.vcf", tmp_path / "dangling.vcf")
+    fileprober = VIPFileProber()
+    assert fileprober.get_file_status(str(datafile)) == (VIPFileProber.PROBE_FILE, 4)
+    assert fileprober.get_file_status(str(tmp_path / "missing.vcf")) == (VIPFileProber.PROBE_NOT_FILE, None)
+    assert fileprober.get_file_status(str(tmp_path)) == (VIPFileProber.PROBE_NOT_FILE, None)
+    assert fileprober.get_file_status(str(tmp_path / "dangling.vcf"))[0] == VIPFileProber.PROBE_DANGLING_LINK
+    assert fileprober.get_canonical_path(str(tmp_path / "link.vcf")) == os.path.realpath(datafile)
+    fileprober.close()
+
+
+def test_read_probe_timeout_does_not_count_for_mount(tmp_path, hangrelease):
+    fileprober = make_prober(hangrelease, timeout=0.2, maxtimeouts=1, readtimeout=0.2)
+    filepaths = [str(tmp_path / f"file{fi}") for fi in range(2)]
+    fileprober.prefetch(filepaths, "hang")
+    assert [fileprober.get_probe_result("hang", fp)[0] for fp in filepaths] == [VIPFileProber.PROBE_TIMEOUT] * 2
+    assert fileprober.get_unavailable_mounts() == set()
+    assert fileprober.get_file_status(str(tmp_path / "file0"))[0] == VIPFileProber.PROBE_NOT_FILE
+
+
+def test_stat_timeouts_open_circuit_breaker(tmp_path, hangrelease):
+    fileprober = VIPFileProber(timeout=0.2, maxtimeouts=2)
+    fileprober.register_probe("stat", lambda filepath: (hangrelease.wait(10), None))
+    filepaths = [str(tmp_path / f"file{fi}") for fi in range(6)]
+    fileprober.prefetch(filepaths)
+    starttime = time.monotonic()
+    statuses = [fileprober.get_file_status(fp)[0] for fp in filepaths]
+    assert statuses[:2] == [VIPFileProber.PROBE_TIMEOUT] * 2
+    assert set(statuses[2:]) <= {VIPFileProber.PROBE_TIMEOUT, VIPFileProber.PROBE_MOUNT_UNAVAILABLE}
+    assert VIPFileProber.PROBE_MOUNT_UNAVAILABLE in statuses
+    assert fileprober.get_mount_point(filepaths[0]) in fileprober.get_unavailable_mounts()
+    # Files queued after the mount point stopped responding are not checked at all
+    assert fileprober.get_file_status(str(tmp_path / "later"))[0] == VIPFileProber.PROBE_MOUNT_UNAVAILABLE
+    assert time.monotonic() - starttime < 2
+
+
+def test_queued_probe_is_not_started(tmp_path, hangrelease):
+    fileprober = make_prober(hangrelease, readtimeout=0.2)
+    filepaths = [str(tmp_path / f"file{fi}") for fi in range(VIPFileProber.READ_PROBE_LIMIT + 2)]
+    fileprober.prefetch(filepaths, "hang")
+    statuses = [fileprober.get_probe_result("hang", fp)[0] for fp in filepaths]
+    assert statuses.count(VIPFileProber.PROBE_TIMEOUT) == VIPFileProber.READ_PROBE_LIMIT
+    assert statuses.count(VIPFileProber.PROBE_NOT_STARTED) == 2
+
+
+def test_slow_queue_keeps_waiting_while_it_progresses(tmp_path):
+    fileprober = VIPFileProber(readtimeout=0.5)
+    fileprober.register_probe("slow", lambda filepath: (time.sleep(0.2), filepath))
+    filepaths = [str(tmp_path / f"file{fi}") for fi in range(VIPFileProber.READ_PROBE_LIMIT * 3)]
+    fileprober.prefetch(filepaths, "slow")
+    assert [fileprober.get_probe_result("slow", fp)[1] for fp in filepaths] == filepaths
+    fileprober.close()
+
+
+def test_probe_exception_keeps_worker_alive(tmp_path, capsys):
+    def failing_probe(filepath):
+        if filepath.endswith("bad"):
+            raise RuntimeError("boom")
+        return ("read", filepath)
+
+    fileprober = VIPFileProber(numworkers=1, maxworkers=1)
+    fileprober.register_probe("read", failing_probe)
+    assert fileprober.get_probe_result("read", str(tmp_path / "bad")) == (VIPFileProber.PROBE_ERROR, None)
+    assert fileprober.get_probe_result("read", str(tmp_path / "good")) == ("read", str(tmp_path / "good"))
+    assert "boom" in capsys.readouterr().out
+    fileprober.close()
+
+
+def test_canonical_probe_runs_once_per_physical_file(tmp_path):
+    datafile = tmp_path / "sample.cram"
+    datafile.write_text("data")
+    linkpaths = []
+    for li in range(5):
+        os.symlink(datafile, tmp_path / f"link{li}.cram")
+        linkpaths.append(str(tmp_path / f"link{li}.cram"))
+    probedpaths = []
+    fileprober = VIPFileProber()
+    fileprober.register_probe("header", lambda filepath: (probedpaths.append(filepath), filepath), canonical=True)
+    fileprober.prefetch(linkpaths + [str(datafile)], "header")
+    assert {fileprober.get_probe_result("header", fp)[1] for fp in linkpaths} == {os.path.realpath(datafile)}
+    assert probedpaths == [os.path.realpath(datafile)]
+    fileprober.close()
+
+
+def test_shared_probe_waiter_times_out(tmp_path, hangrelease):
+    datafile = tmp_path / "sample.cram"
+    datafile.write_text("data")
+    os.symlink(datafile, tmp_path / "link.cram")
+    fileprober = make_prober(hangrelease, readtimeout=0.3)
+    fileprober.register_probe("hang", fileprober.probe_functions["hang"], canonical=True)
+    filepaths = [str(datafile), str(tmp_path / "link.cram")]
+    fileprober.prefetch(filepaths, "hang")
+    time.sleep(0.6)
+    # The worker waiting for the shared result gave up, the worker running the probe is still hanging
+    proberesults = [fileprober.probe_results.get(("hang", fp)) for fp in filepaths]
+    assert proberesults.count(None) == 1
+    assert (VIPFileProber.PROBE_TIMEOUT, None) in proberesults
+
+
+def test_read_mount_points(tmp_path):
+    mountsfile = tmp_path / "mounts"
+    mountsfile.write_text("a /mnt/my\\040disk nfs rw 0 0\nb /mnt/données ext4 rw 0 0\nc /mnt/back\\134slash ext4 rw 0 0\n", encoding="utf-8")
+    mountpoints = VIPFileProber.read_mount_points(None, str(mountsfile))
+    assert set(mountpoints) == {"/mnt/back\\slash", "/mnt/données", "/mnt/my disk", "/"}
+    assert mountpoints[-1] == "/"
+
+
+def test_get_mount_point():
+    fileprober = VIPFileProber()
+    fileprober.mount_points = ["/data/nfs", "/data", "/"]
+    assert fileprober.get_mount_point("/data/nfs/sample.cram") == "/data/nfs"
+    assert fileprober.get_mount_point("/data/nfs2/sample.cram") == "/data"
+    assert fileprober.get_mount_point("/home/sample.cram") == "/"
+
+
+def test_close_stops_workers(tmp_path):
+    fileprober = VIPFileProber(numworkers=4)
+    fileprober.get_file_status(str(tmp_path))
+    workers = list(fileprober.workers)
+    fileprober.close()
+    assert workers and not any(worker.is_alive() for worker in workers)
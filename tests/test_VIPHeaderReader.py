@@ -0,0 +1,134 @@
+import gzip
+from VIPHeaderReader import VIPHeaderReader
+
+
+VCF_HEADER = (
+    b"##fileformat=VCFv4.2\n"
+    b"##contig=<ID=chr1,length=248956422>\n"
+    b"##contig=<ID=chrX,length=156040895>\n"
+    b"##reference=file:///refs/GRCh38.fa\n"
+    b"#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tpatient1\tfather1\n"
+    b"chr1\t100\t.\tA\tG\t.\tPASS\t.\tGT\t0/1\t0/0\n"
+)
+SAM_HEADER = b"@HD\tVN:1.6\n@SQ\tSN:1\tLN:249250621\n@SQ\tSN:2\tLN:243199373\n@RG\tID:rg1\tSM:patient1\n"
+
+
+def write_bam(filepath, headertext):
+    """Writes the BAM magic, the header text and no reference sequences as a gzip compressed file."""
+    bamdata = b"BAM\x01" + len(headertext).to_bytes(4, "little") + headertext + (0).to_bytes(4, "little")
+    filepath.write_bytes(gzip.compress(bamdata))
+
+
+def write_cram(filepath, headertext):
+    """Writes a CRAM 3.0 file definition and a header container with a single gzip compressed block."""
+    blockdata = gzip.compress(len(headertext).to_bytes(4, "little") + headertext)
+    # Block: method (1 = gzip), content type (0 = file header), content id, compressed and raw size (all ITF8 < 128 here)
+    rawsize = 4 + len(headertext)
+    block = bytes([1, 0, 0]) + itf8(len(blockdata)) + itf8(rawsize) + blockdata + b"\x00" * 4
+    # Container header: reference id, start, span, records, record counter, bases, blocks, landmarks and CRC32
+    containerheader = bytes([0, 0, 0, 0, 0, 0, 1, 1, 0]) + b"\x00" * 4
+    filedefinition = b"CRAM\x03\x00" + b"test".ljust(20, b"\x00")
+    filepath.write_bytes(filedefinition + len(block).to_bytes(4, "little") + containerheader + block)
+
+
+def itf8(value):
+    """Encodes an integer below 16384 as ITF8."""
+    if value < 0x80:
+        return bytes([value])
+    return bytes([0x80 | (value >> 8), value & 0xFF])
+
+
+def test_vcf_header(tmp_path):
+    vcffile = tmp_path / "sample.vcf.gz"
+    vcffile.write_bytes(gzip.compress(VCF_HEADER))
+    headerstatus, headerinfo = VIPHeaderReader().read_file_header(str(vcffile))
+    assert headerstatus == VIPHeaderReader.HEADER_READ
+    assert headerinfo["format"] == "VCF"
+    assert headerinfo["samples"] == ["patient1", "father1"]
+    assert headerinfo["contigs"] == {"chr1": 248956422, "chrX": 156040895}
+    assert headerinfo["reference"] == "file:///refs/GRCh38.fa"
+
+
+def test_bgzf_vcf_header_over_multiple_blocks(tmp_path):
+    vcffile = tmp_path / "sample.vcf.gz"
+    vcffile.write_bytes(b"".join(gzip.compress(VCF_HEADER[start:start + 40]) for start in range(0, len(VCF_HEADER), 40)))
+    headerstatus, headerinfo = VIPHeaderReader().read_file_header(str(vcffile))
+    assert headerinfo["samples"] == ["patient1", "father1"]
+
+
+def test_bcf_header(tmp_path):
+    vcftext = VCF_HEADER.split(b"chr1\t100")[0] + b"\x00"
+    bcffile = tmp_path / "sample.bcf"
+    bcffile.write_bytes(gzip.compress(b"BCF\x02\x02" + len(vcftext).to_bytes(4, "little") + vcftext))
+    headerstatus, headerinfo = VIPHeaderReader().read_file_header(str(bcffile))
+    assert headerinfo["format"] == "VCF"
+    assert headerinfo["samples"] == ["patient1", "father1"]
+
+
+def test_bam_header(tmp_path):
+    bamfile = tmp_path / "sample.bam"
+    write_bam(bamfile, SAM_HEADER)
+    headerstatus, headerinfo = VIPHeaderReader().read_file_header(str(bamfile))
+    assert headerinfo["format"] == "BAM"
+    assert headerinfo["samples"] == ["patient1"]
+    assert headerinfo["contigs"] == {"1": 249250621, "2": 243199373}
+
+
+def test_cram_header(tmp_path):
+    cramfile = tmp_path / "sample.cram"
+    write_cram(cramfile, SAM_HEADER)
+    headerstatus, headerinfo = VIPHeaderReader().read_file_header(str(cramfile))
+    assert headerstatus == VIPHeaderReader.HEADER_READ
+    assert headerinfo["format"] == "CRAM"
+    assert headerinfo["samples"] == ["patient1"]
+    assert headerinfo["contigs"]["1"] == 249250621
+
+
+def test_unreadable_file(tmp_path):
+    headerstatus, headerinfo = VIPHeaderReader().read_file_header(str(tmp_path / "missing.vcf"))
+    assert headerstatus == VIPHeaderReader.HEADER_UNREADABLE
+    assert headerinfo is None
+
+
+def test_unsupported_format(tmp_path):
+    textfile = tmp_path / "notes.txt"
+    textfile.write_bytes(b"not a data file\n")
+    assert VIPHeaderReader().read_file_header(str(textfile)) == (VIPHeaderReader.HEADER_READ, None)
+
+
+def test_itf8_and_ltf8():
+    assert VIPHeaderReader.read_itf8(bytes([0x05]), 0) == (5, 1)
+    assert VIPHeaderReader.read_itf8(bytes([0x81, 0x00]), 0) == (256, 2)
+    assert VIPHeaderReader.read_itf8(bytes([0xFF, 0xFF, 0xFF, 0xFF, 0x0F]), 0) == (0xFFFFFFFF, 5)
+    assert VIPHeaderReader.read_ltf8(bytes([0x05]), 0) == (5, 1)
+    assert VIPHeaderReader.read_ltf8(bytes([0x81, 0x00]), 0) == (256, 2)
+    assert VIPHeaderReader.read_ltf8(bytes([0xFF]) + (2 ** 40).to_bytes(8, "big"), 0) == (2 ** 40, 9)
+
+
+def test_infer_assembly_from_contig_lengths():
+    headerreader = VIPHeaderReader()
+    assert headerreader.infer_assembly({"contigs": {"chr1": 248956422}, "reference": None})[0] == "GRCh38"
+    assert headerreader.infer_assembly({"contigs": {"1": 249250621}, "reference": "GRCh38.fa"})[0] == "GRCh37"
+
+
+def test_infer_assembly_contigs_without_length():
+    headerreader = VIPHeaderReader()
+    assert headerreader.infer_assembly({"contigs": {"chr1": None}, "reference": "GRCh38.fa"}) == ("GRCh38", "reference GRCh38.fa")
+    assert headerreader.infer_assembly({"contigs": {"chr1": None, "chrUn_gl000220": None}, "reference": "GRCh38.fa"}) == ("GRCh38", "reference GRCh38.fa")
+    assert headerreader.infer_assembly({"contigs": {"chrUn_gl000220": None}, "reference": None}) == (None, None)
+
+
+def test_infer_assembly_reference_only():
+    headerreader = VIPHeaderReader()
+    assert headerreader.infer_assembly({"contigs": {}, "reference": "/refs/hs37d5.fa"})[0] == "GRCh37"
+    assert headerreader.infer_assembly({"contigs": {}, "reference": "chm13v2.0.fa"})[0] == "T2T"
+    assert headerreader.infer_assembly({"contigs": {}, "reference": "unknown.fa"}) == (None, None)
+
+
+def test_fastq_platform_from_read_names(tmp_path):
+    fastqfile = tmp_path / "reads.fastq.gz"
+    fastqfile.write_bytes(gzip.compress(b"".join(b"@A00123:8:HXXXX:1:1101:%d:1000 1:N:0:1\nACGT\n+\nFFFF\n" % readnumber for readnumber in range(10))))
+    headerstatus, headerinfo = VIPHeaderReader().read_file_header(str(fastqfile))
+    assert headerinfo["format"] == "FASTQ"
+    assert headerinfo["numreads"] == 10
+    assert headerinfo["platforms"] == ["illumina"]
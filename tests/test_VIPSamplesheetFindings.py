@@ -0,0 +1,118 @@
+import json
+from VIPErrorBudget import VIPErrorBudget
+from VIPFindingsWriter import VIPFindingsWriter
+from VIPSamplesheetFindings import VIPSamplesheetFindings
+from VIPSamplesheetFindingsSummary import VIPSamplesheetFindingsSummary
+
+
+VALID_GENDERS = ["male", "female", "unknown"]
+
+
+def test_finding_counters():
+    findings = VIPSamplesheetFindings()
+    findings.add_finding(2, "error", "gender", "invalid_value", ("m", VALID_GENDERS))
+    findings.add_finding(2, "error", "gender", "nonprintable_characters", ("m",), newline=False)
+    findings.add_finding(3, "info", "gender", "default_value", ("unknown",))
+    findings.add_finding(0, "error", "project_id", "multiple_sheet_values", ())
+    assert findings.get_number_of_findings() == 4
+    assert findings.get_number_of_errors() == 3
+    assert findings.get_number_of_infos() == 1
+    assert findings.get_column_counts() == {"gender": [2, 1, 1, 1], "project_id": [1, 0, 0, 0]}
+    assert findings.get_code_counts()[("gender", "invalid_value")] == [1, 0]
+    assert findings.get_code_counts()[("gender", "default_value")] == [0, 1]
+
+
+def test_finding_records():
+    findings = VIPSamplesheetFindings()
+    findingindex = findings.add_finding(5, "info", "gender", "default_value", ("unknown",))
+    assert findings.get_finding_line(findingindex) == 5
+    assert findings.get_finding_severity(findingindex) == "info"
+    assert findings.get_finding_code(findingindex) == "default_value"
+    assert findings.get_finding_column(findingindex) == "gender"
+    assert findings.get_finding_message(findingindex) == "No assigned value for gender, will be unknown by default."
+    assert findings.get_findings_messages([findingindex], "info") == {"gender": ["No assigned value for gender, will be unknown by default."]}
+    assert findings.get_findings_messages([findingindex], "error") == {}
+
+
+def test_identical_findings_are_aggregated_into_line_ranges():
+    findings = VIPSamplesheetFindings()
+    for linenumber in [2, 3, 4, 7, 8]:
+        findings.add_finding(linenumber, "error", "gender", "invalid_value", ("m", VALID_GENDERS))
+    findings.add_finding(5, "error", "gender", "invalid_value", ("x", VALID_GENDERS))
+    findings.add_finding(6, "info", "gender", "default_value", ("unknown",))
+    findings.add_finding(0, "error", "project_id", "multiple_sheet_values", ())
+    aggregatedfindings = findings.get_aggregated_findings("error")
+    assert [findinggroup[1:] for findinggroup in aggregatedfindings] == [[5, [[2, 4], [7, 8]]], [1, [[5, 5]]]]
+    assert findings.get_finding_args(aggregatedfindings[0][0]) == ("m", VALID_GENDERS)
+    assert [findinggroup[1:] for findinggroup in findings.get_aggregated_findings("info")] == [[1, [[6, 6]]]]
+
+
+def test_message_arguments_are_interned():
+    findings = VIPSamplesheetFindings()
+    firstindex = findings.add_finding(2, "error", "gender", "invalid_value", ("m", VALID_GENDERS))
+    secondindex = findings.add_finding(3, "error", "gender", "invalid_value", ("m", VALID_GENDERS))
+    assert findings.get_finding_args(firstindex) is findings.get_finding_args(secondindex)
+
+
+def test_render_message_removes_nonprintable_characters():
+    message = VIPSamplesheetFindings.render_message("duplicate_individual_id", "individual_id", ("pat\x1b[31mient\n1",))
+    assert message == "Value \"pat[31mient1\" appears more than once in the samplesheet."
+
+
+def test_error_budget_limits():
+    errorbudget = VIPErrorBudget(maxerrors=3, maxsheeterrors=2)
+    errorbudget.count_error()
+    assert not errorbudget.is_exhausted()
+    errorbudget.count_error()
+    assert errorbudget.is_exhausted() and not errorbudget.is_run_exhausted()
+    errorbudget.start_samplesheet()
+    assert not errorbudget.is_exhausted()
+    assert errorbudget.get_number_of_sheet_errors() == 0
+    errorbudget.count_error()
+    assert errorbudget.is_run_exhausted()
+    assert errorbudget.get_number_of_errors() == 3
+    assert errorbudget.budget_was_exhausted()
+
+
+def test_error_budget_without_limits():
+    errorbudget = VIPErrorBudget()
+    for _ in range(1000):
+        errorbudget.count_error()
+    assert not errorbudget.is_exhausted()
+    assert not errorbudget.budget_was_exhausted()
+
+
+def test_only_errors_count_against_budget():
+    errorbudget = VIPErrorBudget(maxsheeterrors=2)
+    findings = VIPSamplesheetFindings(errorbudget=errorbudget)
+    assert not findings.error_budget_exhausted()
+    findings.add_finding(2, "info", "gender", "default_value", ("unknown",))
+    findings.add_finding(2, "error", "gender", "invalid_value", ("m", VALID_GENDERS))
+    assert not findings.error_budget_exhausted()
+    findings.add_finding(3, "error", "gender", "invalid_value", ("m", VALID_GENDERS))
+    assert findings.error_budget_exhausted()
+    assert not VIPSamplesheetFindings().error_budget_exhausted()
+
+
+def test_findings_summary_only_counts(tmp_path):
+    findingswriter = VIPFindingsWriter(str(tmp_path / "findings.jsonl"), "jsonl")
+    findings = VIPSamplesheetFindingsSummary("samplesheet.tsv", findingswriter)
+    assert findings.add_finding(2, "error", "gender", "invalid_value", ("m", VALID_GENDERS)) is None
+    findings.add_finding(0, "info", "project_id", "multiple_sheet_values", ())
+    findingswriter.close()
+    assert findings.get_number_of_findings() == 0
+    assert findings.get_number_of_errors() == 1
+    assert findings.get_column_counts()["gender"] == [1, 0, 1, 0]
+    assert findingswriter.get_number_of_findings() == 2
+    findingrecords = [json.loads(findingline) for findingline in (tmp_path / "findings.jsonl").read_text().splitlines()]
+    assert findingrecords[0]["line"] == 2
+    assert findingrecords[0]["message"].startswith("Assigned value \"m\" for gender is incorrect.")
+    assert findingrecords[1]["line"] is None
+
+
+def test_findings_writer_tsv(tmp_path):
+    findingswriter = VIPFindingsWriter(str(tmp_path / "findings.tsv"), "tsv")
+    findingswriter.write_finding("samplesheet.tsv", 3, "gender", "error", "invalid_value", "Assigned\tvalue\n")
+    findingswriter.close()
+    findinglines = (tmp_path / "findings.tsv").read_text().splitlines()
+    assert findinglines == ["\t".join(VIPFindingsWriter.FINDINGS_COLUMNS), "samplesheet.tsv\t3\tgender\terror\tinvalid_value\tAssigned value "]
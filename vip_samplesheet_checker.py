@@ -1,11 +1,24 @@
 import sys
 from pathlib import Path
 import argparse
-from prettytable import PrettyTable
 
 from VIPSamplesheet import VIPSamplesheet
 from VIPSamplesheetSample2 import VIPSamplesheetSample2
 from VIPSamplesheetChecker import VIPSamplesheetChecker
+from VIPFindingsWriter import VIPFindingsWriter
+from VIPSamplesheetFindings import VIPSamplesheetFindings
+from VIPSamplesheetFindingsSummary import VIPSamplesheetFindingsSummary
+from VIPErrorBudget import VIPErrorBudget
+from VIPFileProber import VIPFileProber
+from VIPFileInspector import VIPFileInspector
+from VIPHeaderReader import VIPHeaderReader
+from VIPFileCache import VIPFileCache
+from VIPFileFingerprinter import VIPFileFingerprinter
+from VIPChecksumVerifier import VIPChecksumVerifier
+from VIPPathResolver import VIPPathResolver
+
+EXIT_ERROR_BUDGET_EXHAUSTED = 3
+FILE_CHECK_BATCH_SIZE = 1000
 
 def get_parameters():
     """Creates command line arguments for this script to make usage easier.
@@ -19,6 +32,28 @@ def get_parameters():
     -n/--show-info: Flag to also display info messages found during check of the samplesheet(s)
     -cn/--correct-nonprintable: Flag to write new output samplesheet(s) stripped of non printable characters
     -d/--divide-samplesheet: Indicator to split samplesheet(s) on project_id or family_id
+    -e/--errors-only: Flag to only display samples with errors in the report table
+    -t/--table-rows: Maximum number of rows to display in the report table
+    -ct/--classic-table: Flag to build the report table with PrettyTable instead of streaming it
+    -f/--findings-file: Path to write all findings to as machine readable records
+    -ff/--findings-format: Format of the findings file (jsonl or tsv)
+    -a/--aggregate: Flag to group identical findings into line number ranges instead of reporting them per sample
+    -su/--summary: Flag to only count findings and report a summary per column
+    -me/--max-errors: Stop checking once this many errors have been found over all samplesheets
+    -mse/--max-sheet-errors: Stop checking a samplesheet once this many errors have been found in it
+    -sio/--skip-io-on-fatal: Flag to not check the files of samples that already have errors
+    -off/--offline: Flag to run all checks except the ones that need access to the files
+    -st/--stat-timeout: Maximum number of seconds to wait for the check of a single file
+    -rt/--read-timeout: Maximum number of seconds to wait for reading a single file (headers, BED files, fingerprints)
+    -iow/--io-workers: Maximum number of threads to check files with
+    -ic/--integrity-check: How to check compressed files for corruption or truncation (none, quick or deep)
+    -dt/--deep-check-timeout: Maximum number of seconds to wait for the deep integrity check of a file
+    -sf/--sniff-formats: Flag to check the format of the files from their first bytes
+    -hc/--header-checks: Flag to check the headers of the files against the samplesheet values
+    -fp/--fingerprints: Flag to find data files with the same contents under different paths
+    -vc/--verify-checksums: Flag to verify the data files against the .md5/.md5sum files next to them
+    -cf/--cache-file: Path to a file to keep the fingerprints and checksums in between runs
+    -ef/--env-file: Path to a file with VAR=value lines to resolve the bash variables in file paths with
     
     Returns
     -------
@@ -34,6 +69,28 @@ def get_parameters():
     vipssc.add_argument("-n", "--show-info", dest="showinfo", action="store_true", help="Also print sample info messages")
     vipssc.add_argument("-cn", "--correct-nonprintable", dest="correctnonprintable", action="store_true", help="Correct samplesheet for non printable characters")
     vipssc.add_argument("-d", "--divide-samplesheet", dest="dividesamplesheet", choices=["family_id", "project_id"], help="Divide the samplesheet into multiple individual output samplesheet files")
+    vipssc.add_argument("-e", "--errors-only", dest="errorsonly", action="store_true", help="Only display samples with one or more errors in the report table")
+    vipssc.add_argument("-t", "--table-rows", dest="tablerows", type=int, help="Only display the first N rows of the report table")
+    vipssc.add_argument("-ct", "--classic-table", dest="classictable", action="store_true", help="Build the report table with PrettyTable (slow and memory intensive for large samplesheets)")
+    vipssc.add_argument("-f", "--findings-file", dest="findingsfile", help="Path to write all errors and info messages to as one record per finding")
+    vipssc.add_argument("-ff", "--findings-format", dest="findingsformat", choices=VIPFindingsWriter.FINDINGS_FORMATS, default="jsonl", help="Format of the findings file")
+    vipssc.add_argument("-a", "--aggregate", dest="aggregate", action="store_true", help="Group identical error and info messages into line number ranges instead of reporting them per sample")
+    vipssc.add_argument("-su", "--summary", dest="summary", action="store_true", help="Only count the error and info messages and report a summary per column (no report table)")
+    vipssc.add_argument("-me", "--max-errors", dest="maxerrors", type=int, help="Stop checking once N errors have been found over all samplesheets and exit with status 3")
+    vipssc.add_argument("-mse", "--max-sheet-errors", dest="maxsheeterrors", type=int, help="Stop checking a samplesheet once N errors have been found in it and exit with status 3 at the end")
+    vipssc.add_argument("-sio", "--skip-io-on-fatal", dest="skipioonfatal", action="store_true", help="Do not check whether the files of samples with errors in their values exist")
+    vipssc.add_argument("-off", "--offline", dest="offline", action="store_true", help="Do not access the files in the samplesheet (only check the values, including file extensions)")
+    vipssc.add_argument("-st", "--stat-timeout", dest="stattimeout", type=float, default=10.0, help="Maximum number of seconds to wait for the check of a single file before reporting it as unverifiable")
+    vipssc.add_argument("-rt", "--read-timeout", dest="readtimeout", type=float, default=60.0, help="Maximum number of seconds to wait for reading a single file (headers, BED files, fingerprints) before reporting it as unverifiable")
+    vipssc.add_argument("-iow", "--io-workers", dest="ioworkers", type=int, default=32, help="Maximum number of threads to check files with (divided over the mount points based on their speed)")
+    vipssc.add_argument("-ic", "--integrity-check", dest="integritycheck", choices=VIPFileInspector.INTEGRITY_MODES, default="none", help="Check compressed files for truncation: quick (gzip header and BGZF end of file marker) or deep (decompress the complete files)")
+    vipssc.add_argument("-dt", "--deep-check-timeout", dest="deepchecktimeout", type=float, default=600.0, help="Maximum number of seconds the deep integrity check of a file may take (counted from its start in the background) before reporting it as not verified")
+    vipssc.add_argument("-sf", "--sniff-formats", dest="sniffformats", action="store_true", help="Check the format of the files (CRAM/BAM/SAM/VCF/BCF/FASTQ) from their first bytes")
+    vipssc.add_argument("-hc", "--header-checks", dest="headerchecks", action="store_true", help="Check the headers of the files against the samplesheet values (sample names in VCF/GVCF/CRAM files, assemblies in VCF/GVCF/CRAM files and platforms of FASTQ reads)")
+    vipssc.add_argument("-fp", "--fingerprints", dest="fingerprints", action="store_true", help="Find data files with the same contents (size, first and last 64KB) under different paths over all samplesheets")
+    vipssc.add_argument("-vc", "--verify-checksums", dest="verifychecksums", action="store_true", help="Verify the FASTQ, CRAM, GVCF and VCF files against the MD5 checksums in the .md5/.md5sum files next to them")
+    vipssc.add_argument("-cf", "--cache-file", dest="cachefile", help="Path to a SQLite file to keep the fingerprints and checksums in between runs")
+    vipssc.add_argument("-ef", "--env-file", dest="envfile", help="Path to a file with VAR=value lines to resolve $VAR and ${VAR} in file paths with (in addition to the environment)")
     return vars(vipssc.parse_args())
 
 
@@ -45,6 +102,10 @@ def check_parameters(cliparameters):
     cliparameters : dict of str
         Set command line parameters
     """
+    if cliparameters["envfile"] is not None and not Path(cliparameters["envfile"]).is_file():
+        print("Supplied env file is not a file.\n")
+        usage()
+        return False
     if cliparameters["infile"] is not None:
         if not Path(cliparameters["infile"]).is_file():
             print("Supplied input file is not a file.\n")
@@ -132,6 +193,8 @@ def usage():
 def header_cols_ok(vipchecker, runmode, vipsamplesheet):
     """Checks that the header columns in the samplesheet are ok.
     
+    Missing columns are also saved as samplesheet error so they end up in the findings file.
+    
     Returns
     -------
     boolean
@@ -147,13 +210,86 @@ def header_cols_ok(vipchecker, runmode, vipsamplesheet):
             else:
                 print(f"{mc}, ", end="")
             x += 1
+        vipsamplesheet.add_samplesheet_error("header", "missing_columns", ", ".join(sorted(missing_columns)))
+        return False
+    return True
+
+
+def check_samplesheet(vipchecker, runmode, vipsamplesheet, skipioonfatal, offline=False):
+    """Checks all samples of a samplesheet and the samplesheet as a whole, cheapest checks first.
+    
+    The checks are done in three passes: (1) the values of each sample, (2) the consistency of the
+    values throughout the samplesheet and (3) the files of each sample on the filesystem. The
+    checks stop as soon as the error budget (if any) is exhausted.
+    
+    Parameters
+    ----------
+    vipchecker : VIPSamplesheetChecker
+        Checker to check the samplesheet with
+    runmode : str
+        Runmode to check the samplesheet for
+    vipsamplesheet : VIPSamplesheet
+        Samplesheet to check
+    skipioonfatal : bool
+        Whether to skip checking the files of samples that already have errors
+    offline : bool
+        Whether to skip the file checks altogether (no filesystem access)
+    
+    Returns
+    -------
+    bool
+        True if all checks were done, False if checking stopped early
+    """
+    sheetfindings = vipsamplesheet.get_findings()
+    headerfields = vipsamplesheet.get_header_fields()
+    sheetsamples = vipsamplesheet.get_samplesheet_samples()
+    
+    # Check the values of each sample in the samplesheet
+    for samplenum in sheetsamples:
+        # print(f"[INFO]: Checking sample {sheetsamples[samplenum].get_individual_id()}")
+        vipchecker.check_sample_column_values(runmode, headerfields, vipsamplesheet, sheetsamples[samplenum])
+        if sheetfindings.error_budget_exhausted():
+            print(f"[ERROR]: Error budget exhausted on line {samplenum}, the remaining checks for samplesheet {vipsamplesheet.get_file_path()} are cancelled")
+            return False
+    
+    # Check overall samplesheet errors
+    # vipchecker.check_sheet_consistency(vipsamplesheet)
+    # vipchecker.check_sheet_duplicate_individual_ids(vipsamplesheet)
+    # vipchecker.check_sheet_trios(vipsamplesheet)
+    vipchecker.check_sheet_sequencing_method_consistency(vipsamplesheet)
+    vipchecker.check_sheet_sequencing_platform_consistency(vipsamplesheet)
+    vipchecker.check_sheet_assembly_consistency(vipsamplesheet)
+    vipchecker.check_sheet_individualid_consistency(vipsamplesheet)
+    if sheetfindings.error_budget_exhausted():
+        print(f"[ERROR]: Error budget exhausted, the file checks for samplesheet {vipsamplesheet.get_file_path()} are cancelled")
         return False
+    
+    # Check the files of each sample in the samplesheet. The files of the next batch of samples
+    # are already checked in the background while the results of the current batch are reported.
+    if offline:
+        return True
+    samplenums = [samplenum for samplenum in sheetsamples if not (skipioonfatal and sheetsamples[samplenum].has_sample_errors())]
+    samplebatches = [samplenums[bi:bi + FILE_CHECK_BATCH_SIZE] for bi in range(0, len(samplenums), FILE_CHECK_BATCH_SIZE)]
+    for batchindex in range(len(samplebatches)):
+        if batchindex == 0:
+            vipchecker.prefetch_sample_files(runmode, headerfields, [sheetsamples[samplenum] for samplenum in samplebatches[0]])
+        if batchindex + 1 < len(samplebatches):
+            vipchecker.prefetch_sample_files(runmode, headerfields, [sheetsamples[samplenum] for samplenum in samplebatches[batchindex + 1]])
+        for samplenum in samplebatches[batchindex]:
+            vipchecker.check_sample_files(runmode, headerfields, sheetsamples[samplenum])
+            if sheetfindings.error_budget_exhausted():
+                vipchecker.cancel_file_checks()
+                print(f"[ERROR]: Error budget exhausted on line {samplenum}, the remaining file checks for samplesheet {vipsamplesheet.get_file_path()} are cancelled")
+                return False
+    vipchecker.check_sheet_file_fingerprints()
     return True
 
 
 def make_report_table(samplesheet):
     """
     """
+    from prettytable import PrettyTable
+    
     headerfields = samplesheet.get_header_fields()
     sheetsamples = samplesheet.get_samplesheet_samples()
     reporttable = PrettyTable(headerfields)
@@ -169,17 +305,26 @@ def make_report_table(samplesheet):
     return reporttable
 
 
-def make_report_table_v2(samplesheet, printvalues):
+def make_report_table_v2(samplesheet, printvalues, errorsonly=False, maxrows=None):
     """Creates the report table indicating which columns are correct and which are not
     
     The report table has the same columns and rows as the input samplesheet.
     It also has rownumbers to make it easier to identify the fields in the actual samplesheet.
+    PrettyTable is only imported here so it is not required for the default streamed table.
     
     Parameters
     ----------
     samplesheet : VIPSamplesheet
         Samplesheet containing the samples
+    printvalues : bool
+        Whether to also display the samplesheet values in the table
+    errorsonly : bool
+        Whether to only add samples with one or more errors to the table
+    maxrows : int
+        Maximum number of rows to add to the table (None for all rows)
     """
+    from prettytable import PrettyTable
+    
     headerfields = samplesheet.get_header_fields()
     tableheaders = [""]
     tableheaders.extend(headerfields)
@@ -187,7 +332,12 @@ def make_report_table_v2(samplesheet, printvalues):
     reporttable = PrettyTable(tableheaders)
     
     # Loop over the samples (it uses range to ensure that sample are added in the correct linenumber order)
+    numofrows = 0
     for samplenum in range(1, len(sheetsamples)+1):
+        if maxrows is not None and numofrows >= maxrows:
+            break
+        if errorsonly and not sheetsamples[samplenum].has_sample_errors():
+            continue
         tablerow = [samplenum]
         for hf in headerfields:
             if sheetsamples[samplenum].field_has_errors(hf):
@@ -201,9 +351,120 @@ def make_report_table_v2(samplesheet, printvalues):
                 else:
                     tablerow.append("\u2714")
         reporttable.add_row(tablerow)
+        numofrows += 1
     return reporttable
 
 
+def make_report_table_v3(samplesheet, printvalues, errorsonly=False, maxrows=None):
+    """Collects the rows and column widths of the report table in one pass over the samples.
+    
+    Instead of building every table cell up front (as make_report_table_v2 does with PrettyTable),
+    only the line number and a bitmask of the columns with errors are saved per row. The column
+    widths are determined while collecting the rows so write_report_table() can stream the table.
+    
+    Parameters
+    ----------
+    samplesheet : VIPSamplesheet
+        Samplesheet containing the samples
+    printvalues : bool
+        Whether the samplesheet values will also be displayed in the table
+    errorsonly : bool
+        Whether to only add samples with one or more errors to the table
+    maxrows : int
+        Maximum number of rows to add to the table (None for all rows)
+    
+    Returns
+    -------
+    columnwidths : list of int
+        Width of each table column, starting with the line number column
+    tablerows : list of tuple
+        Line number and column error bitmask of each table row
+    """
+    headerfields = samplesheet.get_header_fields()
+    sheetsamples = samplesheet.get_samplesheet_samples()
+    columnwidths = [0] + [len(hf) for hf in headerfields]
+    tablerows = []
+    
+    for samplenum in range(1, len(sheetsamples)+1):
+        if maxrows is not None and len(tablerows) >= maxrows:
+            break
+        sheetsample = sheetsamples[samplenum]
+        errorbits = 0
+        for hfindex, hf in enumerate(headerfields):
+            if sheetsample.field_has_errors(hf):
+                errorbits |= 1 << hfindex
+        if errorsonly and errorbits == 0:
+            continue
+        
+        # A table cell is the check or error mark, optionally followed by a space and the value
+        columnwidths[0] = max(columnwidths[0], len(str(samplenum)))
+        for hfindex, hf in enumerate(headerfields):
+            cellwidth = 1
+            if printvalues:
+                cellwidth += 1 + len(sheetsample.get_datafield(hf) or "")
+            if cellwidth > columnwidths[hfindex+1]:
+                columnwidths[hfindex+1] = cellwidth
+        tablerows.append((samplenum, errorbits))
+    return columnwidths, tablerows
+
+
+def make_report_table_line(tablecells, columnwidths):
+    """Returns one line of the streamed report table with the cells centered in their columns.
+    
+    Parameters
+    ----------
+    tablecells : list of str
+        Values of the table cells
+    columnwidths : list of int
+        Width of each table column
+    
+    Returns
+    -------
+    str
+        Table line
+    """
+    return "| " + " | ".join([tablecells[x].center(columnwidths[x]) for x in range(len(columnwidths))]) + " |\n"
+
+
+def write_report_table(outstream, samplesheet, reporttable, printvalues):
+    """Writes the report table row by row to an output stream.
+    
+    The layout of the table is the same as the PrettyTable layout of make_report_table_v2,
+    but no table row is kept in memory.
+    
+    Parameters
+    ----------
+    outstream : file object
+        Stream to write the table to (sys.stdout or an opened output file)
+    samplesheet : VIPSamplesheet
+        Samplesheet containing the samples
+    reporttable : tuple
+        Column widths and table rows as returned by make_report_table_v3
+    printvalues : bool
+        Whether to also display the samplesheet values in the table
+    """
+    columnwidths, tablerows = reporttable
+    headerfields = samplesheet.get_header_fields()
+    sheetsamples = samplesheet.get_samplesheet_samples()
+    separatorline = "+" + "+".join(["-" * (cw + 2) for cw in columnwidths]) + "+\n"
+    
+    outstream.write(separatorline)
+    outstream.write(make_report_table_line([""] + headerfields, columnwidths))
+    outstream.write(separatorline)
+    for samplenum, errorbits in tablerows:
+        tablecells = [str(samplenum)]
+        for hfindex, hf in enumerate(headerfields):
+            if errorbits >> hfindex & 1:
+                tablecell = "\u2718"
+            else:
+                tablecell = "\u2714"
+            if printvalues:
+                tablecell += " " + (sheetsamples[samplenum].get_datafield(hf) or "")
+            tablecells.append(tablecell)
+        outstream.write(make_report_table_line(tablecells, columnwidths))
+    outstream.write(separatorline)
+
+
 def print_samples_error_messsages(samplesheet):
     """Prints the error messages found in all samplesheet samples.
     
@@ -290,7 +551,105 @@ def print_samples_error_info_messages(samplesheet, displayinfo):
             print("")
 
 
-def write_output_file(pathtofile, samplesheet, reporttable, displayinfo):
+def format_line_ranges(lineranges, maxranges=10):
+    """Formats line number ranges as a short string, for example "lines 2-48211" or "lines 1-3, 7".
+    
+    Parameters
+    ----------
+    lineranges : list of list of int
+        Start and end line number of each range
+    maxranges : int
+        Maximum number of ranges to display
+    
+    Returns
+    -------
+    str
+        The formatted line number ranges
+    """
+    rangestrings = []
+    for linerange in lineranges[:maxranges]:
+        if linerange[0] == linerange[1]:
+            rangestrings.append(f"{linerange[0]}")
+        else:
+            rangestrings.append(f"{linerange[0]}-{linerange[1]}")
+    if len(lineranges) > maxranges:
+        rangestrings.append(f"... ({len(lineranges) - maxranges} more ranges)")
+    
+    if len(lineranges) == 1 and lineranges[0][0] == lineranges[0][1]:
+        return "line " + rangestrings[0]
+    return "lines " + ", ".join(rangestrings)
+
+
+def write_aggregated_findings(outstream, samplesheet, displayinfo):
+    """Writes the sample error and info messages grouped into line number ranges.
+    
+    Identical findings (same column, code and values) are written once with the
+    line number ranges they occur on and the number of times they were found.
+    
+    Parameters
+    ----------
+    outstream : file object
+        Stream to write the aggregated findings to
+    samplesheet : VIPSamplesheet
+        Samplesheet with samples containing error and info messages
+    displayinfo : bool
+        Whether to also write the aggregated info messages
+    """
+    sheetfindings = samplesheet.get_findings()
+    severities = ["error", "info"] if displayinfo else ["error"]
+    for severity in severities:
+        aggregatedfindings = sheetfindings.get_aggregated_findings(severity)
+        if len(aggregatedfindings) > 0:
+            if severity == "error":
+                outstream.write("Found problems for samples:\n")
+            else:
+                outstream.write("Found the following notifications for samples:\n")
+            for firstfinding, numoffindings, lineranges in aggregatedfindings:
+                outstream.write(f"\t{format_line_ranges(lineranges)} ({numoffindings}x): [{sheetfindings.get_finding_column(firstfinding)}] {sheetfindings.get_finding_message(firstfinding)}\n")
+            outstream.write("\n")
+
+
+def write_findings_summary(outstream, samplesheet):
+    """Writes the number of errors and info messages and the number of affected lines per column and rule.
+    
+    Parameters
+    ----------
+    outstream : file object
+        Stream to write the summary to
+    samplesheet : VIPSamplesheet
+        Samplesheet to write the summary of
+    """
+    sheetfindings = samplesheet.get_findings()
+    columncounts = sheetfindings.get_column_counts()
+    codecounts = sheetfindings.get_code_counts()
+    outstream.write(f"Summary of findings: {sheetfindings.get_number_of_errors()} errors and {sheetfindings.get_number_of_infos()} info messages in {samplesheet.get_number_of_samples()} samples\n")
+    for columnname in columncounts:
+        numoferrors, numofinfos, errorlines, infolines = columncounts[columnname]
+        outstream.write(f"\t[{columnname}]: {numoferrors} errors on {errorlines} lines, {numofinfos} info messages on {infolines} lines\n")
+        for countedcolumn, code in codecounts:
+            if countedcolumn == columnname:
+                codeerrors, codeinfos = codecounts[(countedcolumn, code)]
+                outstream.write(f"\t\t{code}: {codeerrors + codeinfos}\n")
+
+
+def write_summary_file(pathtofile, samplesheet):
+    """Writes the summary of a samplesheet check to an output file.
+    
+    Parameters
+    ----------
+    pathtofile : str
+        Path to write output file to
+    samplesheet : VIPSamplesheet
+        Samplesheet to write the summary of
+    """
+    try:
+        with open(pathtofile, "w") as outfile:
+            write_findings_summary(outfile, samplesheet)
+    except IOError:
+        print(f"Could not write to output file {pathtofile}")
+
+
+def write_output_file(pathtofile, samplesheet, reporttable, displayinfo, printvalues, classictable, aggregate):
     """Writes the output of a samplesheet check to an output file.
     
     Parameters
@@ -299,16 +658,30 @@ def write_output_file(pathtofile, samplesheet, reporttable, displayinfo):
         Path to write output file to
     samplesheet : VIPSamplesheet
         Samplesheet to write report of
-    reporttable : PrettyTable
-        The report table to write to file
+    reporttable : PrettyTable or tuple
+        The report table to write to file (PrettyTable if classictable is set)
+    displayinfo : bool
+        Whether to also write the samples info messages
+    printvalues : bool
+        Whether the samplesheet values are displayed in the report table
+    classictable : bool
+        Whether the report table is a PrettyTable or a streamed report table
+    aggregate : bool
+        Whether to write the messages grouped into line number ranges instead of per sample
     """
     try:
         with open(pathtofile, "w") as outfile:
-            outfile.write(str(reporttable))
-            outfile.write("\n")
+            if classictable:
+                outfile.write(str(reporttable))
+                outfile.write("\n")
+            else:
+                write_report_table(outfile, samplesheet, reporttable, printvalues)
             
             # Write the sample error messages
             sheetsamples = samplesheet.get_samplesheet_samples()
+            if aggregate:
+                write_aggregated_findings(outfile, samplesheet, displayinfo)
+                sheetsamples = {}
             for samplenum in sheetsamples:
                 errormessages = sheetsamples[samplenum].get_sample_errors()
                 infomessages = sheetsamples[samplenum].get_sample_infos()
@@ -420,49 +793,76 @@ def main():
         else:
             runmodes_samplesheets[cli_args["runmode"]] = cli_args["samplesheets"]
         
-        vip_checker = VIPSamplesheetChecker()
+        findings_writer = None
+        if cli_args["findingsfile"]:
+            findings_writer = VIPFindingsWriter(cli_args["findingsfile"], cli_args["findingsformat"])
+        
+        error_budget = None
+        if cli_args["maxerrors"] is not None or cli_args["maxsheeterrors"] is not None:
+            error_budget = VIPErrorBudget(cli_args["maxerrors"], cli_args["maxsheeterrors"])
+        
+        file_inspector = VIPFileInspector(cli_args["integritycheck"], cli_args["sniffformats"], deepchecktimeout=cli_args["deepchecktimeout"])
+        header_reader = VIPHeaderReader() if cli_args["headerchecks"] else None
+        file_cache = VIPFileCache(cli_args["cachefile"])
+        file_fingerprinter = VIPFileFingerprinter(file_cache) if cli_args["fingerprints"] else None
+        checksum_verifier = VIPChecksumVerifier(file_cache) if cli_args["verifychecksums"] else None
+        file_prober = VIPFileProber(cli_args["stattimeout"], maxworkers=max(cli_args["ioworkers"], 1), readtimeout=cli_args["readtimeout"])
+        vip_checker = VIPSamplesheetChecker(file_prober, file_inspector, header_reader, fingerprinter=file_fingerprinter, checksumverifier=checksum_verifier, pathresolver=VIPPathResolver(cli_args["envfile"]))
         for runmode in runmodes_samplesheets:
             # print(f"[INFO]: Checking samplesheets for runmode {runmode}")
             for samplesheetfile in runmodes_samplesheets[runmode]:
+                if error_budget is not None:
+                    if error_budget.is_run_exhausted():
+                        print(f"[INFO]: Skipping samplesheet {samplesheetfile}, the error budget is exhausted")
+                        continue
+                    error_budget.start_samplesheet()
+                
                 print(f"[INFO]: Checking samplesheet \"{samplesheetfile}\" for runmode \'{runmode}\'")
-                vip_samplesheet = VIPSamplesheet(samplesheetfile)
+                if cli_args["summary"]:
+                    sheet_findings = VIPSamplesheetFindingsSummary(samplesheetfile, findings_writer, error_budget)
+                else:
+                    sheet_findings = VIPSamplesheetFindings(samplesheetfile, findings_writer, error_budget)
+                vip_samplesheet = VIPSamplesheet(samplesheetfile, sheet_findings)
                 if not vip_samplesheet.file_was_read_succesfully():
                     print(f"[INFO]: Skipping samplesheet {samplesheetfile}")
+                    vip_samplesheet.add_samplesheet_error("samplesheet", "unreadable_samplesheet")
                 else:
                     has_required_cols = header_cols_ok(vip_checker, runmode, vip_samplesheet)
                     if not has_required_cols:
                         print(f"Skipping samplesheet {samplesheetfile} due to missing required columns")
                     else:
-                        # Check each sample in the samplesheet for errors
-                        sheetsamples = vip_samplesheet.get_samplesheet_samples()
-                        for samplenum in sheetsamples:
-                            # print(f"[INFO]: Checking sample {sheetsamples[samplenum].get_individual_id()}")
-                            vip_checker.check_sample_column_values(runmode, vip_samplesheet.get_header_fields(), vip_samplesheet, sheetsamples[samplenum])
-                            #print("\n")
+                        # Check each sample and the samplesheet as a whole for errors
+                        stopped_early = not check_samplesheet(vip_checker, runmode, vip_samplesheet, cli_args["skipioonfatal"], cli_args["offline"])
                         
-                        # Check overall samplesheet errors
-                        # vip_checker.check_sheet_consistency(vip_samplesheet)
-                        # vip_checker.check_sheet_duplicate_individual_ids(vip_samplesheet)
-                        # vip_checker.check_sheet_trios(vip_samplesheet)
-                        vip_checker.check_sheet_sequencing_method_consistency(vip_samplesheet)
-                        vip_checker.check_sheet_sequencing_platform_consistency(vip_samplesheet)
-                        vip_checker.check_sheet_assembly_consistency(vip_samplesheet)
-                        vip_checker.check_sheet_individualid_consistency(vip_samplesheet)
-                        
-                        # Start making the report
-                        report_table = make_report_table_v2(vip_samplesheet, cli_args["printvalues"])
-                        print(report_table)
+                        # Start making the report (only samples with errors if checking stopped early,
+                        # so unchecked samples are not displayed as correct)
+                        errorsonly = cli_args["errorsonly"] or stopped_early
+                        if cli_args["summary"]:
+                            report_table = None
+                            write_findings_summary(sys.stdout, vip_samplesheet)
+                        elif cli_args["classictable"]:
+                            report_table = make_report_table_v2(vip_samplesheet, cli_args["printvalues"], errorsonly, cli_args["tablerows"])
+                            print(report_table)
+                        else:
+                            report_table = make_report_table_v3(vip_samplesheet, cli_args["printvalues"], errorsonly, cli_args["tablerows"])
+                            write_report_table(sys.stdout, vip_samplesheet, report_table, cli_args["printvalues"])
                         # vip_samplesheet.display_all_sample_errors()
                         print_samplesheet_error_messages(vip_samplesheet)
-                        print_samples_error_messsages(vip_samplesheet)
-                        
-                        if cli_args["showinfo"]:
-                            print_samples_info_messages(vip_samplesheet)
+                        if cli_args["aggregate"] and not cli_args["summary"]:
+                            write_aggregated_findings(sys.stdout, vip_samplesheet, cli_args["showinfo"])
+                        elif not cli_args["summary"]:
+                            print_samples_error_messsages(vip_samplesheet)
+                            
+                            if cli_args["showinfo"]:
+                                print_samples_info_messages(vip_samplesheet)
                     
                         # Check whether to write to output file, if so do so
                         if cli_args["outdir"]:
                             outputfilepath = cli_args["outdir"] + "/checked_" + samplesheetfile.split("/")[-1]
-                            write_output_file(outputfilepath, vip_samplesheet, report_table, cli_args["showinfo"])
+                            if cli_args["summary"]:
+                                write_summary_file(outputfilepath, vip_samplesheet)
+                            else:
+                                write_output_file(outputfilepath, vip_samplesheet, report_table, cli_args["showinfo"], cli_args["printvalues"], cli_args["classictable"], cli_args["aggregate"])
                             print(f"Wrote output file with checks to: {outputfilepath}")
                         
                             if cli_args["dividesamplesheet"]:
@@ -477,6 +877,27 @@ def main():
                         
                         print("")
                         print("**************************************************")
+                
+                if findings_writer is not None:
+                    findings_writer.flush()
+        
+        if findings_writer is not None:
+            findings_writer.close()
+            print(f"Wrote {findings_writer.get_number_of_findings()} findings to: {cli_args["findingsfile"]}")
+        
+        if checksum_verifier is not None:
+            checksum_stats = checksum_verifier.get_statistics()
+            checksum_files = checksum_stats["cachehits"] + checksum_stats["hashedfiles"]
+            print(f"[INFO]: Verified the checksums of {checksum_files} files, {checksum_stats["cachehits"]} from the cache ({checksum_stats["cachehits"] / max(checksum_files, 1):.0%})")
+            print(f"[INFO]: Calculated {checksum_stats["hashedfiles"]} checksums over {checksum_stats["hashedbytes"] / 1e9:.2f} GB in {checksum_stats["hashseconds"]:.1f} seconds ({checksum_stats["bytespersecond"] / 1e9:.2f} GB/s)")
+            checksum_verifier.close()
+        file_prober.close()
+        file_inspector.close()
+        file_cache.close()
+        if error_budget is not None and error_budget.budget_was_exhausted():
+            print(f"[ERROR]: Error budget exhausted after {error_budget.get_number_of_errors()} errors")
+            sys.exit(EXIT_ERROR_BUDGET_EXHAUSTED)
     
 
-main()
+if __name__ == "__main__":
+    main()